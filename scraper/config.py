@@ -2,6 +2,8 @@
 Configuration settings for Twilight Zone Wikipedia scraper
 """
 
+import os
+
 # Core URLs
 BASE_URL = "https://fr.wikipedia.org"
 MAIN_PAGE_URL = "https://fr.wikipedia.org/wiki/La_Quatri%C3%A8me_Dimension"
@@ -13,10 +15,45 @@ SEASON_URL_PATTERN = f"{BASE_URL}/wiki/Saison_{{season_num}}_de_La_Quatri%C3%A8m
 # HTTP Configuration
 USER_AGENT = "TwilightZoneScraper/1.0 (Educational; Python-requests/2.31.0)"
 REQUEST_TIMEOUT = 30  # seconds
-REQUEST_DELAY = 2.0  # seconds between requests
+REQUEST_DELAY = 2.0  # initial seconds between requests to the same host
+MIN_REQUEST_DELAY = 0.5  # fastest spacing the adaptive limiter may reach
+MAX_REQUEST_DELAY = 30.0  # slowest spacing after repeated throttling
+HOST_BURST = 1  # requests a host may receive back-to-back before REQUEST_DELAY applies
+HOST_MAX_CONCURRENCY = 2  # simultaneous in-flight requests per host for async fetches
+HTTP_POOL_HOSTS = 4  # hosts with a kept-alive connection pool (fr/en Wikipedia, APIs)
+HTTP_POOL_SIZE = 4  # kept-alive connections per host
 RETRY_MAX_ATTEMPTS = 3
 RETRY_BACKOFF_FACTOR = 2
 
+# Adaptive rate limiting (additive increase, multiplicative decrease)
+AIMD_INCREASE = 0.05  # requests/second added to a host's rate after each healthy response
+AIMD_DECREASE_FACTOR = 0.5  # rate multiplier on 429/503, maxlag or a latency spike
+LATENCY_BACKOFF_RATIO = 2.0  # a response this many times slower than average counts as a spike
+LATENCY_BACKOFF_MIN = 1.0  # ...provided it also took at least this many seconds
+RETRY_BUDGET_RATIO = 0.1  # retries earned per successful request
+RETRY_BUDGET_MAX = 10  # retries available at start and cap of the budget
+DEFAULT_RETRY_AFTER = 5.0  # pause in seconds when a throttling response has no Retry-After
+
+# Cross-process rate coordination: scripts running at the same time share each host's token bucket
+# through this file ("" to give each process its own buckets)
+RATE_COORDINATOR_PATH = os.environ.get(
+    "SCRAPER_RATE_COORDINATOR", "F:/DEV/SRC/TWILIGHT_ZONE/output/cache/rate_coordinator.sqlite3"
+)
+RATE_REPORT_WINDOW = 60.0  # seconds of request history behind the aggregate rate report
+
+# Distributed scrape work queue: page URLs leased to worker processes (scripts/queue_worker.py)
+QUEUE_BACKEND = os.environ.get("SCRAPER_QUEUE_BACKEND", "sqlite")
+QUEUE_PATH = os.environ.get("SCRAPER_QUEUE_PATH", "F:/DEV/SRC/TWILIGHT_ZONE/output/cache/work_queue.sqlite3")
+QUEUE_LEASE_SECONDS = 120.0  # a task whose worker stops heartbeating is handed out again after this
+QUEUE_MAX_ATTEMPTS = 3  # attempts before a task is dead-lettered
+QUEUE_RETRY_DELAY = 30.0  # seconds before a failed task is retried, doubled on each further failure
+QUEUE_POLL_INTERVAL = 2.0  # idle workers check again after this while other workers hold leases
+
+# MediaWiki Action API
+API_PATH = "/w/api.php"
+API_BATCH_SIZE = 50  # titles per query (the API limit for anonymous clients)
+MAXLAG = 5  # seconds of replication lag above which the API asks us to back off
+
 # Headers to avoid 403 Forbidden errors
 HEADERS = {
     'User-Agent': USER_AGENT,
@@ -28,6 +65,36 @@ HEADERS = {
     'Upgrade-Insecure-Requests': '1'
 }
 
+# Response Cache Configuration
+CACHE_ENABLED = True
+CACHE_PATH = "F:/DEV/SRC/TWILIGHT_ZONE/output/cache/http_cache.sqlite3"
+CACHE_MAX_BYTES = 200 * 1024 * 1024  # 200 MB of compressed page bodies
+CACHE_MAX_AGE = 600  # seconds during which a cached page is served without revalidation
+
+# Parse memo: what was parsed out of each page revision, shared by every script ("0" to always parse)
+MEMO_ENABLED = os.environ.get("SCRAPER_MEMO", "1") != "0"
+MEMO_PATH = "F:/DEV/SRC/TWILIGHT_ZONE/output/cache/parse_memo.sqlite3"
+
+# Record/replay mode: "live" (network), "record" (network + write fixtures), "replay" (fixtures only),
+# "cache" (response cache only, whatever its age)
+HTTP_MODE = os.environ.get("SCRAPER_HTTP_MODE", "live")
+FIXTURE_PATH = os.environ.get("SCRAPER_FIXTURE_PATH", "F:/DEV/SRC/TWILIGHT_ZONE/output/fixtures/wikipedia.zip")
+
+# HTML parse backend: "bs4" (BeautifulSoup over lxml) or "lxml" (native lxml tree + XPath)
+PARSE_BACKEND = os.environ.get("SCRAPER_PARSE_BACKEND", "bs4")
+# Build trees from the mw-content-text region only, with reference lists and navboxes cut out beforehand
+PARSE_CONTENT_ONLY = os.environ.get("SCRAPER_PARSE_CONTENT_ONLY", "1") != "0"
+
+# Fetch/parse pipeline: parser processes, and fetched pages allowed to wait for a parser
+PARSE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+PARSE_QUEUE_SIZE = 8
+# Re-parsing from the response cache has no network to wait on: every core parses
+REPARSE_WORKERS = os.cpu_count() or 2
+
+# Progress journal: fsync after this many appended records or seconds, whichever comes first
+JOURNAL_SYNC_EVERY = 10
+JOURNAL_SYNC_INTERVAL = 5.0
+
 # Season Discovery Configuration
 MAX_SEASON_CHECK = 10  # Maximum season number to check sequentially
 CONSECUTIVE_FAILURES_THRESHOLD = 2  # Stop after this many consecutive 404s
@@ -40,3 +107,5 @@ LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
 OUTPUT_DIR = "F:/DEV/SRC/TWILIGHT_ZONE/output"
 LOG_DIR = "F:/DEV/SRC/TWILIGHT_ZONE/output/logs"
 OUTPUT_JSON_FILE = "twilight_zone_episodes.json"
+OUTPUT_NDJSON_FILE = "twilight_zone_episodes.ndjson"  # main.py --format ndjson
+REVISIONS_FILE = "twilight_zone_revisions.json"  # revision of each season page at the last scrape
@@ -0,0 +1,211 @@
+"""
+Wikipedia XML dump reader - streams pages out of pages-articles dumps with bounded memory
+"""
+
+import bz2
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+from urllib.parse import urlsplit
+from loguru import logger
+from lxml import etree
+from scraper.config import PARSE_WORKERS
+from scraper.wikitext import normalize_title
+
+BASE_RE = re.compile(rb'<base>(.*?)</base>')
+READ_CHUNK = 1 << 20
+MAX_REDIRECT_HOPS = 2
+
+
+class DumpPage(NamedTuple):
+    """A page as stored in the dump"""
+    title: str
+    namespace: int
+    revision_id: Optional[int]
+    redirect: Optional[str]
+    text: str
+
+
+def _local(tag: str) -> str:
+    """Tag name without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _page_from_element(page) -> DumpPage:
+    """Read a <page> element (namespaced or not)"""
+    fields = {}
+    redirect = None
+    for child in page:
+        name = _local(child.tag)
+        if name == 'redirect':
+            redirect = child.get('title')
+        elif name == 'revision':
+            for field in child:
+                if _local(field.tag) in ('id', 'text'):
+                    fields['rev_' + _local(field.tag)] = field.text or ''
+        else:
+            fields[name] = child.text
+    revision_id = fields.get('rev_id')
+    return DumpPage(
+        title=fields.get('title') or '',
+        namespace=int(fields.get('ns') or 0),
+        revision_id=int(revision_id) if revision_id and revision_id.isdigit() else None,
+        redirect=redirect,
+        text=fields.get('rev_text', '')
+    )
+
+
+def _open(path: Path):
+    """Binary stream of a dump, decompressing .bz2 files (multistream files included)"""
+    return bz2.open(path, 'rb') if path.suffix == '.bz2' else open(path, 'rb')
+
+
+def iter_dump_pages(path: str) -> Iterator[DumpPage]:
+    """
+    Stream every page of a dump with incremental parsing
+
+    Each <page> element is freed as soon as it has been read, so memory stays
+    bounded whatever the size of the dump.
+
+    Args:
+        path: .xml or .xml.bz2 dump
+
+    Yields:
+        Pages in dump order
+    """
+    with _open(Path(path)) as stream:
+        for _, element in etree.iterparse(stream, events=('end',), tag='{*}page', huge_tree=True):
+            yield _page_from_element(element)
+            element.clear()
+            parent = element.getparent()
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def _read_stream(path: str, offset: int, titles: Set[str]) -> List[DumpPage]:
+    """Worker: decompress the single bz2 stream starting at `offset` and return its wanted pages"""
+    decompressor = bz2.BZ2Decompressor()
+    chunks = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while not decompressor.eof:
+            data = f.read(READ_CHUNK)
+            if not data:
+                break
+            chunks.append(decompressor.decompress(data))
+    root = etree.fromstring(b'<pages>' + b''.join(chunks) + b'</pages>', etree.XMLParser(huge_tree=True))
+    pages = []
+    for element in root.iter('page'):
+        page = _page_from_element(element)
+        if page.title in titles:
+            pages.append(page)
+    return pages
+
+
+class DumpReader:
+    """
+    Picks given pages out of a pages-articles dump
+
+    With the multistream index (pages-articles-multistream-index.txt.bz2), only
+    the bz2 streams holding the wanted pages are read, decompressed and parsed
+    in parallel by a process pool; the rest of the dump is never touched.
+    Without it, the dump is streamed once from start to end. Redirects are
+    followed in both cases.
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None, workers: int = PARSE_WORKERS):
+        """
+        Open a dump
+
+        Args:
+            path: .xml or .xml.bz2 dump (a multistream dump if index_path is given)
+            index_path: Multistream index (offset:page_id:title per line, .bz2 or plain)
+            workers: Decompression processes for indexed reads
+        """
+        self.path = Path(path)
+        self.index_path = Path(index_path) if index_path else None
+        self.workers = workers
+        self.site = self._read_site()
+
+    def _read_site(self) -> Optional[str]:
+        """scheme://host of the wiki, from the <base> of the dump's siteinfo"""
+        with _open(self.path) as stream:
+            head = stream.read(64 * 1024)
+        match = BASE_RE.search(head)
+        if not match:
+            return None
+        parts = urlsplit(match.group(1).decode('utf-8'))
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _offsets(self, titles: Set[str]) -> Dict[int, Set[str]]:
+        """Stream offset -> wanted titles stored in that stream, from the multistream index"""
+        offsets = defaultdict(set)
+        opener = bz2.open if self.index_path.suffix == '.bz2' else open
+        with opener(self.index_path, 'rt', encoding='utf-8') as index:
+            for line in index:
+                offset, _, title = line.rstrip('\n').split(':', 2)
+                if title in titles:
+                    offsets[int(offset)].add(title)
+        return offsets
+
+    def _scan(self, titles: Set[str]) -> Dict[str, DumpPage]:
+        """Read the wanted pages, through the index when there is one"""
+        if self.index_path is None:
+            found = {}
+            for page in iter_dump_pages(str(self.path)):
+                if page.title in titles:
+                    found[page.title] = page
+                    if len(found) == len(titles):
+                        break
+            return found
+
+        offsets = self._offsets(titles)
+        logger.info(f"Reading {len(offsets)} of the dump's bz2 streams with {self.workers} processes")
+        found = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                pool.submit(_read_stream, str(self.path), offset, stream_titles)
+                for offset, stream_titles in sorted(offsets.items())
+            ]
+            for future in futures:
+                for page in future.result():
+                    found[page.title] = page
+        return found
+
+    def pages(self, titles: Iterable[str]) -> Dict[str, DumpPage]:
+        """
+        Get pages by title, following redirects
+
+        Args:
+            titles: Page titles (underscores and a lower-case first letter are accepted)
+
+        Returns:
+            Requested title (normalized) -> page holding its content; missing pages are absent
+        """
+        wanted = {normalize_title(title) for title in titles}
+        resolved = {title: title for title in wanted}
+        pages: Dict[str, DumpPage] = {}
+        for _ in range(MAX_REDIRECT_HOPS + 1):
+            missing = set(resolved.values()) - set(pages)
+            if not missing:
+                break
+            found = self._scan(missing)
+            pages.update(found)
+            redirected = False
+            for requested, title in resolved.items():
+                page = found.get(title)
+                if page and page.redirect:
+                    resolved[requested] = normalize_title(page.redirect.split('#', 1)[0])
+                    redirected = True
+            if not redirected:
+                break
+
+        result = {}
+        for requested, title in resolved.items():
+            page = pages.get(title)
+            if page and not page.redirect:
+                result[requested] = page
+        logger.info(f"Found {len(result)} of {len(wanted)} pages in {self.path.name}")
+        return result
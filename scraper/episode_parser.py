@@ -3,18 +3,156 @@ Episode parser module - extracts episode data from Wikipedia headings and sectio
 """
 
 from bs4 import BeautifulSoup, Tag
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
-from typing import List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Pattern, Tuple
 import re
+from scraper.config import HOST_MAX_CONCURRENCY
 from scraper.data_models import Episode, Season
 from scraper.http_client import WikipediaClient
+from scraper.parse_backend import (
+    resolve_backend, parse_lxml, trim_page, is_element, HEADLINE_XPATH, PARSER_OUTPUT_XPATH
+)
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+SECTION_BLOCK_TAGS = ('p', 'ul', 'ol', 'dl')
+
+EPISODE_MARKER_RE = re.compile(r'[ÉéE]pisode\s+\d+\s*[:：]')
+EPISODE_HEADING_RE = re.compile(r'[ÉéE]pisode\s+(\d+)\s*[:：]\s*(.+)')
+TITLE_WITH_ORIGINAL_RE = re.compile(r'^(.+?)\s*\((.+?)\)\s*$')
+REFERENCE_MARKER_RE = re.compile(r'\[\d+\]')
+
+# Air date patterns in priority order; "[^\n]*?" keeps each match within one line of a block
+_DATE = r'(\d{1,2}\s+\w+\s+\d{4})'
+AIR_DATE_PATTERNS = {
+    'france': [
+        re.compile(r'diffusé[e]?\s+[^\n]*?' + _DATE, re.IGNORECASE),
+        re.compile(r'(?:en\s+)?France[^\n]*?' + _DATE, re.IGNORECASE),
+    ],
+    'usa': [
+        re.compile(r'[ÉéE]tats-Unis[^\n]*?' + _DATE, re.IGNORECASE),
+        re.compile(r'(?:aux\s+)?USA[^\n]*?' + _DATE, re.IGNORECASE),
+        re.compile(r'diffusion\s+originale[^\n]*?' + _DATE, re.IGNORECASE),
+    ],
+}
+
+_FIELD_PATTERNS: Dict[str, Pattern] = {}
+
+
+def _field_pattern(keyword: str) -> Pattern:
+    """Compiled "Keyword: Value" / "Keyword = Value" pattern, built once per keyword"""
+    if keyword not in _FIELD_PATTERNS:
+        _FIELD_PATTERNS[keyword] = re.compile(rf'{keyword}\s*[:=]\s*([^\n,.]+)', re.IGNORECASE)
+    return _FIELD_PATTERNS[keyword]
+
+
+class Section(NamedTuple):
+    """A heading and the text of the paragraphs and lists that follow it"""
+    heading: str
+    blocks: List[str]
+
+
+def _heading_of(node: Tag) -> Optional[Tag]:
+    """Return the heading element a content-level node stands for, if any"""
+    if node.name in HEADING_TAGS:
+        return node
+    # Current MediaWiki markup wraps headings: <div class="mw-heading"><h3>..</h3><span class="mw-editsection">..</span></div>
+    if node.name == 'div' and 'mw-heading' in (node.get('class') or []):
+        return node.find(HEADING_TAGS)
+    return None
+
+
+def _heading_text(heading: Tag) -> str:
+    """Heading text without the "[modifier]" edit links of older MediaWiki markup"""
+    headline = heading.find('span', class_='mw-headline')
+    return (headline or heading).get_text().strip()
+
+
+def segment_sections(soup: BeautifulSoup) -> List[Section]:
+    """
+    Split a page into (heading, blocks) sections in a single pass
+
+    Walks the children of the article body once; every heading opens a new
+    section and the text of each paragraph or list is computed exactly once.
+
+    Args:
+        soup: Parsed Wikipedia page
+
+    Returns:
+        Sections in document order
+    """
+    container = soup.find('div', class_='mw-parser-output')
+    if container is None:
+        first_heading = soup.find(['h2', 'h3'])
+        if first_heading is None:
+            return []
+        container = first_heading.parent
+        if 'mw-heading' in (container.get('class') or []):
+            container = container.parent
+
+    sections = []
+    current = None
+    for node in container.children:
+        if not isinstance(node, Tag):
+            continue
+        heading = _heading_of(node)
+        if heading is not None:
+            current = Section(_heading_text(heading), [])
+            sections.append(current)
+        elif current is not None and node.name in SECTION_BLOCK_TAGS:
+            current.blocks.append(node.get_text())
+
+    return sections
+
+
+def segment_sections_lxml(root) -> List[Section]:
+    """
+    lxml counterpart of segment_sections, producing identical sections
+
+    Args:
+        root: lxml document tree of a Wikipedia page
+
+    Returns:
+        Sections in document order
+    """
+    containers = PARSER_OUTPUT_XPATH(root)
+    if containers:
+        container = containers[0]
+    else:
+        first_heading = next(root.iter('h2', 'h3'), None)
+        if first_heading is None:
+            return []
+        container = first_heading.getparent()
+        if 'mw-heading' in (container.get('class') or '').split():
+            container = container.getparent()
+
+    sections = []
+    current = None
+    for node in container:
+        if not is_element(node):
+            continue
+        heading = None
+        if node.tag in HEADING_TAGS:
+            heading = node
+        elif node.tag == 'div' and 'mw-heading' in (node.get('class') or '').split():
+            heading = next(node.iter(*HEADING_TAGS), None)
+        if heading is not None:
+            headlines = HEADLINE_XPATH(heading)
+            current = Section((headlines[0] if headlines else heading).text_content().strip(), [])
+            sections.append(current)
+        elif current is not None and node.tag in SECTION_BLOCK_TAGS:
+            current.blocks.append(node.text_content())
+
+    return sections
 
 
 class EpisodeParser:
     """Parses episode data from French Wikipedia season pages"""
 
-    def __init__(self, client: WikipediaClient):
+    def __init__(self, client: WikipediaClient, backend: Optional[str] = None, content_only: Optional[bool] = None):
         self.client = client
+        self.backend = resolve_backend(backend)
+        self.content_only = content_only
 
     def parse_season_page(self, season_number: int, url: str) -> Season:
         """
@@ -24,6 +162,71 @@ class EpisodeParser:
             season_number: Season number
             url: URL of the season page
 
+        Returns:
+            Season object with all episodes
+        """
+        html = self.client.get(url)
+        return self.parse_season_html(season_number, url, html)
+
+    def parse_season_pages(self, season_list: List[Tuple[int, str]],
+                           prefetched: Optional[Dict[str, str]] = None) -> List[Season]:
+        """
+        Fetch the season pages concurrently and parse them in season order
+
+        Args:
+            season_list: List of (season_number, url) tuples
+            prefetched: url -> HTML of pages already downloaded (e.g. by season discovery)
+
+        Returns:
+            List of Season objects, in the same order as season_list
+        """
+        return list(self.iter_season_pages(season_list, prefetched))
+
+    def iter_season_pages(self, season_list: List[Tuple[int, str]],
+                          prefetched: Optional[Dict[str, str]] = None) -> Iterator[Season]:
+        """
+        Fetch the season pages concurrently, yielding each season as soon as its page has arrived
+
+        Seasons come out in season_list order: a season is parsed as soon as its
+        own page is downloaded, while the later pages are still in flight.
+
+        Args:
+            season_list: List of (season_number, url) tuples
+            prefetched: url -> HTML of pages already downloaded (e.g. by season discovery)
+
+        Yields:
+            Season objects, in the same order as season_list
+        """
+        prefetched = prefetched or {}
+        fetchers = ThreadPoolExecutor(max_workers=HOST_MAX_CONCURRENCY, thread_name_prefix='season-fetch')
+        try:
+            pages = {
+                url: fetchers.submit(self.client.get, url)
+                for _, url in season_list if url not in prefetched
+            }
+            for season_number, url in season_list:
+                if url in prefetched:
+                    html = prefetched[url]
+                else:
+                    try:
+                        html = pages.pop(url).result()
+                    except Exception as e:
+                        logger.error(f"Fetch failed for {url}: {e}")
+                        html = None
+                yield self.parse_season_html(season_number, url, html)
+        finally:
+            # Also reached when the consumer stops early: drop the pages not requested yet
+            fetchers.shutdown(wait=True, cancel_futures=True)
+
+    def parse_season_html(self, season_number: int, url: str, html: Optional[str]) -> Season:
+        """
+        Parse an already fetched season page
+
+        Args:
+            season_number: Season number
+            url: URL of the season page
+            html: Page HTML, or None if the fetch failed
+
         Returns:
             Season object with all episodes
         """
@@ -32,25 +235,25 @@ class EpisodeParser:
         logger.info(f"URL: {url}")
         logger.info("="*60)
 
-        html = self.client.get(url)
         if not html:
             logger.error(f"Failed to fetch season {season_number} page")
             return Season(season_number=season_number, url=url, episodes=[])
 
-        soup = BeautifulSoup(html, 'lxml')
-
         # French Wikipedia uses H3 headings for episodes, not tables!
         # Pattern: "Épisode X: Title" or "Épisode X : Title"
         episodes = []
-        episode_headings = soup.find_all(['h2', 'h3'])
+        html = trim_page(html, self.content_only, url)
+        if self.backend == 'lxml':
+            sections = segment_sections_lxml(parse_lxml(html))
+        else:
+            sections = segment_sections(BeautifulSoup(html, 'lxml'))
 
-        logger.info(f"Found {len(episode_headings)} headings on page, filtering for episodes...")
+        logger.info(f"Found {len(sections)} sections on page, filtering for episodes...")
 
-        for heading in episode_headings:
-            heading_text = heading.get_text().strip()
+        for section in sections:
             # Check if this heading matches episode pattern
-            if self._is_episode_heading(heading_text):
-                episode = self._parse_episode_section(heading, season_number)
+            if self._is_episode_heading(section.heading):
+                episode = self._parse_episode_section(section, season_number)
                 if episode:
                     episodes.append(episode)
                     logger.debug(f"Parsed episode {episode.episode_number}: {episode.title_french}")
@@ -78,25 +281,24 @@ class EpisodeParser:
             True if this is an episode heading
         """
         # Pattern: "Épisode X:" or "Épisode X :" (with or without space before colon)
-        pattern = r'[ÉéE]pisode\s+\d+\s*[:：]'
-        return bool(re.search(pattern, heading_text))
+        return bool(EPISODE_MARKER_RE.search(heading_text))
 
-    def _parse_episode_section(self, heading: Tag, season_number: int) -> Optional[Episode]:
+    def _parse_episode_section(self, section: Section, season_number: int) -> Optional[Episode]:
         """
-        Parse an episode from its heading and following content
+        Parse an episode from its section
 
         Args:
-            heading: BeautifulSoup heading element
+            section: Heading text and content blocks of the episode section
             season_number: Season number
 
         Returns:
             Episode object or None
         """
-        heading_text = heading.get_text().strip()
+        heading_text = section.heading
 
         # Extract episode number and title from heading
         # Pattern: "Épisode X: Title" or "Épisode X : Title"
-        match = re.match(r'[ÉéE]pisode\s+(\d+)\s*[:：]\s*(.+)', heading_text)
+        match = EPISODE_HEADING_RE.match(heading_text)
         if not match:
             logger.warning(f"Could not parse heading: {heading_text}")
             return None
@@ -106,21 +308,18 @@ class EpisodeParser:
 
         # Look for English title in parentheses
         title_original = None
-        title_match = re.match(r'^(.+?)\s*\((.+?)\)\s*$', title_french)
+        title_match = TITLE_WITH_ORIGINAL_RE.match(title_french)
         if title_match:
             title_french = title_match.group(1).strip()
             title_original = title_match.group(2).strip()
 
-        # Get the content section after this heading (until next heading)
-        content = self._get_section_content(heading)
-
-        # Extract additional information from content
-        air_date_france = self._extract_air_date(content, 'france')
-        air_date_usa = self._extract_air_date(content, 'usa')
-        summary = self._extract_summary(content)
-        director = self._extract_field(content, ['réalisateur', 'réalisation'])
-        writer = self._extract_field(content, ['scénariste', 'scénario'])
-        production_code = self._extract_field(content, ['production'])
+        # Extract additional information from the section's blocks
+        air_date_france = self._extract_air_date(section.blocks, 'france')
+        air_date_usa = self._extract_air_date(section.blocks, 'usa')
+        summary = self._extract_summary(' '.join(section.blocks))
+        director = self._extract_field(section.blocks, ['réalisateur', 'réalisation'])
+        writer = self._extract_field(section.blocks, ['scénariste', 'scénario'])
+        production_code = self._extract_field(section.blocks, ['production'])
 
         episode = Episode(
             season_number=season_number,
@@ -137,56 +336,25 @@ class EpisodeParser:
 
         return episode
 
-    def _get_section_content(self, heading: Tag) -> str:
-        """
-        Get all text content following a heading until the next heading
-
-        Args:
-            heading: BeautifulSoup heading element
-
-        Returns:
-            Text content of the section
+    def _extract_air_date(self, blocks: List[str], country: str) -> Optional[str]:
         """
-        content_parts = []
-        current = heading.find_next_sibling()
-
-        while current and current.name not in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-            if current.name == 'p':
-                content_parts.append(current.get_text())
-            elif current.name in ['ul', 'ol', 'dl']:
-                content_parts.append(current.get_text())
-            current = current.find_next_sibling()
+        Extract air date from a section
 
-        return ' '.join(content_parts)
-
-    def _extract_air_date(self, content: str, country: str) -> Optional[str]:
-        """
-        Extract air date from content
+        Patterns are tried in priority order; each one only scans a single block,
+        so a keyword without a date cannot trigger a scan of the whole section.
 
         Args:
-            content: Section content text
+            blocks: Texts of the section's paragraphs and lists
             country: 'france' or 'usa'
 
         Returns:
             Air date string or None
         """
-        if country == 'france':
-            # Look for French date patterns
-            patterns = [
-                r'diffusé[e]?\s+.*?(\d{1,2}\s+\w+\s+\d{4})',
-                r'(?:en\s+)?France.*?(\d{1,2}\s+\w+\s+\d{4})',
-            ]
-        else:  # usa
-            patterns = [
-                r'[ÉéE]tats-Unis.*?(\d{1,2}\s+\w+\s+\d{4})',
-                r'(?:aux\s+)?USA.*?(\d{1,2}\s+\w+\s+\d{4})',
-                r'diffusion\s+originale.*?(\d{1,2}\s+\w+\s+\d{4})',
-            ]
-
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                return self._clean_text(match.group(1))
+        for pattern in AIR_DATE_PATTERNS[country]:
+            for block in blocks:
+                match = pattern.search(block)
+                if match:
+                    return self._clean_text(match.group(1))
 
         return None
 
@@ -212,12 +380,12 @@ class EpisodeParser:
 
         return self._clean_text(content[:500]) if content else None
 
-    def _extract_field(self, content: str, keywords: List[str]) -> Optional[str]:
+    def _extract_field(self, blocks: List[str], keywords: List[str]) -> Optional[str]:
         """
-        Extract a specific field from content using keywords
+        Extract a specific field from a section using keywords
 
         Args:
-            content: Section content text
+            blocks: Texts of the section's paragraphs and lists
             keywords: List of keywords to search for
 
         Returns:
@@ -225,10 +393,11 @@ class EpisodeParser:
         """
         for keyword in keywords:
             # Look for pattern: "Keyword: Value" or "Keyword = Value"
-            pattern = rf'{keyword}\s*[:=]\s*([^\n,.]+)'
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                return self._clean_text(match.group(1))
+            pattern = _field_pattern(keyword)
+            for block in blocks:
+                match = pattern.search(block)
+                if match:
+                    return self._clean_text(match.group(1))
 
         return None
 
@@ -246,9 +415,27 @@ class EpisodeParser:
             return None
 
         # Remove Wikipedia reference markers like [1], [2]
-        text = re.sub(r'\[\d+\]', '', text)
+        text = REFERENCE_MARKER_RE.sub('', text)
 
         # Remove extra whitespace
         text = ' '.join(text.split())
 
         return text if text else None
+
+
+def parse_season_document(url: str, html: Optional[str], season_number: int,
+                          backend: Optional[str] = None, content_only: Optional[bool] = None) -> Season:
+    """
+    Parse a fetched season page without a client, e.g. in a ParsePipeline worker process
+
+    Args:
+        url: URL of the season page
+        html: Page HTML, or None if the fetch failed
+        season_number: Season number
+        backend: Parse backend, or None for PARSE_BACKEND
+        content_only: Parse only mw-content-text, or None for PARSE_CONTENT_ONLY
+
+    Returns:
+        Season object with all episodes
+    """
+    return EpisodeParser(None, backend, content_only).parse_season_html(season_number, url, html)
@@ -0,0 +1,136 @@
+"""
+Fixture archive - records HTTP responses to a zip file and replays them offline
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional
+from loguru import logger
+
+FIXTURE_FORMAT_VERSION = 1
+
+
+class RecordedResponse(NamedTuple):
+    """A response as stored in the fixture archive"""
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: Optional[str]
+
+
+class FixtureArchive:
+    """
+    Versioned zip archive of recorded responses, one deflated JSON entry per URL
+
+    Entries are addressed by the SHA-1 of their URL, so replay needs no index.
+    A zip is only readable once close() has written its central directory, so
+    recording goes to a copy (<name>.partial) that replaces the archive on
+    close: an interrupted recording loses that session's responses, never the
+    ones recorded before.
+    """
+
+    def __init__(self, path: str, mode: str = 'r'):
+        """
+        Open a fixture archive
+
+        Args:
+            path: Path of the .zip archive
+            mode: 'r' to replay, 'a' to record (creating the archive if needed)
+        """
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.partial = None
+
+        if mode == 'a':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.partial = self.path.with_name(self.path.name + '.partial')
+            if self.path.exists():
+                shutil.copyfile(self.path, self.partial)
+            elif self.partial.exists():
+                self.partial.unlink()  # left behind by an interrupted recording
+        self.zip = zipfile.ZipFile(self.partial or self.path, mode, compression=zipfile.ZIP_DEFLATED)
+        self.names = set(self.zip.namelist())
+
+        if 'format.json' in self.names:
+            info = json.loads(self.zip.read('format.json'))
+            if info.get('format_version') != FIXTURE_FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported fixture archive version {info.get('format_version')} in {self.path} "
+                    f"(expected {FIXTURE_FORMAT_VERSION})"
+                )
+        elif mode == 'a':
+            self.zip.writestr('format.json', json.dumps({
+                'format_version': FIXTURE_FORMAT_VERSION,
+                'created': datetime.now().isoformat()
+            }))
+        else:
+            raise ValueError(f"Not a fixture archive: {self.path}")
+
+    @staticmethod
+    def _entry_name(url: str) -> str:
+        return f"responses/{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    def record(self, url: str, status: int, headers: Dict[str, str], body: Optional[str]):
+        """
+        Store a response; the first recording of a URL wins
+
+        Args:
+            url: Requested URL
+            status: HTTP status code
+            headers: Response headers
+            body: Decoded body, or None for error responses
+        """
+        name = self._entry_name(url)
+        with self.lock:
+            if name in self.names:
+                return
+            self.zip.writestr(name, json.dumps({
+                'url': url,
+                'status': status,
+                'headers': headers,
+                'body': body
+            }, ensure_ascii=False))
+            self.names.add(name)
+
+    def lookup(self, url: str) -> Optional[RecordedResponse]:
+        """
+        Find the recorded response for a URL
+
+        Args:
+            url: Requested URL
+
+        Returns:
+            RecordedResponse, or None if the URL was never recorded
+        """
+        name = self._entry_name(url)
+        if name not in self.names:
+            return None
+        with self.lock:
+            entry = json.loads(self.zip.read(name))
+        return RecordedResponse(entry['url'], entry['status'], entry['headers'], entry['body'])
+
+    def responses(self) -> Iterator[RecordedResponse]:
+        """Iterate over every recorded response"""
+        for name in sorted(self.names):
+            if name.startswith('responses/'):
+                with self.lock:
+                    entry = json.loads(self.zip.read(name))
+                yield RecordedResponse(entry['url'], entry['status'], entry['headers'], entry['body'])
+
+    def __len__(self) -> int:
+        return sum(1 for name in self.names if name.startswith('responses/'))
+
+    def close(self):
+        """Flush and close the archive; a recording replaces the archive on disk"""
+        with self.lock:
+            self.zip.close()
+            if self.partial:
+                os.replace(self.partial, self.path)
+                self.partial = None
+        logger.debug(f"Fixture archive closed: {self.path}")
@@ -2,64 +2,264 @@
 HTTP client for Wikipedia with rate limiting and retry logic
 """
 
+import asyncio
+import atexit
+import json
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from typing import Optional
+from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import Dict, Iterable, Optional
+from urllib.parse import unquote, urlencode, urlsplit
 from scraper.config import (
-    HEADERS, REQUEST_TIMEOUT, REQUEST_DELAY,
-    RETRY_MAX_ATTEMPTS, RETRY_BACKOFF_FACTOR
+    HEADERS, REQUEST_TIMEOUT, REQUEST_DELAY, MIN_REQUEST_DELAY, MAX_REQUEST_DELAY,
+    HOST_BURST, HOST_MAX_CONCURRENCY, HTTP_POOL_HOSTS, HTTP_POOL_SIZE,
+    RETRY_MAX_ATTEMPTS, RETRY_BACKOFF_FACTOR,
+    AIMD_INCREASE, AIMD_DECREASE_FACTOR, LATENCY_BACKOFF_RATIO, LATENCY_BACKOFF_MIN,
+    RETRY_BUDGET_RATIO, RETRY_BUDGET_MAX, DEFAULT_RETRY_AFTER,
+    CACHE_ENABLED, CACHE_PATH, CACHE_MAX_BYTES, CACHE_MAX_AGE,
+    HTTP_MODE, FIXTURE_PATH, API_PATH, API_BATCH_SIZE, MAXLAG, RATE_COORDINATOR_PATH
 )
+from scraper.fixtures import FixtureArchive
+from scraper.rate_coordinator import get_coordinator
+from scraper.rate_limit import AdaptiveRateLimiter, parse_retry_after
+from scraper.response_cache import ResponseCache
+
+
+class ThrottledError(requests.exceptions.RequestException):
+    """The server asked us to slow down (429, 503 or a MediaWiki maxlag error)"""
+
+    def __init__(self, url: str, status_code: int, retry_after: float):
+        super().__init__(f"Throttled ({status_code}), retry after {retry_after:.0f}s: {url}")
+        self.retry_after = retry_after
+
+
+def api_endpoint(page_url: str) -> str:
+    """Action API URL of the wiki serving a page (e.g. https://en.wikipedia.org/w/api.php)"""
+    parts = urlsplit(page_url)
+    return f"{parts.scheme}://{parts.netloc}{API_PATH}"
+
+
+def page_title(page_url: str) -> str:
+    """Page title from a /wiki/ URL, e.g. 'Walking Distance'"""
+    return unquote(urlsplit(page_url).path.split('/wiki/', 1)[-1]).replace('_', ' ')
+
+
+def _resolve_titles(query: Dict) -> Dict[str, str]:
+    """Map each requested title to the title of the page that answers it (normalization, then redirects)"""
+    normalized = {entry['from']: entry['to'] for entry in query.get('normalized', [])}
+    redirects = {entry['from']: entry['to'] for entry in query.get('redirects', [])}
+    resolved = {requested: redirects.get(title, title) for requested, title in normalized.items()}
+    for source, target in redirects.items():
+        resolved.setdefault(source, target)
+    return resolved
+
+
+def _should_retry(retry_state) -> bool:
+    """Retry timeouts, connection errors and throttling while the retry budget lasts"""
+    if not retry_state.outcome.failed:
+        return False
+    error = retry_state.outcome.exception()
+    if not isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError, ThrottledError)):
+        return False
+    client = retry_state.args[0]
+    if not client.limiter.spend_retry():
+        logger.warning("Retry budget exhausted, not retrying")
+        return False
+    return True
+
+
+_exponential_wait = wait_exponential(multiplier=RETRY_BACKOFF_FACTOR, min=4, max=60)
+
+
+def _retry_wait(retry_state) -> float:
+    """Throttled requests are held by the limiter's Retry-After pause; others back off exponentially"""
+    if isinstance(retry_state.outcome.exception(), ThrottledError):
+        return 0
+    return _exponential_wait(retry_state)
 
 
 class WikipediaClient:
     """HTTP client with rate limiting and error handling for Wikipedia scraping"""
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = CACHE_ENABLED, mode: str = HTTP_MODE, fixture_path: str = FIXTURE_PATH):
+        if mode not in ('live', 'record', 'replay', 'cache'):
+            raise ValueError(f"Unknown HTTP mode: {mode}")
+        self.mode = mode
+        self.fixtures = FixtureArchive(fixture_path, 'r' if mode == 'replay' else 'a') if mode in ('record', 'replay') else None
+        if mode == 'replay':
+            use_cache = False
+            logger.info(f"Replaying {len(self.fixtures)} recorded responses from {fixture_path}")
+        elif mode == 'cache':
+            use_cache = True
+        self._local = threading.local()
         self.session = requests.Session()
         self.session.headers.update(HEADERS)
-        self.last_request_time = 0
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.limiter = AdaptiveRateLimiter(
+            REQUEST_DELAY, MIN_REQUEST_DELAY, MAX_REQUEST_DELAY, HOST_BURST,
+            increase=AIMD_INCREASE,
+            decrease_factor=AIMD_DECREASE_FACTOR,
+            latency_ratio=LATENCY_BACKOFF_RATIO,
+            latency_floor=LATENCY_BACKOFF_MIN,
+            retry_budget_ratio=RETRY_BUDGET_RATIO,
+            retry_budget_max=RETRY_BUDGET_MAX,
+            # Only network modes take tokens; replay and cache modes never wait
+            coordinator=get_coordinator(RATE_COORDINATOR_PATH) if mode in ('live', 'record') else None
+        )
         self.request_count = 0
+        self.cache = ResponseCache(CACHE_PATH, CACHE_MAX_BYTES) if use_cache else None
+        self.cache_stats = {'hits': 0, 'revalidated': 0, 'misses': 0}
+        self._stats_lock = threading.Lock()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._semaphore_loop = None
 
-    def _rate_limit(self):
-        """Ensure minimum delay between requests"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < REQUEST_DELAY:
-            sleep_time = REQUEST_DELAY - elapsed
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f}s")
-            time.sleep(sleep_time)
-        self.last_request_time = time.time()
+    def _rate_limit(self, url: str, conditional: bool = False):
+        """
+        Ensure minimum delay between requests to the same host
+
+        Conditional requests only honor a Retry-After pause, not the regular spacing.
+        """
+        sleep_time = self.limiter.wait_if_blocked(url) if conditional else self.limiter.acquire(url)
+        if sleep_time > 0:
+            logger.debug(f"Rate limiting: slept {sleep_time:.2f}s for {urlsplit(url).netloc}")
+
+    def _count(self, key: str):
+        """Increment a cache counter (fetches may run on several threads)"""
+        with self._stats_lock:
+            self.cache_stats[key] += 1
+
+    def _check_throttled(self, url: str, response: requests.Response):
+        """Raise ThrottledError (and slow the host down) if the response asks us to back off"""
+        maxlag = response.headers.get('MediaWiki-API-Error') == 'maxlag'
+        if response.status_code not in (429, 503) and not maxlag:
+            return
+        retry_after = parse_retry_after(response.headers.get('Retry-After')) or DEFAULT_RETRY_AFTER
+        self.limiter.record_throttle(url, retry_after)
+        lag = response.headers.get('X-Database-Lag')
+        logger.warning(
+            f"Throttled by server (status {response.status_code}"
+            f"{', maxlag ' + lag + 's' if lag else ''}), pausing {urlsplit(url).netloc} for {retry_after:.0f}s"
+        )
+        raise ThrottledError(url, response.status_code, retry_after)
+
+    def get(self, url: str, use_cache: bool = True) -> Optional[str]:
+        """
+        Fetch a URL, honoring the record/replay/cache mode
+
+        In replay mode the response comes straight from the fixture archive,
+        with no network access and no delay. In cache mode it comes from the
+        response cache, however old, and a page never cached counts as missing.
+        In record mode every response is also written to the archive.
+
+        Args:
+            url: The URL to fetch
+            use_cache: False to bypass the response cache (e.g. API answers that must be current)
+
+        Returns:
+            HTML content as string, or None if page doesn't exist (404) or fails
+        """
+        if self.mode == 'replay':
+            recorded = self.fixtures.lookup(url)
+            if recorded is None:
+                logger.warning(f"Not in fixture archive: {url}")
+                return None
+            with self._stats_lock:
+                self.request_count += 1
+            return recorded.body
+
+        if self.mode == 'cache':
+            cached = self.cache.get(url)
+            if cached is None:
+                self._count('misses')
+                logger.warning(f"Not in response cache: {url}")
+                return None
+            self._count('hits')
+            return cached.body
+
+        self._local.response = None
+        body = self._get(url, use_cache)
+        if self.mode == 'record' and self._local.response:
+            status, headers = self._local.response
+            self.fixtures.record(url, status, headers, body)
+        return body
 
     @retry(
         stop=stop_after_attempt(RETRY_MAX_ATTEMPTS),
-        wait=wait_exponential(multiplier=RETRY_BACKOFF_FACTOR, min=4, max=60),
-        retry=retry_if_exception_type((requests.exceptions.Timeout, requests.exceptions.ConnectionError)),
+        wait=_retry_wait,
+        retry=_should_retry,
         reraise=True
     )
-    def get(self, url: str) -> Optional[str]:
+    def _get(self, url: str, use_cache: bool = True) -> Optional[str]:
         """
         Fetch a URL with rate limiting and retry logic
 
+        Cached pages are served directly while fresh, and otherwise revalidated
+        with If-None-Match / If-Modified-Since. Conditional requests skip the
+        rate-limit sleep: a 304 answer carries no body and costs the server
+        almost nothing. Throttling responses (429/503/maxlag) slow the host
+        down and are retried after the server's Retry-After.
+
         Args:
             url: The URL to fetch
+            use_cache: False to neither read nor store the response in the cache
 
         Returns:
             HTML content as string, or None if page doesn't exist (404) or fails
         """
-        self._rate_limit()
-        self.request_count += 1
+        cache = self.cache if use_cache else None
+        cached = cache.get(url) if cache else None
+        if cached and cached.is_fresh(CACHE_MAX_AGE):
+            self._count('hits')
+            self._local.response = (200, cached.conditional_headers())
+            logger.debug(f"Cache hit: {url}")
+            return cached.body
+
+        conditional_headers = cached.conditional_headers() if cached else {}
+        self._rate_limit(url, conditional=bool(conditional_headers))
+        with self._stats_lock:
+            self.request_count += 1
 
         logger.info(f"Fetching: {url} (Request #{self.request_count})")
 
         try:
+            started = time.monotonic()
             response = self.session.get(
                 url,
+                headers=conditional_headers,
                 timeout=REQUEST_TIMEOUT,
                 allow_redirects=True
             )
+            self._check_throttled(url, response)
+            self.limiter.record_success(url, time.monotonic() - started)
+
+            self._local.response = (response.status_code, dict(response.headers))
+
+            if response.status_code == 304 and cached:
+                self._local.response = (200, {**dict(response.headers), **cached.conditional_headers()})
+                self.cache.touch(url)
+                self._count('revalidated')
+                logger.success(f"Not modified, using cached copy: {url}")
+                return cached.body
+
             response.raise_for_status()
 
+            # A changed page means a full transfer; space the next request as usual
+            if conditional_headers:
+                self.limiter.charge(url)
+            self._count('misses')
+            if cache:
+                cache.put(
+                    url,
+                    response.text,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified')
+                )
+
             logger.success(f"Successfully fetched: {url} (Status: {response.status_code}, Size: {len(response.text)} bytes)")
             return response.text
 
@@ -83,11 +283,257 @@ class WikipediaClient:
             logger.error(f"Connection error: {url} - {e}")
             raise  # Will be retried by tenacity
 
+        except ThrottledError:
+            raise  # Will be retried by tenacity once the host's pause is over
+
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed: {url} - {e}")
             return None
 
+    def api_get(self, api_url: str, params: Dict[str, str]) -> Optional[dict]:
+        """
+        Call the MediaWiki Action API
+
+        Answers are never cached, and every call carries maxlag so that a
+        lagged server answers with a throttling error instead of extra load.
+
+        Args:
+            api_url: Action API endpoint (see api_endpoint)
+            params: Query parameters; format, formatversion and maxlag are added
+
+        Returns:
+            Decoded JSON answer, or None if the request or the API call failed
+        """
+        query = {'format': 'json', 'formatversion': '2', 'maxlag': str(MAXLAG), **params}
+        # Sorted parameters give a stable URL, so record/replay fixtures match
+        body = self.get(f"{api_url}?{urlencode(sorted(query.items()))}", use_cache=False)
+        if body is None:
+            return None
+        try:
+            data = json.loads(body)
+        except ValueError:
+            logger.error(f"API answer is not JSON: {api_url}")
+            return None
+        if 'error' in data:
+            logger.error(f"API error {data['error'].get('code')}: {data['error'].get('info')}")
+            return None
+        return data
+
+    def query_pages(self, urls: Iterable[str], params: Dict[str, str],
+                    keep_missing: bool = False) -> Dict[str, Optional[dict]]:
+        """
+        Run an action=query over many pages, API_BATCH_SIZE titles per request
+
+        Titles are grouped per wiki, followed through normalization and
+        redirects, and API continuations are requested until each batch is
+        complete (large answers, e.g. page contents, come in several parts).
+
+        Args:
+            urls: /wiki/ page URLs, possibly on several wikis
+            params: Query parameters besides action, titles and redirects (e.g. prop=revisions)
+            keep_missing: Return the page objects of missing pages (flagged 'missing') too,
+                so that only a failed call gives None
+
+        Returns:
+            URL -> page object of the answer, or None if the page is missing or the call failed
+        """
+        by_endpoint: Dict[str, Dict[str, str]] = {}
+        for url in dict.fromkeys(urls):
+            by_endpoint.setdefault(api_endpoint(url), {})[page_title(url)] = url
+
+        results: Dict[str, Optional[dict]] = {}
+        for endpoint, titles in by_endpoint.items():
+            title_list = list(titles)
+            for start in range(0, len(title_list), API_BATCH_SIZE):
+                batch = title_list[start:start + API_BATCH_SIZE]
+                request = {'action': 'query', 'redirects': '1', 'titles': '|'.join(batch), **params}
+                pages: Dict[str, dict] = {}
+                resolved: Dict[str, str] = {}
+                while True:
+                    data = self.api_get(endpoint, request)
+                    if data is None:
+                        break
+                    query = data.get('query', {})
+                    resolved.update(_resolve_titles(query))
+                    for page in query.get('pages', []):
+                        pages[page['title']] = {**pages.get(page['title'], {}), **page}
+                    if 'continue' not in data:
+                        break
+                    request = {**request, **data['continue']}
+                for title in batch:
+                    page = pages.get(resolved.get(title, title))
+                    results[titles[title]] = None if page is None or (page.get('missing') and not keep_missing) else page
+        return results
+
+    def head(self, url: str) -> Optional[int]:
+        """
+        Probe a URL with a HEAD request, which transfers no body
+
+        In replay and cache modes, a page that was recorded (cached) answers
+        with its recorded status (200), and any other page with 404. Probes
+        are never recorded: the archive keeps the GET bodies.
+
+        Args:
+            url: The URL to probe
+
+        Returns:
+            HTTP status code after redirects, or None if the request failed
+        """
+        if self.mode == 'replay':
+            recorded = self.fixtures.lookup(url)
+            return recorded.status if recorded else 404
+        if self.mode == 'cache':
+            return 200 if self.cache.get(url) else 404
+        if self.cache:
+            cached = self.cache.get(url)
+            if cached and cached.is_fresh(CACHE_MAX_AGE):
+                self._count('hits')
+                return 200
+
+        self._rate_limit(url)
+        with self._stats_lock:
+            self.request_count += 1
+        logger.info(f"Probing: {url} (Request #{self.request_count})")
+        try:
+            started = time.monotonic()
+            response = self.session.head(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+            if response.status_code in (429, 503):
+                retry_after = parse_retry_after(response.headers.get('Retry-After')) or DEFAULT_RETRY_AFTER
+                self.limiter.record_throttle(url, retry_after)
+                logger.warning(f"Throttled by server (status {response.status_code}) while probing {url}")
+                return None
+            self.limiter.record_success(url, time.monotonic() - started)
+            return response.status_code
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Probe failed: {url} - {e}")
+            return None
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Semaphore bounding in-flight requests per host on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._semaphore_loop:
+            self._semaphores = {}
+            self._semaphore_loop = loop
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(HOST_MAX_CONCURRENCY)
+        return self._semaphores[host]
+
+    async def aget(self, url: str) -> Optional[str]:
+        """
+        Asynchronously fetch a URL
+
+        The blocking fetch runs in a worker thread; at most HOST_MAX_CONCURRENCY
+        requests per host are in flight, and each host's token bucket still
+        spaces them by REQUEST_DELAY. Requests to different hosts never wait
+        on each other.
+
+        Args:
+            url: The URL to fetch
+
+        Returns:
+            HTML content as string, or None if the page is missing or the fetch failed
+        """
+        async with self._host_semaphore(url):
+            try:
+                return await asyncio.to_thread(self.get, url)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Giving up on {url} after retries: {e}")
+                return None
+
+    async def aget_many(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Fetch several URLs concurrently; returns a url -> HTML (or None) mapping"""
+        urls = list(dict.fromkeys(urls))
+        pages = await asyncio.gather(*(self.aget(url) for url in urls))
+        return dict(zip(urls, pages))
+
+    async def ahead(self, url: str) -> Optional[int]:
+        """Asynchronous head(), bounded like aget() to HOST_MAX_CONCURRENCY requests per host"""
+        async with self._host_semaphore(url):
+            return await asyncio.to_thread(self.head, url)
+
+    async def ahead_many(self, urls: Iterable[str]) -> Dict[str, Optional[int]]:
+        """Probe several URLs concurrently; returns a url -> status (or None) mapping"""
+        urls = list(dict.fromkeys(urls))
+        statuses = await asyncio.gather(*(self.ahead(url) for url in urls))
+        return dict(zip(urls, statuses))
+
+    def head_many(self, urls: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Probe several URLs concurrently from synchronous code
+
+        Must not be called from inside a running event loop (use ahead_many there).
+
+        Args:
+            urls: URLs to probe
+
+        Returns:
+            Dict mapping each URL to its HTTP status, or None if the probe failed
+        """
+        return asyncio.run(self.ahead_many(urls))
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Fetch several URLs concurrently from synchronous code
+
+        Must not be called from inside a running event loop (use aget_many there).
+
+        Args:
+            urls: URLs to fetch, possibly spanning several hosts
+
+        Returns:
+            Dict mapping each URL to its HTML, or None if it could not be fetched
+        """
+        return asyncio.run(self.aget_many(urls))
+
+    def stats(self) -> Dict[str, int]:
+        """Request and cache counters for the run summary"""
+        return {'requests': self.request_count, **self.cache_stats}
+
+    def summary(self) -> str:
+        """One-line request, cache and throttling summary for script output"""
+        stats = self.stats()
+        limits = self.limiter.report()
+        summary = (
+            f"{stats['requests']} requests, {stats['hits']} cache hits, "
+            f"{stats['revalidated']} revalidated, {stats['misses']} misses, "
+            f"{limits['throttled']} throttled"
+        )
+        for host, aggregate in limits['aggregate'].items():
+            summary += (
+                f"; {host}: {aggregate['rate']} req/s from {aggregate['processes']} processes"
+                f" (limit {aggregate['limit']})"
+            )
+        return summary
+
     def close(self):
-        """Close the session"""
+        """Close the session, the response cache and the fixture archive"""
         self.session.close()
+        if self.cache:
+            self.cache.close()
+        if self.fixtures:
+            self.fixtures.close()
         logger.debug("HTTP session closed")
+
+
+_shared_client: Optional[WikipediaClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> WikipediaClient:
+    """
+    Get the process-wide client used by the standalone scripts
+
+    Every caller shares one keep-alive connection pool, response cache,
+    rate limiter and set of counters. It is closed at interpreter exit, which
+    also finalizes a fixture archive being recorded.
+
+    Returns:
+        The shared WikipediaClient, created on first use
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = WikipediaClient()
+            atexit.register(_shared_client.close)
+        return _shared_client
@@ -0,0 +1,116 @@
+"""
+Append-only JSONL journal - constant-cost progress saving with crash-resume
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+from loguru import logger
+from scraper.config import JOURNAL_SYNC_EVERY, JOURNAL_SYNC_INTERVAL
+
+
+class EpisodeJournal:
+    """
+    Append-only log of scraped records, one JSON object per line
+
+    Appending a record costs one short write whatever the size of the dataset;
+    fsync is batched every `sync_every` records or `sync_interval` seconds,
+    whichever comes first. After a crash, replay() yields every record written
+    since the last compaction, and compact() folds them into a full snapshot
+    (written by the caller) before truncating the journal.
+    """
+
+    def __init__(self, path: str, sync_every: int = JOURNAL_SYNC_EVERY, sync_interval: float = JOURNAL_SYNC_INTERVAL):
+        """
+        Open (or create) a journal
+
+        Args:
+            path: Path of the .jsonl journal file
+            sync_every: Records appended between two fsyncs
+            sync_interval: Maximum seconds an appended record may stay unsynced
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._drop_torn_tail()
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def _drop_torn_tail(self):
+        """Cut a partial last line left by a crash, so new records start on a line of their own"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r+b') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+                logger.warning(f"Journal {self.path}: dropped a torn record left by an interrupted run")
+
+    def append(self, record: Dict):
+        """
+        Append one record, syncing to disk if the batch is full or old enough
+
+        Args:
+            record: JSON-serializable record
+        """
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.pending += 1
+        if self.pending >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Force appended records to disk"""
+        if self.pending:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def replay(self) -> Iterator[Dict]:
+        """
+        Yield the records written since the last compaction, oldest first
+
+        A torn line (crash in the middle of a write) ends the replay.
+        """
+        self.file.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Journal {self.path}: ignoring torn record at line {line_number}")
+                    return
+
+    def compact(self, write_snapshot: Callable[[], bool]) -> bool:
+        """
+        Fold the journal into a snapshot, then empty the journal
+
+        The snapshot is written first, so a crash in between only leaves
+        records that replaying on top of the snapshot applies again.
+
+        Args:
+            write_snapshot: Writes the full dataset; returns True on success
+
+        Returns:
+            True if the snapshot was written and the journal truncated
+        """
+        self.sync()
+        if not write_snapshot():
+            return False
+        self.file.truncate(0)
+        self.file.seek(0)
+        os.fsync(self.file.fileno())
+        logger.debug(f"Journal compacted: {self.path}")
+        return True
+
+    def close(self):
+        """Sync and close the journal file"""
+        self.sync()
+        self.file.close()
@@ -0,0 +1,175 @@
+"""
+Parse memo - remembers what was parsed out of each page revision, across scripts and runs
+"""
+
+import atexit
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from loguru import logger
+from scraper.config import MEMO_ENABLED, MEMO_PATH
+
+REVISION_RE = re.compile(r'"wgRevisionId"\s*:\s*(\d+)')
+
+
+def page_revision(html: str) -> str:
+    """
+    Revision key of a fetched page
+
+    Rendered Wikipedia pages name their revision in the page config
+    (wgRevisionId); other pages (fixtures, rendered dumps) are keyed by a
+    hash of their content.
+
+    Args:
+        html: Page HTML
+
+    Returns:
+        'rev:<id>' or 'sha1:<hex digest>'
+    """
+    match = REVISION_RE.search(html)
+    if match and match.group(1) != '0':
+        return f"rev:{match.group(1)}"
+    return f"sha1:{hashlib.sha1(html.encode('utf-8')).hexdigest()}"
+
+
+class ParseMemo:
+    """
+    Products parsed out of pages, keyed by kind, URL and page revision
+
+    A product is anything picklable a parser derives from one page (the French
+    data map of a season page, the plot/cast/crew of an episode page...). It is
+    kept in memory for the run and in SQLite across runs and scripts, one
+    revision per (kind, URL): a new revision replaces the old product.
+    Kinds carry a version suffix ('english_episode/1') to bump when the parser
+    changes, so older products are no longer matched.
+    """
+
+    def __init__(self, path: str = MEMO_PATH, enabled: bool = MEMO_ENABLED):
+        """
+        Open the memo
+
+        Args:
+            path: SQLite database file
+            enabled: False to parse every time (nothing is read or stored)
+        """
+        self.enabled = enabled
+        self.stats = {'hits': 0, 'misses': 0}
+        self._products: Dict[Tuple[str, str, str], Any] = {}
+        self.lock = threading.Lock()
+        self.conn = None
+        if not enabled:
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Parser worker processes share the file: wait for each other's writes instead of failing
+        self.conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS products (
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                revision TEXT NOT NULL,
+                product BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (kind, url)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def _load(self, kind: str, url: str, revision: str) -> Tuple[bool, Any]:
+        """(True, product) if the product of this revision is stored, else (False, None)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT product FROM products WHERE kind = ? AND url = ? AND revision = ?",
+                (kind, url, revision)
+            ).fetchone()
+        if row is None:
+            return False, None
+        try:
+            return True, pickle.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Unreadable memo entry for {kind} {url}: {e}")
+            return False, None
+
+    def _store(self, kind: str, url: str, revision: str, product: Any):
+        """Store the product of a revision, replacing the previous revision's"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO products (kind, url, revision, product, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, url, revision, pickle.dumps(product, pickle.HIGHEST_PROTOCOL), time.time())
+            )
+            self.conn.commit()
+
+    def product(self, kind: str, url: str, html: str, parse: Callable[[], Any]) -> Any:
+        """
+        Get what `parse` derives from a page, parsing only the first time a revision is seen
+
+        Args:
+            kind: Product kind, with a version suffix
+            url: Page URL
+            html: Fetched page, whose revision keys the product
+            parse: Called with no arguments on a miss; its result is memoized
+
+        Returns:
+            The product of this page revision
+        """
+        if not self.enabled:
+            return parse()
+        key = (kind, url, page_revision(html))
+        if key in self._products:
+            self.stats['hits'] += 1
+            return self._products[key]
+        found, product = self._load(*key)
+        if found:
+            self.stats['hits'] += 1
+            logger.debug(f"Memo hit: {kind} {url}")
+        else:
+            self.stats['misses'] += 1
+            product = parse()
+            self._store(*key, product)
+        self._products[key] = product
+        return product
+
+    def summary(self) -> str:
+        """One-line hit/miss summary for script output"""
+        if not self.enabled:
+            return "disabled"
+        return f"{self.stats['hits']} parses reused, {self.stats['misses']} parsed"
+
+    def close(self):
+        """Close the underlying database"""
+        if self.conn:
+            with self.lock:
+                self.conn.close()
+            self.conn = None
+
+
+_shared_memo: Optional[ParseMemo] = None
+_shared_memo_pid: Optional[int] = None
+_shared_memo_lock = threading.Lock()
+
+
+def get_shared_memo() -> ParseMemo:
+    """
+    Get the process-wide parse memo
+
+    Each process (parser workers included) opens its own connection to the
+    shared file; a forked worker never reuses its parent's.
+
+    Returns:
+        The shared ParseMemo, created on first use in this process
+    """
+    global _shared_memo, _shared_memo_pid
+    with _shared_memo_lock:
+        if _shared_memo is None or _shared_memo_pid != os.getpid():
+            _shared_memo = ParseMemo()
+            _shared_memo_pid = os.getpid()
+            atexit.register(_shared_memo.close)
+        return _shared_memo
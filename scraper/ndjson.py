@@ -0,0 +1,166 @@
+"""
+Streaming NDJSON output - one JSON record per line: a header, each episode as soon as it is
+parsed, and a trailer with the totals
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from loguru import logger
+from scraper.data_models import Episode, Season, TwilightZoneDatabase
+
+FORMAT = 'twilight-zone-episodes/1'  # header 'format' value; bump when records change shape
+
+
+class NDJSONWriter:
+    """
+    Write a series as a stream of records, flushed one line at a time
+
+    The header names the series and the seasons to come, each episode record
+    is a validated Episode, and the trailer carries the totals. A reader that
+    sees the trailer knows the stream is complete; a stream without one was
+    cut short. Only the per-season counts are kept in memory.
+    """
+
+    def __init__(self, output: Union[str, Path]):
+        """
+        Open the output
+
+        Args:
+            output: File path, or '-' for standard output
+        """
+        self.path = None if str(output) == '-' else Path(output)
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path, 'w', encoding='utf-8')
+        else:
+            self.file = sys.stdout
+        self.season_counts: Dict[int, int] = {}
+        self.series_title = None
+        self.scrape_date = None
+
+    def _write(self, record: Dict):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def header(self, series_title: str, season_list: List[Tuple[int, str]]):
+        """
+        Write the header record
+
+        Args:
+            series_title: Series title
+            season_list: (season_number, url) of the seasons that will follow
+        """
+        self.series_title = series_title
+        self.scrape_date = datetime.now().isoformat()
+        self._write({
+            'type': 'header',
+            'format': FORMAT,
+            'series_title': series_title,
+            'scrape_date': self.scrape_date,
+            'seasons': [{'season_number': number, 'url': url} for number, url in season_list],
+        })
+
+    def episode(self, episode: Episode):
+        """Write one episode record"""
+        self.season_counts[episode.season_number] = self.season_counts.get(episode.season_number, 0) + 1
+        self._write({'type': 'episode', **episode.model_dump()})
+
+    def season(self, season: Season):
+        """Write the episodes of a parsed season; a season without episodes is still counted"""
+        self.season_counts.setdefault(season.season_number, 0)
+        for episode in season.episodes:
+            self.episode(episode)
+
+    def trailer(self):
+        """Write the trailer record with the totals"""
+        self._write({
+            'type': 'trailer',
+            'total_seasons': len(self.season_counts),
+            'total_episodes': sum(self.season_counts.values()),
+            'season_episodes': {str(number): count for number, count in sorted(self.season_counts.items())},
+        })
+
+    def close(self):
+        """Close the output (standard output is left open)"""
+        if self.path:
+            self.file.close()
+            logger.success(f"Data streamed to {self.path} ({self.path.stat().st_size:,} bytes)")
+
+
+def iter_records(path: Union[str, Path], follow: bool = False, poll_interval: float = 0.5) -> Iterator[Dict]:
+    """
+    Read the records of an NDJSON stream
+
+    Args:
+        path: Stream file
+        follow: Keep waiting for new lines until the trailer, for a file still being written
+        poll_interval: Seconds between checks for new lines when following
+
+    Yields:
+        Records in stream order, the trailer last
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        partial = ''
+        while True:
+            line = f.readline()
+            if not line.endswith('\n'):
+                # End of the data written so far (possibly in the middle of a line)
+                partial += line
+                if not follow:
+                    if partial.strip():
+                        logger.warning(f"{path}: ignoring a truncated last record")
+                    return
+                time.sleep(poll_interval)
+                continue
+            line, partial = partial + line, ''
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield record
+            if record.get('type') == 'trailer':
+                return
+
+
+def iter_episodes(path: Union[str, Path], follow: bool = False) -> Iterator[Episode]:
+    """Validated episodes of an NDJSON stream, as they arrive when following"""
+    for record in iter_records(path, follow):
+        if record.get('type') == 'episode':
+            yield Episode.model_validate({k: v for k, v in record.items() if k != 'type'})
+
+
+def load_database(path: Union[str, Path]) -> Optional[TwilightZoneDatabase]:
+    """
+    Rebuild the full database of a complete NDJSON stream
+
+    Returns:
+        The database, or None if the stream has no header or no trailer
+    """
+    header = trailer = None
+    seasons: Dict[int, Season] = {}
+    for record in iter_records(path):
+        kind = record.get('type')
+        if kind == 'header':
+            header = record
+            seasons = {s['season_number']: Season(season_number=s['season_number'], url=s['url'])
+                       for s in record['seasons']}
+        elif kind == 'episode' and header:
+            episode = Episode.model_validate({k: v for k, v in record.items() if k != 'type'})
+            seasons[episode.season_number].episodes.append(episode)
+        elif kind == 'trailer':
+            trailer = record
+    if header is None or trailer is None:
+        logger.warning(f"{path}: incomplete stream (no {'header' if header is None else 'trailer'})")
+        return None
+    for season in seasons.values():
+        season.total_episodes = len(season.episodes)
+    return TwilightZoneDatabase(
+        series_title=header['series_title'],
+        total_seasons=trailer['total_seasons'],
+        total_episodes=trailer['total_episodes'],
+        scrape_date=header['scrape_date'],
+        seasons=[seasons[number] for number in sorted(seasons)]
+    )
@@ -0,0 +1,176 @@
+"""
+Parse backends - BeautifulSoup trees or native lxml trees queried with compiled XPath
+"""
+
+import re
+import time
+from typing import Optional
+import lxml.html
+from lxml import etree
+from loguru import logger
+from scraper.config import PARSE_BACKEND, PARSE_CONTENT_ONLY
+
+BACKENDS = ('bs4', 'lxml')
+
+CONTENT_START_RE = re.compile(r'<div\b[^>]*\bid="mw-content-text"', re.I)
+# Blocks dropped before tree construction: none of the parsers read them
+STRIPPED_BLOCK_RE = re.compile(r'<(div|table|ol)\b([^>]*)>', re.I)
+STRIPPED_CLASSES = frozenset(('navbox', 'vertical-navbox', 'navbox-styles', 'reflist', 'references', 'mw-references-wrap'))
+CLASS_ATTR_RE = re.compile(r'\bclass\s*=\s*"([^"]*)"', re.I)
+_TAG_SCANNERS = {}
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Pick the parse backend, defaulting to PARSE_BACKEND
+
+    Args:
+        backend: 'bs4', 'lxml' or None for the configured default
+
+    Returns:
+        Validated backend name
+    """
+    backend = backend or PARSE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parse backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return backend
+
+
+def _balanced_end(html: str, tag: str, start: int) -> int:
+    """
+    Find the end of the element whose opening tag ends at `start`
+
+    Counts nested opening and closing tags of the same name, so a <div>
+    holding other <div>s is cut as a whole.
+
+    Args:
+        html: Page HTML
+        tag: Lowercase tag name of the element
+        start: Offset just past the element's opening tag
+
+    Returns:
+        Offset just past the matching closing tag (end of the string if unbalanced)
+    """
+    scanner = _TAG_SCANNERS.get(tag)
+    if scanner is None:
+        scanner = _TAG_SCANNERS[tag] = re.compile(rf'<(/?){tag}\b[^>]*>', re.I)
+    depth = 1
+    for match in scanner.finditer(html, start):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return match.end()
+    return len(html)
+
+
+def strip_blocks(html: str) -> str:
+    """
+    Cut reference lists and navboxes out of raw HTML
+
+    Args:
+        html: HTML fragment
+
+    Returns:
+        The HTML without those elements
+    """
+    kept = []
+    position = 0
+    for match in STRIPPED_BLOCK_RE.finditer(html):
+        if match.start() < position:
+            continue  # inside a block that was already cut
+        classes = CLASS_ATTR_RE.search(match.group(2))
+        if not classes or STRIPPED_CLASSES.isdisjoint(classes.group(1).split()):
+            continue
+        kept.append(html[position:match.start()])
+        position = _balanced_end(html, match.group(1).lower(), match.end())
+    kept.append(html[position:])
+    return ''.join(kept)
+
+
+def content_region(html: str) -> Optional[str]:
+    """
+    Slice the mw-content-text element out of a full Wikipedia page
+
+    Args:
+        html: Full page HTML
+
+    Returns:
+        The element's HTML, or None if the page has no mw-content-text
+    """
+    match = CONTENT_START_RE.search(html)
+    if not match:
+        return None
+    opening_end = html.find('>', match.end()) + 1
+    return html[match.start():_balanced_end(html, 'div', opening_end)]
+
+
+def trim_page(html: str, content_only: Optional[bool] = None, url: Optional[str] = None) -> str:
+    """
+    Reduce a page to what the parsers read before a tree is built from it
+
+    Keeps only the mw-content-text element, minus reference lists and navboxes.
+    Pages without mw-content-text are returned unchanged.
+
+    Args:
+        html: Full page HTML
+        content_only: Whether to trim, or None for PARSE_CONTENT_ONLY
+        url: Page URL, only used in the log line
+
+    Returns:
+        HTML to hand to the parse backend
+    """
+    if not (PARSE_CONTENT_ONLY if content_only is None else content_only):
+        return html
+    started = time.perf_counter()
+    region = content_region(html)
+    if region is None:
+        return html
+    trimmed = strip_blocks(region)
+    logger.debug(
+        f"Trimmed {url or 'page'}: {len(html):,} -> {len(trimmed):,} chars "
+        f"({100 * (1 - len(trimmed) / len(html)):.0f}% dropped) in {1000 * (time.perf_counter() - started):.1f} ms"
+    )
+    return trimmed
+
+
+def parse_lxml(html: str) -> lxml.html.HtmlElement:
+    """Build a native lxml tree for a full HTML document"""
+    return lxml.html.document_fromstring(html)
+
+
+def has_class(name: str) -> str:
+    """XPath predicate matching elements whose class attribute contains `name`"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def is_element(node) -> bool:
+    """True for real elements (lxml also yields comments and processing instructions)"""
+    return isinstance(node.tag, str)
+
+
+def next_element(node) -> Optional[lxml.html.HtmlElement]:
+    """Next sibling element, like BeautifulSoup's find_next_sibling()"""
+    node = node.getnext()
+    while node is not None and not is_element(node):
+        node = node.getnext()
+    return node
+
+
+def single_string(node) -> Optional[str]:
+    """
+    Equivalent of BeautifulSoup's Tag.string
+
+    Returns the text if the element has exactly one child node, recursing
+    into a single child element; None otherwise.
+    """
+    children = (1 if node.text else 0) + len(node) + sum(1 for child in node if child.tail)
+    if children != 1:
+        return None
+    if node.text:
+        return node.text
+    child = node[0]
+    return single_string(child) if is_element(child) else None
+
+
+CONTENT_TEXT_XPATH = etree.XPath("//div[@id='mw-content-text']")
+PARSER_OUTPUT_XPATH = etree.XPath(f"//div[{has_class('mw-parser-output')}]")
+HEADLINE_XPATH = etree.XPath(f".//span[{has_class('mw-headline')}]")
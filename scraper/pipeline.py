@@ -0,0 +1,267 @@
+"""
+Fetch/parse pipeline - network fetching on threads, HTML parsing in worker processes
+"""
+
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from loguru import logger
+from scraper.config import HOST_MAX_CONCURRENCY, PARSE_WORKERS, PARSE_QUEUE_SIZE, LOG_LEVEL
+from scraper.http_client import WikipediaClient
+
+Interval = Tuple[float, float]
+
+_DONE = object()
+
+
+def _init_worker(log_level: str):
+    """Give each parser process a plain stderr logger (spawned workers start unconfigured)"""
+    logger.remove()
+    logger.add(sys.stderr, level=log_level)
+
+
+def _timed_parse(parse: Callable, url: str, html: Optional[str], args: tuple) -> Tuple[Any, float, float]:
+    """Run parse(url, html, *args) in a worker, returning the result with its wall-clock interval"""
+    started = time.time()
+    result = parse(url, html, *args)
+    return result, started, time.time()
+
+
+def _union(intervals: List[Interval]) -> List[Interval]:
+    """Merge overlapping intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _length(intervals: List[Interval]) -> float:
+    return sum(end - start for start, end in intervals)
+
+
+def _intersection(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    """Intersect two merged, sorted interval lists"""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start, end = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+class ParsePipeline:
+    """
+    Producer/consumer pipeline overlapping network waits with parsing
+
+    Fetcher threads download pages through the shared client and push the raw
+    HTML into a bounded queue; a dispatcher hands it to a ProcessPoolExecutor
+    with at most 2 x workers pages in flight. When parsing falls behind, the
+    queue fills up and the fetchers block (backpressure); when fetching falls
+    behind, the workers idle. Results come back in submission order.
+
+    The parse callable must be a picklable module-level function taking
+    (url, html, *args); html is None when the fetch failed. A page whose parse
+    fails (an exception in the parser, a worker process that died) is logged
+    and gets the result of parse(url, None, *args), as if its fetch had
+    failed, so one bad page never ends the run.
+    """
+
+    def __init__(self, client: WikipediaClient, parse: Callable, fetchers: int = HOST_MAX_CONCURRENCY,
+                 workers: int = PARSE_WORKERS, queue_size: int = PARSE_QUEUE_SIZE, log_level: str = LOG_LEVEL):
+        """
+        Set up a pipeline
+
+        Args:
+            client: Client used by the fetcher threads
+            parse: Module-level function (url, html, *args) -> result, run in worker processes
+            fetchers: Number of fetcher threads
+            workers: Number of parser processes
+            queue_size: Fetched pages allowed to wait for a parser
+            log_level: Log level inside the parser processes
+        """
+        self.client = client
+        self.parse = parse
+        self.fetchers = fetchers
+        self.workers = workers
+        self.queue_size = queue_size
+        self.log_level = log_level
+        self.fetch_intervals: List[Interval] = []
+        self.parse_intervals: List[Interval] = []
+        self.queue_full_waits = 0
+        self.parse_failures = 0
+        self.started = None
+        self.finished = None
+
+    def run(self, jobs: Iterable[Tuple[str, tuple]],
+            prefetched: Optional[Dict[str, str]] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Fetch and parse pages, yielding results in job order
+
+        Args:
+            jobs: (url, extra parse args) pairs
+            prefetched: url -> HTML of pages already downloaded, handed to the parsers without a fetch
+
+        Yields:
+            (url, parse result) pairs, in the order of `jobs`; the result of
+            parse(url, None, *args) for a page that could not be parsed
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        self.fetch_intervals = []
+        self.parse_intervals = []
+        self.queue_full_waits = 0
+        self.parse_failures = 0
+        self.started = time.time()
+        self.finished = None
+        pending = iter(enumerate(jobs))
+        pending_lock = threading.Lock()
+        pages = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue()
+        slots = threading.Semaphore(self.workers * 2)
+        stop = threading.Event()
+        stats_lock = threading.Lock()
+
+        def put_page(item):
+            """Put into the bounded queue, giving up if the pipeline is being torn down"""
+            if pages.full():
+                with stats_lock:
+                    self.queue_full_waits += 1
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def fetch_loop():
+            while not stop.is_set():
+                with pending_lock:
+                    job = next(pending, None)
+                if job is None:
+                    break
+                index, (url, args) = job
+                started = time.time()
+                if prefetched and url in prefetched:
+                    put_page((index, url, prefetched[url], args))
+                    continue
+                try:
+                    html = self.client.get(url)
+                except Exception as e:
+                    logger.error(f"Fetch failed for {url}: {e}")
+                    html = None
+                with stats_lock:
+                    self.fetch_intervals.append((started, time.time()))
+                put_page((index, url, html, args))
+            put_page(_DONE)
+
+        def on_parsed(index, url, args, future):
+            slots.release()
+            try:
+                result, started, finished = future.result()
+                with stats_lock:
+                    self.parse_intervals.append((started, finished))
+                results.put((index, url, args, result, None))
+            except BaseException as e:
+                results.put((index, url, args, None, e))
+
+        def dispatch_loop(pool):
+            done_fetchers = 0
+            while done_fetchers < self.fetchers and not stop.is_set():
+                try:
+                    item = pages.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    done_fetchers += 1
+                    continue
+                index, url, html, args = item
+                while not slots.acquire(timeout=0.1):
+                    if stop.is_set():
+                        return
+                if stop.is_set():
+                    return
+                try:
+                    future = pool.submit(_timed_parse, self.parse, url, html, args)
+                except Exception as e:  # BrokenProcessPool once a worker died
+                    slots.release()
+                    results.put((index, url, args, None, e))
+                    continue
+                future.add_done_callback(lambda f, index=index, url=url, args=args: on_parsed(index, url, args, f))
+
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.log_level,))
+        threads = [threading.Thread(target=fetch_loop, daemon=True) for _ in range(self.fetchers)]
+        dispatcher = threading.Thread(target=dispatch_loop, args=(pool,), daemon=True)
+        for thread in threads + [dispatcher]:
+            thread.start()
+
+        try:
+            ready: Dict[int, Tuple[str, Any]] = {}
+            next_index = 0
+            while next_index < len(jobs):
+                index, url, args, result, error = results.get()
+                if error is not None:
+                    logger.error(f"Parse failed for {url}: {error!r}")
+                    self.parse_failures += 1
+                    result = self.parse(url, None, *args)
+                ready[index] = (url, result)
+                while next_index in ready:
+                    yield ready.pop(next_index)
+                    next_index += 1
+        finally:
+            # Also reached when the consumer stops early
+            stop.set()
+            dispatcher.join()
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.finished = time.time()
+
+    def report(self) -> Dict[str, float]:
+        """
+        How well fetching and parsing overlapped during the last run()
+
+        Returns:
+            wall, fetch and parse busy time (seconds during which at least one
+            fetch / parse was running), their overlap, the share of the shorter
+            stage hidden behind the other, and the serial (inline) estimate
+        """
+        with_fetch = _union(self.fetch_intervals)
+        with_parse = _union(self.parse_intervals)
+        fetch_busy = _length(with_fetch)
+        parse_busy = _length(with_parse)
+        overlap = _length(_intersection(with_fetch, with_parse))
+        shorter = min(fetch_busy, parse_busy)
+        return {
+            'wall': round((self.finished or time.time()) - (self.started or time.time()), 2),
+            'fetch_busy': round(fetch_busy, 2),
+            'parse_busy': round(parse_busy, 2),
+            'overlap': round(overlap, 2),
+            'overlap_ratio': round(overlap / shorter, 2) if shorter else 0.0,
+            'serial_estimate': round(
+                sum(end - start for start, end in self.fetch_intervals)
+                + sum(end - start for start, end in self.parse_intervals), 2
+            ),
+            'queue_full_waits': self.queue_full_waits,
+            'parse_failures': self.parse_failures,
+        }
+
+    def summary(self) -> str:
+        """One-line overlap summary for script output"""
+        report = self.report()
+        return (
+            f"wall {report['wall']}s, fetching {report['fetch_busy']}s, parsing {report['parse_busy']}s, "
+            f"overlap {report['overlap']}s ({100 * report['overlap_ratio']:.0f}% of the shorter stage), "
+            f"inline estimate {report['serial_estimate']}s, {report['queue_full_waits']} backpressure waits, "
+            f"{report['parse_failures']} failed parses"
+        )
@@ -0,0 +1,276 @@
+"""
+Cross-process rate coordination - one token bucket per host, shared by every scraper process
+through a local SQLite file
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+from scraper.config import RATE_REPORT_WINDOW
+from scraper.rate_limit import TokenBucket
+
+
+class RateCoordinator:
+    """
+    Host token buckets stored in SQLite, so that concurrent scripts share one request budget
+
+    Each bucket row holds the host's tokens, refill rate and Retry-After pause.
+    Every reservation runs in an IMMEDIATE transaction, which SQLite serializes
+    across processes, so two scripts can never spend the same token. Wall-clock
+    time is used throughout, as monotonic clocks are not comparable between
+    processes. Each reservation is also logged with its send time and process,
+    for the aggregate rate report.
+
+    Additive increase is applied at most once per request interval (1/rate)
+    per host, whichever process asks, so N scrapers ramp a host's rate no
+    faster than one would.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the coordination file
+
+        Args:
+            path: SQLite database file shared by the cooperating processes
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                capacity REAL NOT NULL,
+                rate REAL NOT NULL,
+                updated REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0,
+                increased_at REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(buckets)")}
+        if 'increased_at' not in columns:  # coordination file created before additive increase was shared
+            self.conn.execute("ALTER TABLE buckets ADD COLUMN increased_at REAL NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS grants (host TEXT NOT NULL, sent_at REAL NOT NULL, pid INTEGER NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_grants_sent_at ON grants(sent_at)")
+
+    def _transaction(self, work):
+        """Run work(conn) in an IMMEDIATE transaction (exclusive among writers of every process)"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self.conn)
+                self.conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def bucket(self, host: str, rate: float, capacity: float) -> 'SharedTokenBucket':
+        """
+        Get the shared bucket of a host, creating its row if no process did yet
+
+        A row no process has used within RATE_REPORT_WINDOW is left over from an
+        earlier run: it is re-seeded with the caller's rate, so neither a ramped-up
+        nor a throttled-down rate outlives the run that reached it. A pause from
+        Retry-After that is still running is kept.
+
+        Args:
+            host: Host name
+            rate: Refill rate for a new or stale row (a row in use keeps its current rate)
+            capacity: Burst capacity, always taken from the caller
+
+        Returns:
+            Bucket with the TokenBucket interface
+        """
+        def create(conn):
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE host = ?", (host,)).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO buckets (host, tokens, capacity, rate, updated) VALUES (?, ?, ?, ?, ?)",
+                    (host, capacity, capacity, rate, now)
+                )
+            elif now - row[1] > RATE_REPORT_WINDOW:
+                conn.execute(
+                    "UPDATE buckets SET tokens = ?, capacity = ?, rate = ?, updated = ?, increased_at = 0 WHERE host = ?",
+                    (capacity, capacity, rate, now, host)
+                )
+            else:
+                conn.execute(
+                    "UPDATE buckets SET tokens = MIN(?, tokens), capacity = ? WHERE host = ?",
+                    (capacity, capacity, host)
+                )
+        self._transaction(create)
+        return SharedTokenBucket(self, host)
+
+    def reserve(self, host: str) -> float:
+        """
+        Take one token from a host's bucket, going into debt if it is empty
+
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        def take(conn):
+            now = time.time()
+            tokens, capacity, rate, updated, blocked_until = conn.execute(
+                "SELECT tokens, capacity, rate, updated, blocked_until FROM buckets WHERE host = ?", (host,)
+            ).fetchone()
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate) - 1
+            wait = 0.0 if tokens >= 0 else -tokens / rate
+            conn.execute("UPDATE buckets SET tokens = ?, updated = ? WHERE host = ?", (tokens, now, host))
+            conn.execute("INSERT INTO grants (host, sent_at, pid) VALUES (?, ?, ?)", (host, now + wait, os.getpid()))
+            conn.execute("DELETE FROM grants WHERE sent_at < ?", (now - RATE_REPORT_WINDOW,))
+            return wait
+        return self._transaction(take)
+
+    def rate(self, host: str) -> float:
+        """Current refill rate of a host, in requests per second"""
+        with self.lock:
+            return self.conn.execute("SELECT rate FROM buckets WHERE host = ?", (host,)).fetchone()[0]
+
+    def set_rate(self, host: str, rate: float):
+        """Change a host's refill rate for every process, crediting tokens earned at the old rate first"""
+        def update(conn):
+            now = time.time()
+            conn.execute(
+                """
+                UPDATE buckets
+                SET tokens = MIN(capacity, tokens + MAX(0, ? - updated) * rate), updated = ?, rate = ?
+                WHERE host = ?
+                """,
+                (now, now, rate, host)
+            )
+        self._transaction(update)
+
+    def increase_rate(self, host: str, amount: float, max_rate: float) -> float:
+        """
+        Additive increase of a host's rate, unless a process already applied one in the last interval
+
+        Returns:
+            Wall-clock time before which another increase would be skipped
+        """
+        def update(conn):
+            now = time.time()
+            rate, increased_at = conn.execute(
+                "SELECT rate, increased_at FROM buckets WHERE host = ?", (host,)
+            ).fetchone()
+            if now - increased_at < 1.0 / rate:
+                return increased_at + 1.0 / rate
+            new_rate = min(max_rate, rate + amount)
+            conn.execute(
+                """
+                UPDATE buckets
+                SET tokens = MIN(capacity, tokens + MAX(0, ? - updated) * rate), updated = ?, rate = ?,
+                    increased_at = ?
+                WHERE host = ?
+                """,
+                (now, now, new_rate, now, host)
+            )
+            return now + 1.0 / new_rate
+        return self._transaction(update)
+
+    def block(self, host: str, seconds: float):
+        """Pause a host for every process (server Retry-After)"""
+        def update(conn):
+            conn.execute(
+                "UPDATE buckets SET blocked_until = MAX(blocked_until, ?) WHERE host = ?",
+                (time.time() + seconds, host)
+            )
+        self._transaction(update)
+
+    def blocked_for(self, host: str) -> float:
+        """Seconds left in a host's pause (0 if it is not paused)"""
+        with self.lock:
+            row = self.conn.execute("SELECT blocked_until FROM buckets WHERE host = ?", (host,)).fetchone()
+        return max(0.0, row[0] - time.time()) if row else 0.0
+
+    def report(self, window: float = RATE_REPORT_WINDOW) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate request rate per host over the last `window` seconds, all processes together
+
+        Returns:
+            host -> {'requests', 'rate' (req/s), 'processes', 'limit' (current bucket rate, req/s)}
+        """
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute(
+                """
+                SELECT g.host, COUNT(*), COUNT(DISTINCT g.pid), MIN(g.sent_at), b.rate
+                FROM grants g JOIN buckets b ON b.host = g.host
+                WHERE g.sent_at BETWEEN ? AND ?
+                GROUP BY g.host
+                """,
+                (now - window, now)
+            ).fetchall()
+        report = {}
+        for host, requests, processes, first, limit in rows:
+            span = min(window, max(now - first, 1.0))
+            report[host] = {
+                'requests': requests,
+                'rate': round(requests / span, 3),
+                'processes': processes,
+                'limit': round(limit, 3),
+            }
+        return report
+
+    def close(self):
+        """Close the underlying database"""
+        with self.lock:
+            self.conn.close()
+        logger.debug(f"Rate coordinator closed: {self.path}")
+
+
+class SharedTokenBucket(TokenBucket):
+    """TokenBucket whose state lives in a RateCoordinator, so every process draws from it"""
+
+    def __init__(self, coordinator: RateCoordinator, host: str):
+        self.coordinator = coordinator
+        self.host = host
+        self.lock = threading.Lock()
+        # Before this wall-clock time another process's increase still holds: skip the transaction
+        self.next_increase = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.coordinator.rate(self.host)
+
+    def reserve(self) -> float:
+        return self.coordinator.reserve(self.host)
+
+    def set_rate(self, rate: float):
+        self.coordinator.set_rate(self.host, rate)
+
+    def increase_rate(self, amount: float, max_rate: float):
+        if time.time() < self.next_increase:
+            return
+        self.next_increase = self.coordinator.increase_rate(self.host, amount, max_rate)
+
+
+_coordinators: Dict[str, RateCoordinator] = {}
+_coordinators_lock = threading.Lock()
+
+
+def get_coordinator(path: Optional[str]) -> Optional[RateCoordinator]:
+    """
+    Get this process's coordinator for a file, or None when coordination is off
+
+    Args:
+        path: Coordination file, or None/empty to disable
+
+    Returns:
+        One RateCoordinator per file and process
+    """
+    if not path:
+        return None
+    with _coordinators_lock:
+        if path not in _coordinators:
+            _coordinators[path] = RateCoordinator(path)
+        return _coordinators[path]
@@ -0,0 +1,230 @@
+"""
+Rate limiting primitives - per-host token buckets shared by all fetching threads,
+with AIMD rate adaptation driven by server feedback
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `capacity` tokens"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token, going into debt if the bucket is empty
+
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def set_rate(self, rate: float):
+        """Change the refill rate, crediting tokens earned at the old rate first"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = rate
+
+    def increase_rate(self, amount: float, max_rate: float):
+        """Additive increase of the refill rate, capped at max_rate"""
+        self.set_rate(min(max_rate, self.rate + amount))
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the time slept"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """
+    One token bucket per host, so different Wikipedia hosts never wait on each other
+
+    With a RateCoordinator, the buckets are shared with every other process
+    using the same coordination file instead of being private to this one.
+    """
+
+    def __init__(self, delay: float, burst: float = 1.0, coordinator=None):
+        self.delay = delay
+        self.burst = burst
+        self.coordinator = coordinator
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Get (or lazily create) the bucket for the host of a URL"""
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                if self.coordinator:
+                    self.buckets[host] = self.coordinator.bucket(host, 1.0 / self.delay, self.burst)
+                else:
+                    self.buckets[host] = TokenBucket(1.0 / self.delay, self.burst)
+            return self.buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """Block until the URL's host allows another request"""
+        return self.bucket(url).acquire()
+
+    def charge(self, url: str):
+        """Consume a token without waiting, so the next request to this host is spaced"""
+        self.bucket(url).reserve()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP-date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter(HostRateLimiter):
+    """
+    Per-host token buckets whose rate follows additive-increase/multiplicative-decrease
+
+    Every healthy response adds `increase` requests/second to the host's rate,
+    up to 1/min_delay. A 429/503, a MediaWiki maxlag answer or a latency spike
+    (slower than latency_ratio times the running average and than latency_floor)
+    multiplies the rate by `decrease_factor`, down to 1/max_delay, and a
+    Retry-After delay pauses the host entirely. Retries draw on a shared budget
+    that successful requests refill, so a struggling server is not hammered
+    with retries. With a RateCoordinator, rate changes and pauses apply to
+    every cooperating process; the shared rate then grows by `increase` at most
+    once per request interval, however many processes report successes, while
+    each process still cuts it on its own throttles.
+    """
+
+    def __init__(self, delay: float, min_delay: float, max_delay: float, burst: float = 1.0,
+                 increase: float = 0.05, decrease_factor: float = 0.5, latency_ratio: float = 2.0, latency_floor: float = 1.0,
+                 retry_budget_ratio: float = 0.1, retry_budget_max: float = 10.0, coordinator=None):
+        super().__init__(delay, burst, coordinator)
+        self.min_rate = 1.0 / max_delay
+        self.max_rate = 1.0 / min_delay
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_ratio = latency_ratio
+        self.latency_floor = latency_floor
+        self.retry_budget_ratio = retry_budget_ratio
+        self.retry_budget_max = retry_budget_max
+        self.retry_budget = retry_budget_max
+        self.latency: Dict[str, float] = {}
+        self.blocked_until: Dict[str, float] = {}
+        self.throttle_count = 0
+
+    def wait_if_blocked(self, url: str) -> float:
+        """Sleep while the host is paused by a Retry-After; returns the time slept"""
+        host = urlsplit(url).netloc
+        wait = self.blocked_until.get(host, 0.0) - time.monotonic()
+        if self.coordinator:
+            wait = max(wait, self.coordinator.blocked_for(host))
+        if wait > 0:
+            time.sleep(wait)
+            return wait
+        return 0.0
+
+    def acquire(self, url: str) -> float:
+        """Block until the host is no longer paused and its bucket has a token"""
+        return self.wait_if_blocked(url) + self.bucket(url).acquire()
+
+    def record_success(self, url: str, latency: float):
+        """
+        Feed back a healthy response
+
+        Args:
+            url: URL that was fetched
+            latency: Seconds between sending the request and receiving the response
+        """
+        host = urlsplit(url).netloc
+        bucket = self.bucket(url)
+        with self.lock:
+            average = self.latency.get(host)
+            self.latency[host] = latency if average is None else 0.8 * average + 0.2 * latency
+            self.retry_budget = min(self.retry_budget_max, self.retry_budget + self.retry_budget_ratio)
+
+        if average is not None and latency > max(average * self.latency_ratio, self.latency_floor):
+            bucket.set_rate(max(self.min_rate, bucket.rate * self.decrease_factor))
+        else:
+            bucket.increase_rate(self.increase, self.max_rate)
+
+    def record_throttle(self, url: str, retry_after: Optional[float]):
+        """
+        Feed back a 429/503 or maxlag response
+
+        Args:
+            url: URL that was throttled
+            retry_after: Server-requested pause in seconds, if it sent one
+        """
+        host = urlsplit(url).netloc
+        bucket = self.bucket(url)
+        bucket.set_rate(max(self.min_rate, bucket.rate * self.decrease_factor))
+        with self.lock:
+            self.throttle_count += 1
+            if retry_after:
+                self.blocked_until[host] = max(self.blocked_until.get(host, 0.0), time.monotonic() + retry_after)
+        if retry_after and self.coordinator:
+            self.coordinator.block(host, retry_after)
+
+    def spend_retry(self) -> bool:
+        """Take one retry from the budget; False if the budget is exhausted"""
+        with self.lock:
+            if self.retry_budget < 1:
+                return False
+            self.retry_budget -= 1
+            return True
+
+    def report(self) -> Dict[str, object]:
+        """
+        Current per-host rates and latencies, plus the remaining retry budget
+
+        With a coordinator, 'aggregate' gives each host's recent request rate
+        summed over every cooperating process (see RateCoordinator.report).
+        """
+        with self.lock:
+            hosts = {
+                host: {
+                    'rate': round(bucket.rate, 3),
+                    'delay': round(1.0 / bucket.rate, 2),
+                    'latency': round(self.latency.get(host, 0.0), 3),
+                }
+                for host, bucket in self.buckets.items()
+            }
+        return {
+            'hosts': hosts,
+            'retry_budget': round(self.retry_budget, 1),
+            'throttled': self.throttle_count,
+            'aggregate': self.coordinator.report() if self.coordinator else {},
+        }
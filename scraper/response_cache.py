@@ -0,0 +1,147 @@
+"""
+Persistent HTTP response cache - stores Wikipedia pages on disk with their validators
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+from loguru import logger
+
+
+class CachedResponse(NamedTuple):
+    """A cached response body together with its HTTP validators"""
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    validated_at: float
+
+    def is_fresh(self, max_age: float) -> bool:
+        """True if the entry was fetched or revalidated less than max_age seconds ago"""
+        return max_age > 0 and (time.time() - self.validated_at) < max_age
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for revalidation"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Size-bounded on-disk response cache keyed by URL, with LRU eviction"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                validated_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self.conn.commit()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        Look up a cached response and mark it as recently used
+
+        Args:
+            url: The URL to look up
+
+        Returns:
+            CachedResponse, or None if the URL is not cached
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, validated_at FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+        body, etag, last_modified, validated_at = row
+        return CachedResponse(url, zlib.decompress(body).decode('utf-8'), etag, last_modified, validated_at)
+
+    def put(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]):
+        """
+        Store a response body and its validators, evicting old entries if needed
+
+        Args:
+            url: The URL that was fetched
+            body: Decoded response body
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+        """
+        compressed = zlib.compress(body.encode('utf-8'))
+        if len(compressed) > self.max_bytes:
+            logger.debug(f"Response too large to cache: {url} ({len(compressed)} bytes)")
+            return
+
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (url, body, etag, last_modified, size, validated_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, compressed, etag, last_modified, len(compressed), now, now)
+            )
+            self.conn.commit()
+            self._evict()
+
+    def touch(self, url: str):
+        """Mark an entry as revalidated (server answered 304 Not Modified)"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET validated_at = ?, last_access = ? WHERE url = ?",
+                (now, now, url)
+            )
+            self.conn.commit()
+
+    def total_size(self) -> int:
+        """Total compressed size of all cached bodies in bytes"""
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes (caller holds the lock)"""
+        total = self.total_size()
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for url, size in self.conn.execute(
+            "SELECT url, size FROM responses ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            evicted += 1
+        self.conn.commit()
+        logger.debug(f"Evicted {evicted} cached responses (cache size now {total:,} bytes)")
+
+    def close(self):
+        """Close the underlying database"""
+        with self.lock:
+            self.conn.close()
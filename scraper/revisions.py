@@ -0,0 +1,101 @@
+"""
+Revision tracking - finds which Wikipedia pages changed since the last run
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from loguru import logger
+from scraper.http_client import WikipediaClient
+
+
+class RevisionTracker:
+    """
+    Remembers the revision ID each page had when it was last scraped
+
+    refresh() asks the MediaWiki API for the current revision of many pages at
+    once (API_BATCH_SIZE titles per action=query&prop=revisions call) and
+    returns the pages whose revision differs from the stored one. Once a page
+    has been re-scraped and the output saved, commit() records its revision.
+    """
+
+    def __init__(self, client: WikipediaClient, state_path: str):
+        """
+        Load the stored revisions
+
+        Args:
+            client: Client used for the API calls
+            state_path: JSON file mapping page URL -> revision ID
+        """
+        self.client = client
+        self.state_path = Path(state_path)
+        self.stored: Dict[str, int] = {}
+        self.current: Dict[str, Optional[int]] = {}
+        if self.state_path.exists():
+            try:
+                self.stored = json.loads(self.state_path.read_text(encoding='utf-8'))
+            except ValueError as e:
+                logger.warning(f"Ignoring unreadable revision state {self.state_path}: {e}")
+
+    def fetch_revisions(self, urls: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Get the current revision ID of pages, API_BATCH_SIZE titles per request
+
+        Args:
+            urls: /wiki/ page URLs, possibly on several wikis
+
+        Returns:
+            URL -> revision ID, or None if the page is missing or the API call failed
+        """
+        pages = self.client.query_pages(urls, {'prop': 'revisions', 'rvprop': 'ids'})
+        revisions = {
+            url: page['revisions'][0]['revid'] if page and page.get('revisions') else None
+            for url, page in pages.items()
+        }
+
+        logger.info(f"Fetched current revisions of {len(revisions)} pages")
+        return revisions
+
+    def refresh(self, urls: Iterable[str]) -> List[str]:
+        """
+        Look up the current revisions and list the pages that changed
+
+        Pages never scraped, and pages whose revision could not be determined,
+        count as changed.
+
+        Args:
+            urls: Page URLs to check
+
+        Returns:
+            Changed URLs, in input order
+        """
+        urls = list(dict.fromkeys(urls))
+        self.current.update(self.fetch_revisions(urls))
+        changed = [
+            url for url in urls
+            if self.current.get(url) is None or self.current[url] != self.stored.get(url)
+        ]
+        logger.info(f"{len(changed)} of {len(urls)} pages changed since the last run")
+        return changed
+
+    def commit(self, urls: Iterable[str]):
+        """
+        Record the revisions seen by refresh() for pages that were re-scraped, and save the state
+
+        Pages that refresh() did not cover (e.g. discovered while scraping)
+        get their revision looked up now.
+
+        Args:
+            urls: URLs whose new content has been parsed and saved
+        """
+        urls = list(urls)
+        unknown = [url for url in urls if url not in self.current]
+        if unknown:
+            self.current.update(self.fetch_revisions(unknown))
+        for url in urls:
+            if self.current.get(url) is not None:
+                self.stored[url] = self.current[url]
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.state_path.with_suffix('.tmp')
+        temp_file.write_text(json.dumps(self.stored, ensure_ascii=False, indent=2, sort_keys=True), encoding='utf-8')
+        temp_file.replace(self.state_path)
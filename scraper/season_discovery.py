@@ -4,26 +4,36 @@ Season discovery module - finds all Twilight Zone season pages on French Wikiped
 
 from bs4 import BeautifulSoup
 from loguru import logger
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 import re
+import requests
+from lxml import etree
 from scraper.config import (
     BASE_URL, MAIN_PAGE_URL, SEASON_URL_PATTERN,
     MAX_SEASON_CHECK, CONSECUTIVE_FAILURES_THRESHOLD
 )
 from scraper.http_client import WikipediaClient
+from scraper.parse_backend import resolve_backend, parse_lxml
+
+LINK_HREFS_XPATH = etree.XPath("//a/@href")
+SEASON_LINK_RE = re.compile(r'/wiki/Saison_(\d+)_de_La_Quatri')
 
 
 class SeasonDiscovery:
     """Discovers all Twilight Zone season pages"""
 
-    def __init__(self, client: WikipediaClient):
+    def __init__(self, client: WikipediaClient, backend: Optional[str] = None):
         self.client = client
+        self.backend = resolve_backend(backend)
+        # Season pages downloaded in full while probing, handed over to the parser
+        self.prefetched: Dict[str, str] = {}
 
     def discover_seasons(self) -> List[Tuple[int, str]]:
         """
         Discover all season pages using two strategies:
         1. Parse main page for season links
-        2. Try sequential season URLs until consecutive failures
+        2. Probe the season URLs up to MAX_SEASON_CHECK, unless the main page
+           already lists seasons 1 to N without gaps
 
         Returns:
             List of (season_number, url) tuples
@@ -43,12 +53,16 @@ class SeasonDiscovery:
         else:
             logger.warning("No seasons found from main page")
 
-        # Strategy 2: Try sequential URLs (fallback or validation)
-        logger.info("Strategy 2: Attempting sequential season URLs")
-        sequential_seasons = self._try_sequential_urls()
+        # Strategy 2: Probe the season URLs (fallback or validation)
+        if self._is_conclusive(main_page_seasons):
+            logger.info("Strategy 2 skipped: the main page lists every season from 1 on")
+            probed_seasons = []
+        else:
+            logger.info("Strategy 2: Probing season URLs")
+            probed_seasons = self._probe_season_urls()
 
         # Merge and deduplicate
-        all_seasons = list(set(seasons + sequential_seasons))
+        all_seasons = list(set(seasons + probed_seasons))
         all_seasons.sort(key=lambda x: x[0])
 
         logger.info("="*60)
@@ -66,16 +80,19 @@ class SeasonDiscovery:
             logger.warning("Could not fetch main page")
             return []
 
-        soup = BeautifulSoup(html, 'lxml')
+        if self.backend == 'lxml':
+            hrefs = [str(href) for href in LINK_HREFS_XPATH(parse_lxml(html))]
+        else:
+            soup = BeautifulSoup(html, 'lxml')
+            hrefs = [link.get('href', '') for link in soup.find_all('a', href=True)]
+
         seasons = []
 
         # Look for links containing "Saison X de La Quatrième Dimension"
-        for link in soup.find_all('a', href=True):
-            href = link.get('href', '')
-
+        for href in hrefs:
             # Match pattern: /wiki/Saison_X_de_La_Quatrième_Dimension
             # Using partial match to handle URL encoding
-            match = re.search(r'/wiki/Saison_(\d+)_de_La_Quatri', href)
+            match = SEASON_LINK_RE.search(href)
             if match:
                 season_num = int(match.group(1))
                 full_url = BASE_URL + href if href.startswith('/') else href
@@ -88,21 +105,58 @@ class SeasonDiscovery:
 
         return seasons
 
-    def _try_sequential_urls(self) -> List[Tuple[int, str]]:
+    @staticmethod
+    def _is_conclusive(seasons: List[Tuple[int, str]]) -> bool:
+        """True if the main page links seasons 1 to N, one page each, with no gap"""
+        numbers = [season_num for season_num, _ in seasons]
+        return bool(numbers) and numbers == list(range(1, len(numbers) + 1))
+
+    def _probe_season_urls(self) -> List[Tuple[int, str]]:
         """
-        Try season URLs sequentially until consecutive failures
-        The original series had 5 seasons, but we check up to MAX_SEASON_CHECK
+        Find which season URLs exist, up to MAX_SEASON_CHECK, with as little transfer as possible
+
+        One batched API query tells which titles exist. Pages it cannot settle
+        (API unavailable) are probed concurrently with HEAD requests, and
+        pages whose HEAD probe fails are downloaded: those go to self.prefetched
+        for the parser. As with a sequential sweep, discovery stops after
+        CONSECUTIVE_FAILURES_THRESHOLD missing seasons in a row.
         """
+        candidates = [
+            (season_num, SEASON_URL_PATTERN.format(season_num=season_num))
+            for season_num in range(1, MAX_SEASON_CHECK + 1)
+        ]
+        urls = [url for _, url in candidates]
+        exists: Dict[str, bool] = {}
+
+        try:
+            pages = self.client.query_pages(urls, {}, keep_missing=True)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Title query failed, falling back to HEAD probes: {e}")
+            pages = {}
+        for url, page in pages.items():
+            if page is not None:
+                exists[url] = not (page.get('missing') or page.get('invalid'))
+
+        unsettled = [url for url in urls if url not in exists]
+        if unsettled:
+            logger.info(f"Probing {len(unsettled)} season URLs with HEAD requests")
+            for url, status in self.client.head_many(unsettled).items():
+                if status is not None and status < 500 and status not in (405, 501):
+                    exists[url] = status == 200
+
+        unsettled = [url for url in urls if url not in exists]
+        if unsettled:
+            logger.info(f"Downloading {len(unsettled)} season pages that could not be probed")
+            for url, html in self.client.get_many(unsettled).items():
+                # Valid page should have substantial content
+                exists[url] = bool(html) and len(html) > 1000
+                if exists[url]:
+                    self.prefetched[url] = html
+
         seasons = []
         consecutive_failures = 0
-
-        for season_num in range(1, MAX_SEASON_CHECK + 1):
-            url = SEASON_URL_PATTERN.format(season_num=season_num)
-
-            # Try to fetch the page
-            html = self.client.get(url)
-
-            if html and len(html) > 1000:  # Valid page should have substantial content
+        for season_num, url in candidates:
+            if exists[url]:
                 seasons.append((season_num, url))
                 logger.success(f"Confirmed season {season_num} exists")
                 consecutive_failures = 0
@@ -112,7 +166,7 @@ class SeasonDiscovery:
 
                 # Stop after consecutive failures threshold
                 if consecutive_failures >= CONSECUTIVE_FAILURES_THRESHOLD:
-                    logger.info(f"Stopping sequential discovery after {consecutive_failures} consecutive failures")
+                    logger.info(f"Stopping season discovery after {consecutive_failures} consecutive failures")
                     break
 
         return seasons
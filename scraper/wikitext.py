@@ -0,0 +1,371 @@
+"""
+Wikitext helpers - fetch page sources through the API, reduce them to plain text
+and read {{Episode list}} template calls
+"""
+
+import calendar
+import html
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+from scraper.http_client import WikipediaClient
+
+COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+REF_RE = re.compile(r'<ref\b[^>/]*/>|<ref\b[^>]*>.*?</ref\s*>', re.S | re.I)
+BREAK_RE = re.compile(r'<br\s*/?>', re.I)
+TAG_RE = re.compile(r'</?[a-zA-Z][^>]*>')
+EXTERNAL_LINK_RE = re.compile(r'\[(?:https?:)?//[^\s\]]+(?:\s+([^\]]*))?\]')
+EMPHASIS_RE = re.compile(r"'{2,}")
+HEADING_RE = re.compile(r'^(={2,6})\s*(.+?)\s*\1\s*$', re.M)
+REFERENCE_MARKER_RE = re.compile(r'\[\d+\]')
+LINK_TARGET_RE = re.compile(r'\[\[([^\]|#]+)')
+EPISODE_LIST_RE = re.compile(r'\{\{\s*[Ee]pisode[ _]list(?:/sublist)?\s*[|}]')
+
+# Characters MediaWiki leaves unescaped in /wiki/ links (wfUrlencode)
+TITLE_SAFE_CHARS = ';@$!*(),/~:'
+
+# Links to these namespaces are media or metadata, not text
+NON_TEXT_NAMESPACES = ('file', 'image', 'category', 'fichier', 'catégorie')
+
+
+def split_params(args: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    """Positional and named (lower-cased key) template arguments"""
+    positional = []
+    named = {}
+    for arg in args:
+        key, sep, value = arg.partition('=')
+        if sep and not any(mark in key for mark in ('{{', '[[')):
+            named[key.strip().lower()] = value.strip()
+        else:
+            positional.append(arg.strip())
+    return positional, named
+
+
+def _render_start_date(args: List[str]) -> str:
+    """{{Start date|Y|M|D}} the way Wikipedia renders it, e.g. 'October 2, 1959 (1959-10-02)' (non-breaking spaces)"""
+    positional, named = split_params(args)
+    parts = [int(part) for part in positional[:3] if part.isdigit()]
+    if not parts:
+        return ''
+    iso = '-'.join([f"{parts[0]:04d}"] + [f"{part:02d}" for part in parts[1:]])
+    if len(parts) == 1:
+        return f"{parts[0]}\xa0({iso})"
+    month = calendar.month_name[parts[1]]
+    if len(parts) == 2:
+        text = f"{month}\xa0{parts[0]}"
+    elif named.get('df', '').lower() in ('y', 'yes'):
+        text = f"{parts[2]}\xa0{month}\xa0{parts[0]}"
+    else:
+        text = f"{month}\xa0{parts[2]},\xa0{parts[0]}"
+    return f"{text}\xa0({iso})"
+
+
+def _render_joined(args: List[str]) -> str:
+    """Positional arguments joined by spaces, e.g. {{date|2|octobre|1959}} -> '2 octobre 1959'"""
+    positional, _ = split_params(args)
+    return ' '.join(arg for arg in positional if arg)
+
+
+# Inline templates whose rendering is plain text: name -> text, renderer(args),
+# or None to keep the last positional argument
+TEXT_TEMPLATES = {
+    "'": "'",
+    "'s": "'s",
+    'mdash': '—',
+    'em dash': '—',
+    'ndash': '–',
+    'snd': ' – ',
+    'nbsp': '\xa0',
+    'start date': _render_start_date,
+    'dagger': '†',
+    'double-dagger': '‡',
+    'date': _render_joined,
+    'date-': None,
+    'états-unis': 'États-Unis',
+    'france': 'France',
+    'nowrap': None,
+    'lang': None,
+    'small': None,
+}
+
+
+def fetch_wikitext(client: WikipediaClient, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Get the current wikitext of many pages, API_BATCH_SIZE titles per request
+
+    Args:
+        client: HTTP client
+        urls: /wiki/ page URLs
+
+    Returns:
+        URL -> wikitext, or None if the page is missing or could not be fetched
+    """
+    pages = client.query_pages(urls, {'prop': 'revisions', 'rvprop': 'ids|content', 'rvslots': 'main'})
+    texts = {}
+    for url, page in pages.items():
+        revisions = (page or {}).get('revisions')
+        texts[url] = revisions[0]['slots']['main'].get('content') if revisions else None
+    return texts
+
+
+def split_template_args(body: str) -> List[str]:
+    """Split a template body on the pipes that are not nested in links or templates"""
+    parts = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(body):
+        pair = body[i:i + 2]
+        if pair in ('{{', '[['):
+            depth += 1
+            i += 2
+            continue
+        if pair in ('}}', ']]'):
+            depth -= 1
+            i += 2
+            continue
+        if body[i] == '|' and depth == 0:
+            parts.append(body[start:i])
+            start = i + 1
+        i += 1
+    parts.append(body[start:])
+    return parts
+
+
+def render_text_template(body: str) -> str:
+    """Plain text of a template call: its text for the known inline templates, nothing otherwise"""
+    args = split_template_args(body)
+    name = args[0].strip().lower()
+    if name not in TEXT_TEMPLATES:
+        return ''
+    text = TEXT_TEMPLATES[name]
+    if callable(text):
+        return text(args[1:])
+    if text is not None:
+        return text
+    positional, _ = split_params(args[1:])
+    return positional[-1] if positional else ''
+
+
+def template_end(text: str, start: int) -> int:
+    """Index just past the }} closing the template call opened at `start`, or -1 if it is unterminated"""
+    depth = 0
+    i = start
+    while i < len(text) - 1:
+        pair = text[i:i + 2]
+        if pair == '{{':
+            depth += 1
+            i += 2
+        elif pair == '}}':
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return -1
+
+
+def replace_balanced(text: str, opening: str, closing: str, render) -> str:
+    """Replace every outermost opening...closing span (which may nest) with render(inner text)"""
+    out = []
+    depth = 0
+    start = 0
+    last = 0
+    i = 0
+    while i < len(text):
+        if text.startswith(opening, i):
+            if depth == 0:
+                out.append(text[last:i])
+                start = i + len(opening)
+            depth += 1
+            i += len(opening)
+        elif text.startswith(closing, i) and depth:
+            depth -= 1
+            i += len(closing)
+            if depth == 0:
+                out.append(render(text[start:i - len(closing)]))
+                last = i
+        else:
+            i += 1
+    out.append(text[last:] if depth == 0 else text[last:start - len(opening)])
+    return ''.join(out)
+
+
+def _render_link(body: str) -> str:
+    """Plain text of an internal link: its label, or its target; nothing for files and categories"""
+    target, _, label = body.partition('|')
+    namespace = target.split(':', 1)[0].strip().lower() if ':' in target else ''
+    if namespace in NON_TEXT_NAMESPACES:
+        return ''
+    if label:
+        return label.rsplit('|', 1)[-1]
+    return target.lstrip(':').split('#', 1)[0] or target
+
+
+def to_plain_text(wikitext: str) -> str:
+    """
+    Reduce wikitext to readable text
+
+    Drops comments, references, tables, files, categories and templates
+    (except a few inline text templates), keeps link labels and strips
+    emphasis and HTML tags.
+
+    Args:
+        wikitext: Wikitext markup
+
+    Returns:
+        Plain text, paragraphs separated by blank lines
+    """
+    text = COMMENT_RE.sub('', wikitext)
+    text = REF_RE.sub('', text)
+    text = replace_balanced(text, '{|', '|}', lambda inner: '')
+    text = replace_balanced(text, '{{', '}}', render_text_template)
+    text = replace_balanced(text, '[[', ']]', _render_link)
+    text = EXTERNAL_LINK_RE.sub(lambda match: match.group(1) or '', text)
+    text = EMPHASIS_RE.sub('', text)
+    text = BREAK_RE.sub(' ', text)
+    text = TAG_RE.sub('', text)
+    text = html.unescape(text)
+
+    paragraphs = []
+    for block in re.split(r'\n\s*\n', text):
+        lines = [line.strip() for line in block.split('\n') if line.strip() and not HEADING_RE.match(line.strip())]
+        if lines:
+            paragraphs.append(' '.join(lines))
+    return '\n\n'.join(paragraphs)
+
+
+def extract_section(wikitext: str, title: str) -> Optional[str]:
+    """
+    Wikitext of a level-2 section, subsections included
+
+    Args:
+        wikitext: Page wikitext
+        title: Section heading, e.g. 'Plot'
+
+    Returns:
+        The section body (without its heading), or None if the page has no such section
+    """
+    start = None
+    for match in HEADING_RE.finditer(wikitext):
+        if start is None:
+            if len(match.group(1)) == 2 and match.group(2).strip() == title:
+                start = match.end()
+        elif len(match.group(1)) == 2:
+            return wikitext[start:match.start()]
+    return wikitext[start:] if start is not None else None
+
+
+def section_paragraphs(wikitext: str, title: str, min_length: int = 20) -> List[str]:
+    """
+    Plain-text paragraphs of a level-2 section
+
+    Args:
+        wikitext: Page wikitext
+        title: Section heading, e.g. 'Plot'
+        min_length: Shorter paragraphs (captions, leftovers) are dropped
+
+    Returns:
+        Paragraph texts, empty if the section is missing
+    """
+    section = extract_section(wikitext, title)
+    if section is None:
+        return []
+    paragraphs = []
+    for paragraph in to_plain_text(section).split('\n\n'):
+        paragraph = ' '.join(REFERENCE_MARKER_RE.sub('', paragraph).split())
+        if len(paragraph) > min_length:
+            paragraphs.append(paragraph)
+    return paragraphs
+
+
+def normalize_title(title: str) -> str:
+    """Canonical page title: spaces instead of underscores, first letter upper-cased"""
+    title = ' '.join(title.replace('_', ' ').split())
+    return title[:1].upper() + title[1:]
+
+
+def title_href(title: str) -> str:
+    """/wiki/ path of a page title, encoded like Wikipedia's own links"""
+    return '/wiki/' + quote(normalize_title(title).replace(' ', '_'), safe=TITLE_SAFE_CHARS)
+
+
+def link_href(wikitext: str) -> Optional[str]:
+    """
+    /wiki/ path of the first internal link in a piece of wikitext, encoded like Wikipedia's own links
+
+    Args:
+        wikitext: Markup such as '[[Pilot (The X-Files)|Pilot]]'
+
+    Returns:
+        Path such as '/wiki/Pilot_(The_X-Files)', or None without a link
+    """
+    match = LINK_TARGET_RE.search(wikitext)
+    if not match:
+        return None
+    target = match.group(1).strip().lstrip(':')
+    return title_href(target) if target else None
+
+
+def iter_template_calls(wikitext: str, start_re: re.Pattern) -> Iterator[Dict[str, str]]:
+    """
+    Stream the template calls whose opening matches `start_re`, wherever they are nested
+
+    Args:
+        wikitext: Page wikitext
+        start_re: Pattern matching the opening of the calls, e.g. EPISODE_LIST_RE
+
+    Yields:
+        Raw arguments of each call: positional ones under '1', '2'..., named ones under their key
+    """
+    position = 0
+    while True:
+        match = start_re.search(wikitext, position)
+        if not match:
+            return
+        end = template_end(wikitext, match.start())
+        if end < 0:
+            return
+        args = split_template_args(wikitext[match.start() + 2:end - 2])
+        positional, named = split_params(args[1:])
+        params = {str(number): value for number, value in enumerate(positional, 1)}
+        params.update(named)
+        yield params
+        position = end
+
+
+def episode_list_entries(wikitext: str) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Stream the episodes of a page from its {{Episode list}} / {{Episode list/sublist}} calls
+
+    Reading the template parameters by name replaces guessing table columns
+    in the rendered HTML; the result is the text the rendered cell would show.
+
+    Args:
+        wikitext: Wikitext of an episode list or season page
+
+    Yields:
+        Dicts with episode_number_overall, episode_number, title, episode_href,
+        director, writer, air_date, production_code and short_summary
+        (None when the parameter is absent or empty)
+    """
+    def text(value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        return re.sub(r'[ \n]+', ' ', to_plain_text(value)).strip() or None
+
+    for params in iter_template_calls(wikitext, EPISODE_LIST_RE):
+        title = params.get('title', '')
+        summary = text(params.get('shortsummary'))
+        yield {
+            'episode_number_overall': text(params.get('episodenumber')),
+            'episode_number': text(params.get('episodenumber2')),
+            'title': text(title),
+            'episode_href': link_href(title),
+            'director': text(params.get('directedby')),
+            'writer': text(params.get('writtenby')),
+            'air_date': text(params.get('originalairdate')),
+            'production_code': text(params.get('prodcode')),
+            'short_summary': ' '.join(summary.split()) if summary else None,  # like the HTML cell text
+        }
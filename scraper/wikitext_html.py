@@ -0,0 +1,398 @@
+"""
+Light wikitext renderer - rebuilds the HTML structure the page parsers read from page sources
+"""
+
+import html
+import re
+from typing import Callable, List, Optional
+from scraper.wikitext import (
+    COMMENT_RE, REF_RE, EXTERNAL_LINK_RE, NON_TEXT_NAMESPACES,
+    split_template_args, split_params, template_end, replace_balanced, render_text_template,
+    normalize_title, title_href
+)
+
+HEADING_LINE_RE = re.compile(r'^(={2,6})\s*(.+?)\s*\1\s*$')
+ONLYINCLUDE_RE = re.compile(r'<onlyinclude>(.*?)</onlyinclude>', re.S)
+NOINCLUDE_BLOCK_RE = re.compile(r'<noinclude>.*?</noinclude>', re.S)
+INCLUDEONLY_BLOCK_RE = re.compile(r'<includeonly>.*?</includeonly>', re.S)
+INCLUSION_TAG_RE = re.compile(r'</?(?:noinclude|includeonly|onlyinclude)>')
+MAGIC_WORD_RE = re.compile(r'__[A-Z]+__')
+BOLD_ITALIC_RE = re.compile(r"'''''(.+?)'''''")
+BOLD_RE = re.compile(r"'''(.+?)'''")
+ITALIC_RE = re.compile(r"''(.+?)''")
+PLACEHOLDER_RE = re.compile(r'^\x00(\d+)\x00$')
+TABLE_START_RE = re.compile(r'^[ \t]*\{\|', re.M)
+
+# Cells of an {{Episode list}} row in Module:Episode list order:
+# (Episode list parameter, Episode table parameter, default column header)
+EPISODE_COLUMNS = (
+    ('episodenumber', 'overall', 'No. overall'),
+    ('episodenumber2', 'season', 'No. in season'),
+    ('title', 'title', 'Title'),
+    ('aux1', 'aux1', ''),
+    ('directedby', 'director', 'Directed by'),
+    ('writtenby', 'writer', 'Written by'),
+    ('aux2', 'aux2', ''),
+    ('aux3', 'aux3', ''),
+    ('originalairdate', 'airdate', 'Original air date'),
+    ('altdate', 'altdate', ''),
+    ('guests', 'guests', 'Guest(s)'),
+    ('musicalguests', 'musicalguests', 'Musical/entertainment guest(s)'),
+    ('prodcode', 'prodcode', 'Prod. code'),
+    ('viewers', 'viewers', 'U.S. viewers (millions)'),
+    ('aux4', 'aux4', ''),
+)
+
+# Infobox row labels for the parameters whose label differs from the parameter name
+INFOBOX_LABELS = {
+    'director': 'Directed by',
+    'writer': 'Written by',
+    'story': 'Story by',
+    'teleplay': 'Teleplay by',
+    'screenplay': 'Screenplay by',
+    'music': 'Music by',
+    'photographer': 'Cinematography by',
+    'cinematography': 'Cinematography by',
+    'editor': 'Edited by',
+    'producer': 'Produced by',
+    'guests': 'Guest appearances',
+    'airdate': 'Original air date',
+    'production': 'Production code',
+    'episode': 'Episode no.',
+}
+INFOBOX_SKIPPED_PARAMS = ('image', 'image_size', 'alt', 'caption', 'title', 'prev', 'next', 'episode_list')
+
+MAX_TRANSCLUSION_DEPTH = 3
+
+
+class WikitextRenderer:
+    """
+    Renders a page's wikitext to the subset of MediaWiki HTML the scrapers parse
+
+    Covers headings (wrapped in div.mw-heading), paragraphs, lists, links,
+    emphasis, wikitables, {{Episode table}} / {{Episode list}} rows (cells in
+    Module:Episode list order), infoboxes and page transclusion ({{:Title}}).
+    Other templates render as their text when they are simple inline
+    templates, and disappear otherwise. This is no full parser: the output is
+    only meant to give the page parsers the structure they expect.
+    """
+
+    def __init__(self, page_title: str, transclude: Optional[Callable[[str], Optional[str]]] = None):
+        """
+        Set up a renderer for one page
+
+        Args:
+            page_title: Title of the page being rendered ({{Episode list/sublist}} shows
+                        its summaries only on the page it names)
+            transclude: Returns the wikitext of another page, for {{:Title}} transclusions
+        """
+        self.page_title = normalize_title(page_title)
+        self.transclude = transclude
+        self.blocks: List[str] = []
+
+    def render(self, wikitext: str) -> str:
+        """
+        Render a whole page
+
+        Args:
+            wikitext: Page wikitext
+
+        Returns:
+            HTML document with the body in div#mw-content-text > div.mw-parser-output
+        """
+        self.blocks = []
+        text = self._expand(self._own_content(wikitext), 0)
+        text = self._extract_blocks(text)
+        body = self._render_lines(text)
+        title = html.escape(self.page_title, quote=True)
+        return (
+            f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head><body>'
+            f'<h1 id="firstHeading">{title}</h1>'
+            f'<div id="mw-content-text" class="mw-body-content"><div class="mw-parser-output">\n{body}\n</div></div>'
+            f'</body></html>'
+        )
+
+    @staticmethod
+    def _own_content(wikitext: str) -> str:
+        """Page text as shown on the page itself: includeonly parts dropped, comments and references removed"""
+        text = INCLUDEONLY_BLOCK_RE.sub('', wikitext)
+        text = INCLUSION_TAG_RE.sub('', text)
+        return REF_RE.sub('', COMMENT_RE.sub('', MAGIC_WORD_RE.sub('', text)))
+
+    @staticmethod
+    def _included_content(wikitext: str) -> str:
+        """Page text as transcluded elsewhere: onlyinclude parts if any, else without noinclude parts"""
+        parts = ONLYINCLUDE_RE.findall(wikitext)
+        text = ''.join(parts) if parts else NOINCLUDE_BLOCK_RE.sub('', wikitext)
+        text = INCLUSION_TAG_RE.sub('', text)
+        return REF_RE.sub('', COMMENT_RE.sub('', MAGIC_WORD_RE.sub('', text)))
+
+    def _expand(self, text: str, depth: int) -> str:
+        """Replace {{:Title}} transclusions by the transcluded page text"""
+        if self.transclude is None or depth >= MAX_TRANSCLUSION_DEPTH:
+            return text
+
+        def expand(body: str) -> str:
+            name = split_template_args(body)[0].strip()
+            if not name.startswith(':'):
+                return '{{' + body + '}}'
+            source = self.transclude(name[1:])
+            return self._expand(self._included_content(source), depth + 1) if source else ''
+
+        return replace_balanced(text, '{{', '}}', expand)
+
+    def _placeholder(self, html: str) -> str:
+        """Park rendered block HTML on a line of its own, out of reach of the line renderer"""
+        self.blocks.append(html)
+        return f'\n\x00{len(self.blocks) - 1}\x00\n'
+
+    def _extract_blocks(self, text: str) -> str:
+        """Render block-level templates and wikitables, leaving placeholders in the text"""
+        out = []
+        position = 0
+        while True:
+            template = text.find('{{', position)
+            table_match = TABLE_START_RE.search(text, position)
+            table = table_match.start() if table_match else -1
+            starts = [index for index in (template, table) if index >= 0]
+            if not starts:
+                out.append(text[position:])
+                return ''.join(out)
+
+            start = min(starts)
+            if start == table and start != template:
+                table_start = text.index('{|', start)
+                end = self._table_end(text, table_start)
+                out.append(text[position:table_start])
+                out.append(self._placeholder(self._render_wikitable(text[table_start + 2:end - 2])))
+                position = end
+                continue
+
+            end = template_end(text, start)
+            if end < 0:
+                out.append(text[position:])
+                return ''.join(out)
+            body = text[start + 2:end - 2]
+            name = split_template_args(body)[0].strip().lower().replace('_', ' ')
+            out.append(text[position:start])
+            if name == 'episode table':
+                out.append(self._placeholder(self._render_episode_table(body)))
+            elif name.startswith('episode list'):
+                out.append(self._placeholder(
+                    '<table class="wikitable plainrowheaders wikiepisodetable"><tbody>'
+                    + self._render_episode_rows(body) + '</tbody></table>'
+                ))
+            elif name.startswith('infobox'):
+                out.append(self._placeholder(self._render_infobox(body)))
+            else:
+                out.append(text[start:end])
+            position = end
+
+    @staticmethod
+    def _table_end(text: str, start: int) -> int:
+        """Index just past the |} closing the wikitable opened at `start` (nested tables included)"""
+        depth = 0
+        for match in re.finditer(r'^\s*(\{\||\|\})', text[start:], re.M):
+            depth += 1 if match.group(1) == '{|' else -1
+            if depth == 0:
+                return start + match.end()
+        return len(text)
+
+    def inline(self, text: str) -> str:
+        """Render inline markup: simple templates, links, external links and emphasis"""
+        text = replace_balanced(text, '{{', '}}', render_text_template)
+        text = replace_balanced(text, '[[', ']]', self._render_link)
+        text = EXTERNAL_LINK_RE.sub(lambda match: match.group(1) or '', text)
+        text = BOLD_ITALIC_RE.sub(r'<b><i>\1</i></b>', text)
+        text = BOLD_RE.sub(r'<b>\1</b>', text)
+        return ITALIC_RE.sub(r'<i>\1</i>', text).strip()
+
+    @staticmethod
+    def _render_link(body: str) -> str:
+        """Internal link as an <a>; files and categories disappear"""
+        target, _, label = body.partition('|')
+        namespace = target.split(':', 1)[0].strip().lower() if ':' in target else ''
+        if namespace in NON_TEXT_NAMESPACES:
+            return ''
+        target = target.strip().lstrip(':')
+        page = target.split('#', 1)[0]
+        label = label.rsplit('|', 1)[-1] if label else target
+        if not page:
+            return label
+        return f'<a href="{title_href(page)}" title="{html.escape(normalize_title(page), quote=True)}">{label}</a>'
+
+    def _render_lines(self, text: str) -> str:
+        """Render headings, paragraphs and lists line by line"""
+        out = []
+        paragraph: List[str] = []
+        items: List[str] = []
+        list_tag = None
+
+        def flush():
+            nonlocal list_tag
+            if paragraph:
+                out.append('<p>' + '\n'.join(paragraph) + '</p>')
+                paragraph.clear()
+            if items:
+                out.append(f'<{list_tag}>' + ''.join(items) + f'</{list_tag}>')
+                items.clear()
+                list_tag = None
+
+        for line in text.split('\n'):
+            stripped = line.strip()
+            placeholder = PLACEHOLDER_RE.match(stripped)
+            heading = HEADING_LINE_RE.match(stripped)
+            if placeholder:
+                flush()
+                out.append(self.blocks[int(placeholder.group(1))])
+            elif heading:
+                flush()
+                level = len(heading.group(1))
+                title = self.inline(heading.group(2))
+                anchor = html.escape(re.sub(r'<[^>]+>', '', title).replace(' ', '_'), quote=True)
+                out.append(f'<div class="mw-heading mw-heading{level}"><h{level} id="{anchor}">{title}</h{level}></div>')
+            elif stripped.startswith(('*', '#', ';', ':')):
+                if paragraph:
+                    flush()
+                tag = {'*': 'ul', '#': 'ol'}.get(stripped[0], 'dl')
+                if list_tag and list_tag != tag:
+                    flush()
+                list_tag = tag
+                content = stripped.lstrip('*#;:').strip()
+                if tag != 'dl':
+                    items.append(f'<li>{self.inline(content)}</li>')
+                elif stripped[0] == ';':
+                    term, _, definition = content.partition(' : ')
+                    items.append(f'<dt>{self.inline(term)}</dt>')
+                    if definition:
+                        items.append(f'<dd>{self.inline(definition)}</dd>')
+                else:
+                    items.append(f'<dd>{self.inline(content)}</dd>')
+            elif not stripped:
+                flush()
+            else:
+                if items:
+                    flush()
+                rendered = self.inline(stripped)
+                if rendered:
+                    paragraph.append(rendered)
+        flush()
+        return '\n'.join(out)
+
+    def _render_episode_table(self, body: str) -> str:
+        """{{Episode table}}: header row from the declared columns, then its {{Episode list}} rows"""
+        _, params = split_params(split_template_args(body)[1:])
+        headers = ''.join(
+            f'<th scope="col">{self.inline(params.get(column + "t") or label)}</th>'
+            for _, column, label in EPISODE_COLUMNS if column in params
+        )
+        rows = []
+        episodes = params.get('episodes', '')
+        for match in re.finditer(r'\{\{', episodes):
+            if rows and match.start() < rows[-1][0]:
+                continue
+            end = template_end(episodes, match.start())
+            if end < 0:
+                break
+            inner = episodes[match.start() + 2:end - 2]
+            if split_template_args(inner)[0].strip().lower().replace('_', ' ').startswith('episode list'):
+                rows.append((end, self._render_episode_rows(inner)))
+            else:
+                rows.append((end, ''))
+        return (
+            '<table class="wikitable plainrowheaders wikiepisodetable"><tbody>'
+            f'<tr>{headers}</tr>' + ''.join(html for _, html in rows) + '</tbody></table>'
+        )
+
+    def _render_episode_rows(self, body: str) -> str:
+        """One {{Episode list}} call: the episode row, then its summary row"""
+        args = split_template_args(body)
+        positional, params = split_params(args[1:])
+        cells = []
+        for key, _, _ in EPISODE_COLUMNS:
+            if key not in params:
+                continue
+            value = self.inline(params[key])
+            if key == 'episodenumber':
+                cells.append(f'<th scope="row">{value}</th>')
+                continue
+            if key == 'title':
+                value = f'"{value}"' + self.inline(params.get('rtitle', ''))
+                if params.get('alttitle'):
+                    value += '<br>"' + self.inline(params['alttitle']) + '"' + self.inline(params.get('raltitle', ''))
+            cells.append(f'<td>{value}</td>')
+        html = '<tr class="vevent">' + ''.join(cells) + '</tr>'
+
+        # A sublist only shows summaries on the page it belongs to, not where it is transcluded
+        is_sublist = args[0].strip().lower().endswith('/sublist')
+        summary = params.get('shortsummary')
+        if summary and (not is_sublist or (positional and normalize_title(positional[0]) == self.page_title)):
+            html += (
+                f'<tr class="expand-child"><td class="description" colspan="{len(cells)}">'
+                f'{self.inline(summary)}</td></tr>'
+            )
+        return html
+
+    def _render_infobox(self, body: str) -> str:
+        """Infobox: one labelled row per named parameter"""
+        _, params = split_params(split_template_args(body)[1:])
+        rows = []
+        if params.get('title'):
+            rows.append(f'<tr><th colspan="2" class="infobox-above">{self.inline(params["title"])}</th></tr>')
+        for name, value in params.items():
+            if not value or name in INFOBOX_SKIPPED_PARAMS:
+                continue
+            label = INFOBOX_LABELS.get(name, name.replace('_', ' ').capitalize())
+            lines = [line.strip() for line in value.split('\n') if line.strip()]
+            if any(line.startswith('*') for line in lines):
+                data = '<ul>' + ''.join(f'<li>{self.inline(line.lstrip("*").strip())}</li>' for line in lines) + '</ul>'
+            else:
+                data = '<br>'.join(self.inline(line) for line in lines)
+            rows.append(f'<tr><th scope="row" class="infobox-label">{label}</th><td class="infobox-data">{data}</td></tr>')
+        return '<table class="infobox vevent"><tbody>' + ''.join(rows) + '</tbody></table>'
+
+    def _render_wikitable(self, inner: str) -> str:
+        """{| ... |} table: rows on |-, cells on | / || and headers on ! / !!"""
+        lines = inner.split('\n')
+        attributes = lines[0].strip()
+        rows: List[List[str]] = [[]]
+        for line in lines[1:]:
+            stripped = line.strip()
+            if stripped.startswith('|-'):
+                rows.append([])
+            elif stripped.startswith('|+'):
+                continue
+            elif stripped.startswith('!'):
+                rows[-1].extend(self._render_cell('th', cell) for cell in stripped[1:].split('!!'))
+            elif stripped.startswith('|'):
+                rows[-1].extend(self._render_cell('td', cell) for cell in stripped[1:].split('||'))
+            elif rows[-1] and stripped:
+                # Continuation of the previous cell
+                tag_end = rows[-1][-1].rfind('</')
+                rows[-1][-1] = rows[-1][-1][:tag_end] + '\n' + self.inline(stripped) + rows[-1][-1][tag_end:]
+        body = ''.join('<tr>' + ''.join(cells) + '</tr>' for cells in rows if cells)
+        return f'<table {attributes}><tbody>{body}</tbody></table>'
+
+    def _render_cell(self, tag: str, cell: str) -> str:
+        """One table cell, with its optional 'attributes |' prefix"""
+        parts = split_template_args(cell)
+        attributes = ''
+        if len(parts) > 1 and '=' in parts[0]:
+            attributes = ' ' + parts[0].strip()
+            cell = '|'.join(parts[1:])
+        return f'<{tag}{attributes}>{self.inline(cell)}</{tag}>'
+
+
+def render_html(wikitext: str, page_title: str, transclude: Optional[Callable[[str], Optional[str]]] = None) -> str:
+    """
+    Render a page's wikitext to light HTML (see WikitextRenderer)
+
+    Args:
+        wikitext: Page wikitext
+        page_title: Title of the page
+        transclude: Returns the wikitext of another page, for {{:Title}} transclusions
+
+    Returns:
+        HTML document
+    """
+    return WikitextRenderer(page_title, transclude).render(wikitext)
@@ -0,0 +1,374 @@
+"""
+Distributed scrape work queue - page URLs leased to worker processes, with heartbeats,
+retries and dead-lettering
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from loguru import logger
+from scraper.config import (
+    QUEUE_BACKEND, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS, QUEUE_PATH, QUEUE_POLL_INTERVAL, QUEUE_RETRY_DELAY
+)
+
+
+class Task(NamedTuple):
+    """One page to fetch and parse"""
+    id: int
+    kind: str
+    url: str
+    args: Dict[str, Any]
+    attempts: int
+
+
+class WorkQueue(ABC):
+    """
+    Interface of a work queue backend
+
+    A task is identified by its (kind, URL) pair, so enqueueing a page twice is
+    a no-op. A leased task belongs to one worker until its lease expires; the
+    worker extends it with heartbeats while it works. A task whose lease
+    expires goes back to the queue (its worker is presumed dead), and a task
+    that has used up its attempts is dead-lettered instead of retried.
+    Results and arguments are JSON values.
+    """
+
+    @abstractmethod
+    def put_many(self, tasks: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]]) -> int:
+        """
+        Enqueue tasks, ignoring those already queued
+
+        Args:
+            tasks: (kind, url, args) triples
+
+        Returns:
+            Number of new tasks
+        """
+
+    def put(self, kind: str, url: str, args: Optional[Dict[str, Any]] = None) -> bool:
+        """Enqueue one task; False if it was already queued"""
+        return self.put_many([(kind, url, args)]) == 1
+
+    @abstractmethod
+    def lease(self, worker: str, lease_seconds: float = QUEUE_LEASE_SECONDS) -> Optional[Task]:
+        """
+        Take the next available task
+
+        Args:
+            worker: Worker identifier, checked by heartbeat/complete/fail
+            lease_seconds: Time the worker has before the task is handed out again
+
+        Returns:
+            The leased task, or None if no task is available right now
+        """
+
+    @abstractmethod
+    def heartbeat(self, task: Task, worker: str, lease_seconds: float = QUEUE_LEASE_SECONDS) -> bool:
+        """Extend a lease; False if the worker no longer holds it"""
+
+    @abstractmethod
+    def complete(self, task: Task, worker: str, result: Any) -> bool:
+        """Store a task's result; False (result dropped) if the worker no longer holds its lease"""
+
+    @abstractmethod
+    def fail(self, task: Task, worker: str, error: str) -> Optional[str]:
+        """
+        Give a task back after an error
+
+        Returns:
+            'pending' (retried later), 'dead' (out of attempts), or None if the worker no longer holds its lease
+        """
+
+    @abstractmethod
+    def outstanding(self) -> int:
+        """Tasks pending or leased, i.e. not yet done or dead"""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks per status (pending, leased, done, dead)"""
+
+    @abstractmethod
+    def results(self, kind: str) -> Iterator[Tuple[str, Dict[str, Any], Any]]:
+        """(url, args, result) of every done task of a kind"""
+
+    @abstractmethod
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Dead-lettered tasks: kind, url, attempts and last error"""
+
+    @abstractmethod
+    def retry_dead(self) -> int:
+        """Give every dead-lettered task a fresh set of attempts; returns how many"""
+
+    def close(self):
+        """Release the backend"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue in a local SQLite file, shared by the worker processes of one machine
+
+    Leasing runs in an IMMEDIATE transaction, which SQLite serializes across
+    processes, so a task is never handed to two workers at once. Lease expiry
+    uses wall-clock time, comparable between processes.
+    """
+
+    def __init__(self, path: str = QUEUE_PATH, max_attempts: int = QUEUE_MAX_ATTEMPTS,
+                 retry_delay: float = QUEUE_RETRY_DELAY):
+        """
+        Open (or create) a queue
+
+        Args:
+            path: SQLite database file
+            max_attempts: Leases a task gets before it is dead-lettered
+            retry_delay: Seconds before a failed task is retried, doubled on each further failure
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                args TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_until REAL,
+                result TEXT,
+                error TEXT,
+                UNIQUE (kind, url)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, available_at)")
+
+    def _transaction(self, work):
+        """Run work(conn) in an IMMEDIATE transaction (exclusive among writers of every process)"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self.conn)
+                self.conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def put_many(self, tasks: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]]) -> int:
+        rows = [(kind, url, json.dumps(args or {}, ensure_ascii=False)) for kind, url, args in tasks]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO tasks (kind, url, args) VALUES (?, ?, ?)", rows)
+            return conn.total_changes - before
+        return self._transaction(insert)
+
+    def lease(self, worker: str, lease_seconds: float = QUEUE_LEASE_SECONDS) -> Optional[Task]:
+        def take(conn):
+            now = time.time()
+            # Expired leases of tasks out of attempts: their last worker died holding them
+            conn.execute(
+                """
+                UPDATE tasks SET status = 'dead', lease_owner = NULL,
+                    error = COALESCE(error, 'lease expired on every attempt')
+                WHERE status = 'leased' AND lease_until < ? AND attempts >= ?
+                """,
+                (now, self.max_attempts)
+            )
+            row = conn.execute(
+                """
+                SELECT id, kind, url, args, attempts FROM tasks
+                WHERE (status = 'pending' AND available_at <= ?) OR (status = 'leased' AND lease_until < ?)
+                ORDER BY available_at, id LIMIT 1
+                """,
+                (now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            task_id, kind, url, args, attempts = row
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_until = ?, attempts = ? WHERE id = ?",
+                (worker, now + lease_seconds, attempts + 1, task_id)
+            )
+            return Task(task_id, kind, url, json.loads(args), attempts + 1)
+        return self._transaction(take)
+
+    def heartbeat(self, task: Task, worker: str, lease_seconds: float = QUEUE_LEASE_SECONDS) -> bool:
+        def extend(conn):
+            return conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time() + lease_seconds, task.id, worker)
+            ).rowcount == 1
+        return self._transaction(extend)
+
+    def complete(self, task: Task, worker: str, result: Any) -> bool:
+        def store(conn):
+            return conn.execute(
+                """
+                UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_owner = NULL, lease_until = NULL
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                (json.dumps(result, ensure_ascii=False), task.id, worker)
+            ).rowcount == 1
+        return self._transaction(store)
+
+    def fail(self, task: Task, worker: str, error: str) -> Optional[str]:
+        status = 'dead' if task.attempts >= self.max_attempts else 'pending'
+        available_at = time.time() + self.retry_delay * 2 ** (task.attempts - 1)
+
+        def release(conn):
+            changed = conn.execute(
+                """
+                UPDATE tasks SET status = ?, available_at = ?, error = ?, lease_owner = NULL, lease_until = NULL
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                (status, available_at, error, task.id, worker)
+            ).rowcount
+            return status if changed == 1 else None
+        return self._transaction(release)
+
+    def outstanding(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')").fetchone()[0]
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'dead': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def results(self, kind: str) -> Iterator[Tuple[str, Dict[str, Any], Any]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT url, args, result FROM tasks WHERE kind = ? AND status = 'done' ORDER BY id", (kind,)
+            ).fetchall()
+        for url, args, result in rows:
+            yield url, json.loads(args), json.loads(result)
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT kind, url, attempts, error FROM tasks WHERE status = 'dead' ORDER BY id"
+            ).fetchall()
+        return [{'kind': kind, 'url': url, 'attempts': attempts, 'error': error} for kind, url, attempts, error in rows]
+
+    def retry_dead(self) -> int:
+        def revive(conn):
+            return conn.execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0, available_at = 0 WHERE status = 'dead'"
+            ).rowcount
+        return self._transaction(revive)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+        logger.debug(f"Work queue closed: {self.path}")
+
+
+# Backend name -> factory taking the queue location; register another store (a server database...)
+# to spread workers over several machines
+BACKENDS: Dict[str, Callable[[str], WorkQueue]] = {'sqlite': SQLiteWorkQueue}
+
+
+def open_work_queue(location: str = QUEUE_PATH, backend: str = QUEUE_BACKEND) -> WorkQueue:
+    """
+    Open the work queue of the configured backend
+
+    Args:
+        location: Backend-specific location (a file path for 'sqlite')
+        backend: Name registered in BACKENDS
+
+    Returns:
+        WorkQueue instance
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown work queue backend '{backend}' (known: {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[backend](location)
+
+
+def worker_name() -> str:
+    """Identifier of this worker process, unique across machines"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(queue: WorkQueue, handlers: Dict[str, Callable[[Task], Tuple[Any, list]]],
+               lease_seconds: float = QUEUE_LEASE_SECONDS, poll_interval: float = QUEUE_POLL_INTERVAL) -> Dict[str, int]:
+    """
+    Lease and run tasks until the queue is drained
+
+    A handler returns (result, follow_ups): its JSON result and the
+    (kind, url, args) tasks it discovered, enqueued before the task is marked
+    done. An exception fails the task, which is retried or dead-lettered.
+    While a handler runs, a background thread renews the lease every third of
+    its duration. An idle worker keeps polling while other workers hold
+    leases, since their tasks may come back or enqueue follow-ups.
+
+    Args:
+        queue: Work queue
+        handlers: Task kind -> handler
+        lease_seconds: Lease duration
+        poll_interval: Seconds between polls of an idle worker
+
+    Returns:
+        Task counts: 'done', 'failed', 'lost' (lease expired before the result or failure was stored)
+    """
+    worker = worker_name()
+    stats = {'done': 0, 'failed': 0, 'lost': 0}
+    while True:
+        task = queue.lease(worker, lease_seconds)
+        if task is None:
+            if queue.outstanding() == 0:
+                return stats
+            time.sleep(poll_interval)
+            continue
+
+        stop = threading.Event()
+
+        def keep_alive(task=task, stop=stop):
+            while not stop.wait(lease_seconds / 3):
+                if not queue.heartbeat(task, worker, lease_seconds):
+                    logger.warning(f"Lost the lease of {task.kind} {task.url}")
+                    return
+
+        heartbeat = threading.Thread(target=keep_alive, daemon=True)
+        heartbeat.start()
+        try:
+            result, follow_ups = handlers[task.kind](task)
+        except Exception as e:
+            stop.set()
+            heartbeat.join()
+            status = queue.fail(task, worker, f"{type(e).__name__}: {e}")
+            if status is None:
+                # The lease expired while the handler ran: the task is someone else's now
+                stats['lost'] += 1
+                logger.warning(f"Failure not recorded, lease expired: {task.kind} {task.url} ({e})")
+                continue
+            stats['failed'] += 1
+            if status == 'dead':
+                logger.error(f"Dead-lettered after {task.attempts} attempts: {task.kind} {task.url} ({e})")
+            else:
+                logger.warning(f"Attempt {task.attempts} failed: {task.kind} {task.url} ({e})")
+            continue
+        stop.set()
+        heartbeat.join()
+        if follow_ups:
+            queue.put_many(follow_ups)
+        if queue.complete(task, worker, result):
+            stats['done'] += 1
+        else:
+            stats['lost'] += 1
+            logger.warning(f"Result dropped, lease expired: {task.kind} {task.url}")
@@ -1,44 +1,65 @@
 """
 Enrich X-Files episode JSON with plot summaries from individual Wikipedia episode pages.
-Reads web/data/x_files_episodes.json and fetches each episode's episode_url to extract
-the Plot section, then updates summary and plot fields and saves back.
+Reads web/data/x_files_episodes.json, gets the Plot section of each episode's episode_url,
+then updates summary and plot fields and saves back.
+
+By default each rendered episode page is fetched and its Plot section extracted from
+the HTML, as queue_worker.py and reparse.py do. --wikitext fetches the page sources
+through the MediaWiki API instead, 50 episodes per request: far fewer requests, but the
+text comes from the wikitext, so template-expanded content (quotes, dates, notes) can
+read differently from the rendered page. Every plot found is journaled, so an
+interrupted run resumes where it stopped.
 
 Usage:
-  python scripts/enrich_x_files_plots.py           # All episodes (~7 min)
-  python scripts/enrich_x_files_plots.py --limit 5  # First 5 only (test)
+  python scripts/enrich_x_files_plots.py             # All episodes
+  python scripts/enrich_x_files_plots.py --limit 5   # First 5 only (test)
+  python scripts/enrich_x_files_plots.py --wikitext  # Batched API requests, plots from the wikitext
 """
 
 import argparse
 import json
 import re
-import time
+import sys
 from pathlib import Path
 
 from bs4 import BeautifulSoup
-import requests
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scraper.config import API_BATCH_SIZE
+from scraper.http_client import get_shared_client
+from scraper.journal import EpisodeJournal
+from scraper.memo import get_shared_memo
+from scraper.wikitext import fetch_wikitext, section_paragraphs
 
-HEADERS = {'User-Agent': 'XFilesPlotEnricher/1.0 (Educational) Python-requests'}
-REQUEST_DELAY = 2.0  # seconds between requests
+JOURNAL_SUFFIX = '.plots.journal.jsonl'
+PLOT_MEMO = 'x_files_plot/1'  # parse memo kind; bump when extract_plot_from_episode_page changes
 
 
 def fetch_page(url):
-    """Fetch a Wikipedia page with rate limiting."""
+    """Fetch a Wikipedia page through the shared, rate-limited scraper client."""
     print(f"  Fetching: {url}")
-    time.sleep(REQUEST_DELAY)
     try:
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        return response.text
+        html = get_shared_client().get(url)
     except Exception as e:
         print(f"  [ERROR] {e}")
         return None
+    if not html:
+        print(f"  [ERROR] Page not available")
+    return html
+
+
+def is_heading_wrapper(tag):
+    """True for the div.mw-heading that newer Wikipedia markup wraps around headings."""
+    return tag is not None and tag.name == 'div' and 'mw-heading' in (tag.get('class') or [])
 
 
 def extract_plot_from_episode_page(html):
     """
     Extract the Plot section from an X-Files episode Wikipedia page.
     Returns the combined plot text or None if not found.
-    Wikipedia structure: h2#Plot (or with span.mw-headline), then paragraphs until next h2.
+    Wikipedia structure: h2#Plot (bare, with span.mw-headline, or wrapped in div.mw-heading),
+    then paragraphs until the next h2.
     """
     soup = BeautifulSoup(html, 'lxml')
     content = soup.find('div', id='mw-content-text')
@@ -56,26 +77,100 @@ def extract_plot_from_episode_page(html):
     if not plot_h2:
         return None
 
-    # Collect all p elements after Plot h2, until we hit the next h2
+    # Walk the siblings after the heading until the next h2
+    heading = plot_h2.parent if is_heading_wrapper(plot_h2.parent) else plot_h2
     paragraphs = []
-    for p in plot_h2.find_all_next('p', limit=50):
-        prev_h2 = p.find_previous('h2')
-        if prev_h2 and prev_h2 != plot_h2 and prev_h2.get_text().strip() != 'Plot':
-            break  # We've passed into next section
-        text = p.get_text().strip()
-        if text and len(text) > 20:
-            text = re.sub(r'\[\d+\]', '', text)
-            text = re.sub(r'\s+', ' ', text).strip()
-            paragraphs.append(text)
+    for sibling in heading.find_next_siblings():
+        if sibling.name == 'h2' or (is_heading_wrapper(sibling) and sibling.find('h2')):
+            break
+        for p in ([sibling] if sibling.name == 'p' else sibling.find_all('p')):
+            text = p.get_text().strip()
+            if text and len(text) > 20:
+                text = re.sub(r'\[\d+\]', '', text)
+                text = re.sub(r'\s+', ' ', text).strip()
+                paragraphs.append(text)
+
+    return ' '.join(paragraphs) if paragraphs else None
+
 
+def extract_plot_from_wikitext(wikitext):
+    """Extract the Plot section from an episode page's wikitext, as plain text (None if not found)."""
+    paragraphs = section_paragraphs(wikitext, 'Plot')
     return ' '.join(paragraphs) if paragraphs else None
 
 
+def select_episodes(data, limit):
+    """Episodes to process, in file order: (number, episode) pairs, first `limit` only if set."""
+    selected = []
+    for season in data.get('seasons', []):
+        for episode in season.get('episodes', []):
+            if limit is not None and len(selected) >= limit:
+                return selected
+            selected.append((len(selected) + 1, episode))
+    return selected
+
+
+def apply_plot(episode, plot):
+    """Store a plot on an episode, with a 500-character summary."""
+    episode['summary'] = plot[:500] + '...' if len(plot) > 500 else plot
+    episode['plot'] = plot
+    # Clean title if needed
+    if episode.get('title_original'):
+        episode['title_original'] = episode['title_original'].replace('"‡', '').replace('‡', '').strip()
+
+
+def replay_journal(journal, data, extractor):
+    """Apply plots journaled by an interrupted run with the same extractor; returns the episode URLs already done."""
+    by_url = {}
+    for season in data.get('seasons', []):
+        for episode in season.get('episodes', []):
+            if episode.get('episode_url'):
+                by_url.setdefault(episode['episode_url'], []).append(episode)
+
+    done = set()
+    for record in journal.replay():
+        if record.get('extractor', extractor) != extractor:
+            continue  # the other extractor's text: fetch again so the dataset stays consistent
+        for episode in by_url.get(record.get('episode_url'), []):
+            apply_plot(episode, record['plot'])
+        done.add(record.get('episode_url'))
+    return done
+
+
+def plots_per_page(episodes):
+    """Yield (url, plot) for each episode, fetching and parsing its rendered page."""
+    for number, episode in episodes:
+        ep_title = episode.get('title_original', '')[:30]
+        print(f"[{number}] {ep_title}...")
+        url = episode['episode_url']
+        html = fetch_page(url)
+        if not html:
+            yield url, None
+            continue
+        yield url, get_shared_memo().product(PLOT_MEMO, url, html, lambda: extract_plot_from_episode_page(html))
+
+
+def plots_batched(episodes):
+    """Yield (url, plot) for each episode, fetching page sources API_BATCH_SIZE at a time."""
+    urls = list(dict.fromkeys(episode['episode_url'] for _, episode in episodes))
+    for start in range(0, len(urls), API_BATCH_SIZE):
+        batch = urls[start:start + API_BATCH_SIZE]
+        print(f"  Fetching sources of episodes {start + 1}-{start + len(batch)} of {len(urls)}")
+        texts = fetch_wikitext(get_shared_client(), batch)
+        for url in batch:
+            yield url, extract_plot_from_wikitext(texts[url]) if texts.get(url) else None
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--limit', type=int, default=None, help='Limit number of episodes to process (for testing)')
+    parser.add_argument('--wikitext', action='store_true',
+                        help='Batched API requests, plots extracted from the wikitext instead of the rendered pages')
     args = parser.parse_args()
 
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")  # progress is printed; only surface HTTP problems
+
     project_root = Path(__file__).parent.parent
     data_path = project_root / 'web' / 'data' / 'x_files_episodes.json'
 
@@ -86,47 +181,50 @@ def main():
     with open(data_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    total = 0
-    enriched = 0
+    journal = EpisodeJournal(str(data_path.with_suffix(JOURNAL_SUFFIX)))
+    extractor = 'wikitext' if args.wikitext else 'html'
+    done = replay_journal(journal, data, extractor)
+    if done:
+        print(f"[RESUME] {len(done)} plots already fetched by an interrupted run")
+
+    selected = select_episodes(data, args.limit)
+    total = len(selected)
+    todo = [
+        (number, episode) for number, episode in selected
+        if episode.get('episode_url', '').startswith('http') and episode['episode_url'] not in done
+    ]
+    by_url = {}
+    for _, episode in todo:
+        by_url.setdefault(episode['episode_url'], []).append(episode)
+
+    enriched = sum(1 for _, episode in selected if episode.get('episode_url') in done)
     failed = 0
-    remaining = args.limit
-    done = False
-
-    for season in data.get('seasons', []):
-        if done:
-            break
-        for episode in season.get('episodes', []):
-            if args.limit is not None and remaining <= 0:
-                done = True
-                break
-            total += 1
-            if args.limit is not None:
-                remaining -= 1
-            url = episode.get('episode_url')
-            if not url or not url.startswith('http'):
-                continue
-
-            ep_title = episode.get('title_original', '')[:30]
-            print(f"[{total}] {ep_title}...")
-            html = fetch_page(url)
-            plot = extract_plot_from_episode_page(html) if html else None
-            if plot:
-                episode['summary'] = plot[:500] + '...' if len(plot) > 500 else plot
-                episode['plot'] = plot
-                enriched += 1
-                # Clean title if needed
-                if episode.get('title_original'):
-                    episode['title_original'] = episode['title_original'].replace('"‡', '').replace('‡', '').strip()
-            else:
-                failed += 1
-
-    with open(data_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    plots = plots_batched(todo) if args.wikitext else plots_per_page(todo)
+    for url, plot in plots:
+        episodes = by_url.get(url, [])
+        if plot:
+            for episode in episodes:
+                apply_plot(episode, plot)
+            journal.append({'episode_url': url, 'plot': plot, 'extractor': extractor})
+            enriched += len(episodes)
+        else:
+            failed += len(episodes)
+
+    def save():
+        with open(data_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return True
+
+    journal.compact(save)
+    journal.close()
 
     print(f"\n[SAVED] {data_path}")
     print(f"  Total episodes: {total}")
     print(f"  Enriched with plot: {enriched}")
     print(f"  Failed/no plot: {failed}")
+    print(f"  HTTP: {get_shared_client().summary()}")
+    if not args.wikitext:
+        print(f"  Parse memo: {get_shared_memo().summary()}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,137 @@
+"""
+Ingest a Wikipedia XML dump into a fixture archive, so the scrapers run without the network.
+Picks the pages the scrapers read out of a pages-articles dump - French season pages and main
+page on frwiki; English season pages, the X-Files list and season pages and every episode page
+they link on enwiki - renders their wikitext to light HTML and stores it under the URLs the
+scrapers request. Pages absent from the dump are stored as 404s; pages only reached through
+more than MAX_ROUNDS levels of links are not looked up and are left out of the archive.
+
+With the multistream index, only the bz2 streams holding those pages are decompressed, in
+parallel; otherwise the dump is streamed once per round of links followed.
+
+Usage:
+  python scripts/ingest_dump.py enwiki-latest-pages-articles-multistream.xml.bz2 \\
+      --index enwiki-latest-pages-articles-multistream-index.txt.bz2
+  python scripts/ingest_dump.py frwiki-latest-pages-articles.xml.bz2
+  SCRAPER_HTTP_MODE=replay python scripts/scraper_x_files.py
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scraper.config import FIXTURE_PATH, MAIN_PAGE_URL, MAX_SEASON_CHECK, PARSE_WORKERS, SEASON_URL_PATTERN
+from scraper.dump_reader import DumpReader
+from scraper.fixtures import FixtureArchive
+from scraper.http_client import page_title
+from scraper.wikitext import episode_list_entries, normalize_title, title_href
+from scraper.wikitext_html import render_html
+import scraper_english
+import scraper_x_files
+
+TRANSCLUSION_RE = re.compile(r'\{\{\s*:([^|{}]+?)\s*\}\}')
+MAX_ROUNDS = 3
+
+
+def scraper_urls():
+    """Every page URL the scrapers request before following episode links."""
+    urls = [MAIN_PAGE_URL]
+    urls += [SEASON_URL_PATTERN.format(season_num=n) for n in range(1, MAX_SEASON_CHECK + 1)]
+    urls += scraper_english.SEASON_URLS
+    urls += [scraper_english.french_season_url(n) for n in range(1, len(scraper_english.SEASON_URLS) + 1)]
+    urls += scraper_x_files.source_urls()
+    return urls
+
+
+def linked_titles(text):
+    """Titles a page pulls in: transcluded pages and the episode pages of its {{Episode list}} rows."""
+    titles = [match.group(1) for match in TRANSCLUSION_RE.finditer(text)]
+    for entry in episode_list_entries(text):
+        if entry['episode_href']:
+            titles.append(page_title(entry['episode_href']))
+    return titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn a Wikipedia XML dump into a fixture archive for offline scraping")
+    parser.add_argument('dump', help='pages-articles .xml or .xml.bz2 dump (frwiki or enwiki)')
+    parser.add_argument('--index', help='multistream index, to decompress only the streams holding the wanted pages')
+    parser.add_argument('--output', default=FIXTURE_PATH, help=f'fixture archive to add the pages to (default: {FIXTURE_PATH})')
+    parser.add_argument('--workers', type=int, default=PARSE_WORKERS,
+                        help=f'decompression processes with --index (default: {PARSE_WORKERS})')
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    started = time.time()
+    reader = DumpReader(args.dump, args.index, args.workers)
+    if not reader.site:
+        print(f"[ERROR] No <siteinfo><base> in {args.dump}, cannot tell which wiki it is")
+        return
+    host = urlsplit(reader.site).netloc
+    urls = [url for url in dict.fromkeys(scraper_urls()) if urlsplit(url).netloc == host]
+    print(f"Dump of {reader.site}: {len(urls)} scraper pages to look up")
+
+    # Follow transclusions and episode links until no new page turns up
+    pages = {}
+    wanted = {normalize_title(page_title(url)) for url in urls}
+    unfollowed = set()
+    for round_number in range(1, MAX_ROUNDS + 1):
+        new = wanted - set(pages)
+        if not new:
+            break
+        found = reader.pages(new)
+        pages.update(found)
+        pages.update({title: None for title in new - set(found)})
+        if round_number == MAX_ROUNDS:
+            # Links of the last round are never looked up: leave them out rather than store false 404s
+            unfollowed = {
+                normalize_title(title) for page in found.values() for title in linked_titles(page.text)
+            } - set(pages)
+            break
+        for page in found.values():
+            for title in linked_titles(page.text):
+                title = normalize_title(title)
+                if title not in pages:
+                    wanted.add(title)
+                    urls.append(reader.site + title_href(title))
+
+    def transclude(title):
+        page = pages.get(normalize_title(title))
+        return page.text if page else None
+
+    archive = FixtureArchive(args.output, 'a')
+    stored = missing = 0
+    try:
+        for url in dict.fromkeys(urls):
+            title = normalize_title(page_title(url))
+            page = pages.get(title)
+            if page is None:
+                archive.record(url, 404, {}, None)
+                missing += 1
+                continue
+            html = render_html(page.text, page.title, transclude)
+            archive.record(url, 200, {'Content-Type': 'text/html; charset=UTF-8'}, html)
+            stored += 1
+    finally:
+        # Keep the pages rendered so far if one fails to render
+        archive.close()
+
+    print(f"\n[SAVED] {args.output}")
+    print(f"  Pages rendered: {stored}")
+    print(f"  Not in dump (stored as 404): {missing}")
+    if unfollowed:
+        print(f"  Linked beyond {MAX_ROUNDS} rounds, not stored: {len(unfollowed)}")
+    print(f"  Time: {time.time() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,17 +3,96 @@ Twilight Zone French Wikipedia Scraper
 Main entry point for scraping La Quatrième Dimension episode data
 """
 
+import argparse
 import json
 import sys
 from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
 from loguru import logger
 from pathlib import Path
 
-from scraper.config import OUTPUT_DIR, LOG_DIR, OUTPUT_JSON_FILE, LOG_LEVEL, LOG_FORMAT
+from scraper.config import (
+    OUTPUT_DIR, LOG_DIR, OUTPUT_JSON_FILE, OUTPUT_NDJSON_FILE, REVISIONS_FILE, LOG_LEVEL, LOG_FORMAT, PARSE_WORKERS,
+    RATE_REPORT_WINDOW
+)
 from scraper.http_client import WikipediaClient
 from scraper.season_discovery import SeasonDiscovery
-from scraper.episode_parser import EpisodeParser
-from scraper.data_models import TwilightZoneDatabase
+from scraper.episode_parser import EpisodeParser, parse_season_document
+from scraper.ndjson import NDJSONWriter
+from scraper.pipeline import ParsePipeline
+from scraper.revisions import RevisionTracker
+from scraper.data_models import Season, TwilightZoneDatabase
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Scrape La Quatrième Dimension episodes from French Wikipedia")
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Parse pages in worker processes while the next pages are being fetched')
+    parser.add_argument('--workers', type=int, default=PARSE_WORKERS,
+                        help=f'Parser processes for --pipeline (default: {PARSE_WORKERS})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-scrape season pages edited since the last run, reusing the previous output')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                        help='json: one document written at the end; ndjson: a header, each episode as soon as its '
+                             'season is parsed, then a trailer with the totals')
+    parser.add_argument('--output',
+                        help=f'Output file (default: {OUTPUT_JSON_FILE} or {OUTPUT_NDJSON_FILE} in the output '
+                             f'directory); "-" streams NDJSON to standard output')
+    args = parser.parse_args()
+    if args.incremental and args.format == 'ndjson':
+        parser.error("--incremental reuses the previous JSON document and needs --format json")
+    if args.output == '-' and args.format != 'ndjson':
+        parser.error("standard output (--output -) needs --format ndjson")
+    return args
+
+
+def load_previous_seasons(output_path: Path) -> Dict[int, Season]:
+    """
+    Load the seasons of a previous run's output
+
+    Args:
+        output_path: Path of the JSON output
+
+    Returns:
+        Dict mapping season number to Season (empty if there is no usable output)
+    """
+    if not output_path.exists():
+        return {}
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            database = TwilightZoneDatabase.model_validate(json.load(f))
+    except Exception as e:
+        logger.warning(f"Cannot reuse previous output {output_path}: {e}")
+        return {}
+    return {season.season_number: season for season in database.seasons}
+
+
+def parse_seasons(parser: EpisodeParser, client: WikipediaClient, season_list: List[Tuple[int, str]],
+                  args: argparse.Namespace, prefetched: Dict[str, str]) -> Iterator[Season]:
+    """
+    Fetch and parse season pages, inline or through the process-pool pipeline, yielding each one once parsed
+
+    Args:
+        parser: Episode parser
+        client: HTTP client
+        season_list: List of (season_number, url) tuples
+        args: Command line arguments
+        prefetched: url -> HTML of season pages season discovery already downloaded
+
+    Yields:
+        Seasons in the order of season_list
+    """
+    if not args.pipeline:
+        yield from parser.iter_season_pages(season_list, prefetched)
+        return
+    pipeline = ParsePipeline(client, parse_season_document, workers=args.workers)
+    for _, season in pipeline.run(
+        ((url, (season_number, parser.backend, parser.content_only)) for season_number, url in season_list),
+        prefetched
+    ):
+        yield season
+    logger.info(f"Pipeline: {pipeline.summary()}")
 
 
 def setup_logging():
@@ -67,27 +146,41 @@ def save_to_json(database: TwilightZoneDatabase, output_path: Path):
     logger.success(f"Data saved successfully: {output_path} ({file_size:,} bytes)")
 
 
-def print_summary(database: TwilightZoneDatabase):
+def print_summary(series_title: str, season_counts: Dict[int, int], scrape_date: str, client: WikipediaClient):
     """Print summary statistics"""
     logger.info("")
     logger.info("="*70)
     logger.info(" SCRAPING COMPLETE - SUMMARY ".center(70, "="))
     logger.info("="*70)
-    logger.info(f"Series: {database.series_title}")
-    logger.info(f"Total Seasons: {database.total_seasons}")
-    logger.info(f"Total Episodes: {database.total_episodes}")
+    logger.info(f"Series: {series_title}")
+    logger.info(f"Total Seasons: {len(season_counts)}")
+    logger.info(f"Total Episodes: {sum(season_counts.values())}")
     logger.info("")
 
-    for season in database.seasons:
-        logger.info(f"  Season {season.season_number}: {len(season.episodes)} episodes")
+    for season_number, count in season_counts.items():
+        logger.info(f"  Season {season_number}: {count} episodes")
 
     logger.info("")
-    logger.info(f"Scrape Date: {database.scrape_date}")
+    stats = client.stats()
+    logger.info(f"HTTP Requests: {stats['requests']}")
+    logger.info(f"Cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['misses']} misses")
+    limits = client.limiter.report()
+    for host, host_stats in limits['hosts'].items():
+        logger.info(f"Rate {host}: {host_stats['rate']} req/s (latency {host_stats['latency']}s)")
+    logger.info(f"Throttled responses: {limits['throttled']}, retry budget left: {limits['retry_budget']}")
+    for host, aggregate in limits['aggregate'].items():
+        logger.info(
+            f"All scrapers on {host}: {aggregate['requests']} requests in the last {RATE_REPORT_WINDOW:.0f}s, "
+            f"{aggregate['rate']} req/s from {aggregate['processes']} processes (limit {aggregate['limit']} req/s)"
+        )
+    logger.info("")
+    logger.info(f"Scrape Date: {scrape_date}")
     logger.info("="*70)
 
 
 def main():
     """Main scraper execution"""
+    args = parse_args()
     try:
         # Setup logging
         setup_logging()
@@ -123,16 +216,44 @@ def main():
         logger.info("STEP 2: PARSING EPISODES FROM EACH SEASON")
         logger.info("")
 
-        seasons = []
+        output_dir = Path(OUTPUT_DIR)
+        output_path = Path(args.output) if args.output else output_dir / OUTPUT_JSON_FILE
+        if args.format == 'ndjson':
+            # Each season's episodes are written as soon as it is parsed; only counts stay in memory
+            writer = NDJSONWriter(args.output or output_dir / OUTPUT_NDJSON_FILE)
+            writer.header(TwilightZoneDatabase.model_fields['series_title'].default, season_list)
+            for season in parse_seasons(parser, client, season_list, args, discovery.prefetched):
+                writer.season(season)
+                logger.info(f"Season {season.season_number} streamed: {len(season.episodes)} episodes")
+            writer.trailer()
+            writer.close()
+            logger.info("")
+            print_summary(writer.series_title, writer.season_counts, writer.scrape_date, client)
+            client.close()
+            logger.success("Scraper completed successfully!")
+            return 0
+
+        tracker = None
+        if args.incremental:
+            tracker = RevisionTracker(client, output_dir / REVISIONS_FILE)
+            previous = load_previous_seasons(output_path)
+            changed = set(tracker.refresh(url for _, url in season_list))
+            to_parse = [(n, url) for n, url in season_list if url in changed or n not in previous]
+            logger.info(f"Incremental: {len(season_list) - len(to_parse)} unchanged seasons reused, {len(to_parse)} to parse")
+            parsed = {season.season_number: season for season in parse_seasons(parser, client, to_parse, args, discovery.prefetched)}
+            # A season that failed to download or parse comes back empty: keep the episodes saved last time
+            seasons = [
+                parsed[n] if n in parsed and (parsed[n].episodes or n not in previous) else previous[n]
+                for n, _ in season_list
+            ]
+        else:
+            seasons = list(parse_seasons(parser, client, season_list, args, discovery.prefetched))
         total_episodes = 0
 
-        for season_num, season_url in season_list:
-            logger.info(f"Processing Season {season_num}...")
-            season = parser.parse_season_page(season_num, season_url)
-            seasons.append(season)
+        for season in seasons:
             total_episodes += len(season.episodes)
-            logger.info(f"Season {season_num} complete: {len(season.episodes)} episodes")
-            logger.info("")
+            logger.info(f"Season {season.season_number} complete: {len(season.episodes)} episodes")
+        logger.info("")
 
         # Step 3: Create database
         logger.info("STEP 3: CREATING DATABASE")
@@ -147,15 +268,21 @@ def main():
 
         # Step 4: Save to JSON
         logger.info("STEP 4: SAVING TO JSON")
-        output_dir = Path(OUTPUT_DIR)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / OUTPUT_JSON_FILE
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
         save_to_json(database, output_path)
+        if tracker:
+            # Only seasons that parsed to episodes are marked as up to date
+            tracker.commit(season.url for season in parsed.values() if season.episodes)
         logger.info("")
 
         # Print summary
-        print_summary(database)
+        print_summary(
+            database.series_title,
+            {season.season_number: len(season.episodes) for season in database.seasons},
+            database.scrape_date,
+            client
+        )
 
         # Close HTTP client
         client.close()
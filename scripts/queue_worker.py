@@ -0,0 +1,243 @@
+"""
+Scrape the series through a shared work queue, spread over several worker processes or machines.
+The queue holds page URLs - French season pages, English season and episode pages, the French
+pages of the English scraper, X-Files episode pages - leased to workers that fetch them through
+the shared HTTP client and run the series' parsers. Concurrent workers share each host's
+request budget through the rate coordinator, so throughput grows with the number of workers
+until that budget is reached.
+
+  seed     enqueue the season pages (episode pages are enqueued as season tables are parsed)
+  work     run workers until the queue is drained
+  status   task counts, dead-lettered pages, aggregate request rate per host
+  retry    give dead-lettered pages a fresh set of attempts
+  collect  build the datasets from the results, as reparse.py does
+
+Usage:
+  python scripts/queue_worker.py seed
+  python scripts/queue_worker.py work --workers 4
+  python scripts/queue_worker.py status
+  python scripts/queue_worker.py collect
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scraper.config import (
+    OUTPUT_DIR, OUTPUT_JSON_FILE, PARSE_WORKERS, QUEUE_BACKEND, QUEUE_PATH, RATE_COORDINATOR_PATH, RATE_REPORT_WINDOW
+)
+from scraper.data_models import Season, TwilightZoneDatabase
+from scraper.episode_parser import EpisodeParser
+from scraper.http_client import get_shared_client
+from scraper.memo import get_shared_memo
+from scraper.rate_coordinator import get_coordinator
+from scraper.season_discovery import SeasonDiscovery
+from scraper.work_queue import open_work_queue, run_worker
+import enrich_x_files_plots
+import scraper_english
+from main import save_to_json
+from reparse import english_database, save_json
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+WEB_DATA_PATH = PROJECT_ROOT / 'web' / 'data' / 'x_files_episodes.json'
+SERIES = ('fr', 'en', 'xf-plots')
+
+
+class PageUnavailable(Exception):
+    """The page could not be fetched (missing, refused or failing); the task is retried"""
+
+
+def fetch(url):
+    """Page HTML through the shared client, raising if it could not be fetched"""
+    html = get_shared_client().get(url)
+    if not html:
+        raise PageUnavailable(f"no page at {url}")
+    return html
+
+
+def handle_fr_season(task):
+    """French season page -> Season record"""
+    season = EpisodeParser(get_shared_client()).parse_season_html(task.args['season_number'], task.url, fetch(task.url))
+    return season.model_dump(mode='json'), []
+
+
+def handle_en_season(task):
+    """English season page -> episode table rows, enqueueing the episode pages they link"""
+    table = BeautifulSoup(fetch(task.url), 'lxml').find('table', class_='wikitable')
+    if not table:
+        raise ValueError("no episode table")
+    rows = scraper_english.collect_episode_rows(table)
+    follow_ups = [('en_episode', scraper_english.BASE_URL + row['episode_url'], None)
+                  for row in rows if row['episode_url']]
+    return rows, follow_ups
+
+
+def handle_en_french(task):
+    """French season page of the English scraper -> French data map"""
+    html = fetch(task.url)
+    data_map = get_shared_memo().product(scraper_english.FRENCH_DATA_MEMO, task.url, html,
+                                         lambda: scraper_english.parse_french_episode_data_from_season_page(html))
+    return {str(number): data for number, data in data_map.items()}, []
+
+
+def handle_en_episode(task):
+    """English episode page -> [plot, cast, crew]"""
+    return list(scraper_english.parse_fetched_episode_page(task.url, fetch(task.url))), []
+
+
+def handle_xf_plot(task):
+    """X-Files episode page -> plot"""
+    html = fetch(task.url)
+    return get_shared_memo().product(enrich_x_files_plots.PLOT_MEMO, task.url, html,
+                                     lambda: enrich_x_files_plots.extract_plot_from_episode_page(html)), []
+
+
+HANDLERS = {
+    'fr_season': handle_fr_season,
+    'en_season': handle_en_season,
+    'en_french': handle_en_french,
+    'en_episode': handle_en_episode,
+    'xf_plot': handle_xf_plot,
+}
+
+
+def seed_tasks(series):
+    """Season-level (kind, url, args) tasks of the selected series"""
+    tasks = []
+    if 'fr' in series:
+        for season_number, url in SeasonDiscovery(get_shared_client()).discover_seasons():
+            tasks.append(('fr_season', url, {'season_number': season_number}))
+    if 'en' in series:
+        for season_number, url in enumerate(scraper_english.SEASON_URLS, 1):
+            tasks.append(('en_season', url, {'season_number': season_number}))
+            tasks.append(('en_french', scraper_english.french_season_url(season_number), None))
+    if 'xf-plots' in series:
+        if WEB_DATA_PATH.exists():
+            with open(WEB_DATA_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for _, episode in enrich_x_files_plots.select_episodes(data, None):
+                if episode.get('episode_url', '').startswith('http'):
+                    tasks.append(('xf_plot', episode['episode_url'], None))
+        else:
+            print(f"[SKIP] X-Files plots: {WEB_DATA_PATH} not found")
+    return tasks
+
+
+def worker_process(location, backend, log_level):
+    """Entry point of one worker process"""
+    logger.remove()
+    logger.add(sys.stderr, level=log_level)
+    queue = open_work_queue(location, backend)
+    stats = run_worker(queue, HANDLERS)
+    queue.close()
+    get_shared_client().close()
+    print(f"  Worker done: {stats['done']} tasks, {stats['failed']} failed attempts, {stats['lost']} lost leases")
+
+
+def print_status(queue):
+    """Task counts, dead letters and per-host aggregate rate"""
+    counts = queue.counts()
+    print(f"Tasks: {counts['done']} done, {counts['pending']} pending, {counts['leased']} leased, {counts['dead']} dead")
+    for task in queue.dead_letters():
+        print(f"  [DEAD] {task['kind']} {task['url']} ({task['attempts']} attempts): {task['error']}")
+    coordinator = get_coordinator(RATE_COORDINATOR_PATH)
+    if coordinator:
+        for host, entry in coordinator.report(RATE_REPORT_WINDOW).items():
+            print(f"  {host}: {entry['rate']} req/s over the last {RATE_REPORT_WINDOW:.0f}s "
+                  f"from {entry['processes']} processes (limit {entry['limit']} req/s)")
+
+
+def collect(queue):
+    """Write the datasets the queue results cover"""
+    output_dir = Path(OUTPUT_DIR)
+    seasons = sorted((Season(**result) for _, _, result in queue.results('fr_season')),
+                     key=lambda season: season.season_number)
+    if seasons:
+        french = TwilightZoneDatabase(
+            total_seasons=len(seasons),
+            total_episodes=sum(len(season.episodes) for season in seasons),
+            scrape_date=datetime.now().isoformat(),
+            seasons=seasons
+        )
+        output_dir.mkdir(parents=True, exist_ok=True)
+        save_to_json(french, output_dir / OUTPUT_JSON_FILE)
+        print(f"  La Quatrième Dimension: {french.total_episodes} episodes in {french.total_seasons} seasons")
+
+    pages = {url: rows for url, _, rows in queue.results('en_season')}
+    if pages:
+        for url, _, data_map in queue.results('en_french'):
+            pages[url] = {int(number): data for number, data in data_map.items()}
+        for season_number, url in enumerate(scraper_english.SEASON_URLS, 1):
+            pages.setdefault(url, [])
+            pages.setdefault(scraper_english.french_season_url(season_number), {})
+        episode_pages = {url: tuple(result) for url, _, result in queue.results('en_episode')}
+        english = english_database(pages, episode_pages)
+        save_json(english, PROJECT_ROOT / 'output' / 'twilight_zone_episodes_english.json')
+        print(f"  The Twilight Zone: {english['total_episodes']} episodes in {english['total_seasons']} seasons")
+
+    plots = {url: plot for url, _, plot in queue.results('xf_plot') if plot}
+    if plots and WEB_DATA_PATH.exists():
+        with open(WEB_DATA_PATH, 'r', encoding='utf-8') as f:
+            web_data = json.load(f)
+        enriched = 0
+        for _, episode in enrich_x_files_plots.select_episodes(web_data, None):
+            plot = plots.get(episode.get('episode_url'))
+            if plot:
+                enrich_x_files_plots.apply_plot(episode, plot)
+                enriched += 1
+        save_json(web_data, WEB_DATA_PATH)
+        print(f"  X-Files plots: {enriched} episodes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape the series through a shared work queue")
+    parser.add_argument('command', choices=['seed', 'work', 'status', 'retry', 'collect'])
+    parser.add_argument('--series', nargs='+', choices=SERIES, default=list(SERIES),
+                        help='series to enqueue with seed (default: all)')
+    parser.add_argument('--workers', type=int, default=PARSE_WORKERS,
+                        help=f'worker processes started by work (default: {PARSE_WORKERS})')
+    parser.add_argument('--queue', default=QUEUE_PATH, help=f'queue location (default: {QUEUE_PATH})')
+    parser.add_argument('--backend', default=QUEUE_BACKEND, help=f'queue backend (default: {QUEUE_BACKEND})')
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")  # progress is printed; surface failures only
+
+    queue = open_work_queue(args.queue, args.backend)
+    if args.command == 'seed':
+        added = queue.put_many(seed_tasks(args.series))
+        print(f"[QUEUED] {added} new pages")
+        print_status(queue)
+    elif args.command == 'work':
+        started = time.time()
+        print(f"Starting {args.workers} workers on {args.queue}")
+        processes = [
+            multiprocessing.Process(target=worker_process, args=(args.queue, args.backend, "WARNING"))
+            for _ in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        print(f"  Time: {time.time() - started:.1f}s")
+        print_status(queue)
+    elif args.command == 'status':
+        print_status(queue)
+    elif args.command == 'retry':
+        print(f"[QUEUED] {queue.retry_dead()} dead-lettered pages for another round")
+    elif args.command == 'collect':
+        collect(queue)
+    queue.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Re-run every series parser over the pages in the response cache, without the network.
+Rebuilds the four datasets from cached HTML after a parser change:
+- La Quatrième Dimension (French season pages, EpisodeParser)
+- The Twilight Zone in English (season tables, episode pages, French season pages)
+- The X-Files (list page and season summaries)
+- X-Files plots (episode pages, applied to web/data/x_files_episodes.json)
+
+Pages are read from the cache whatever their age, and parsed in a process pool over
+every core: season and list pages first, then the episode pages they link to.
+A page missing from the cache is treated like a page that failed to download.
+The parse memo is bypassed: every page is parsed again by the current parsers.
+
+Usage:
+  python scripts/reparse.py
+  python scripts/reparse.py --workers 4
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scraper.config import OUTPUT_DIR, OUTPUT_JSON_FILE, REPARSE_WORKERS
+from scraper.data_models import TwilightZoneDatabase
+from scraper.episode_parser import parse_season_document
+from scraper.http_client import WikipediaClient
+from scraper.parse_backend import resolve_backend
+from scraper.pipeline import ParsePipeline
+from scraper.season_discovery import SeasonDiscovery
+import enrich_x_files_plots
+import scraper_english
+import scraper_x_files
+from main import save_to_json
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _english_rows(html):
+    """Rows of an English season page's episode table"""
+    table = BeautifulSoup(html, 'lxml').find('table', class_='wikitable')
+    return scraper_english.collect_episode_rows(table) if table else []
+
+
+PARSERS = {
+    'fr_season': parse_season_document,
+    'en_season': lambda url, html: _english_rows(html) if html else [],
+    'en_french': lambda url, html: scraper_english.parse_french_episode_data_from_season_page(html) if html else {},
+    'en_episode': lambda url, html: scraper_english.parse_episode_page(html) if html else (None, [], []),
+    'xf_list': lambda url, html: scraper_x_files.extract_episodes_from_list_page(html) if html else {},
+    'xf_season': lambda url, html, season_number: (
+        scraper_x_files.extract_summaries_from_season_page(html, season_number) if html else []
+    ),
+    'xf_plot': lambda url, html: enrich_x_files_plots.extract_plot_from_episode_page(html) if html else None,
+}
+
+
+def parse_cached(url, html, kind, *args):
+    """ParsePipeline worker: run the parser registered for `kind` on a cached page"""
+    return PARSERS[kind](url, html, *args)
+
+
+def page_jobs(french_seasons, backend):
+    """Season and list pages of the four series, as (url, (kind, *args)) jobs"""
+    jobs = [(url, ('fr_season', season_number, backend)) for season_number, url in french_seasons]
+    for season_number, url in enumerate(scraper_english.SEASON_URLS, 1):
+        jobs.append((url, ('en_season',)))
+        jobs.append((scraper_english.french_season_url(season_number), ('en_french',)))
+    jobs.append((scraper_x_files.LIST_URL, ('xf_list',)))
+    for season_number in scraper_x_files.SEASONS:
+        jobs.append((scraper_x_files.SEASON_URL_TEMPLATE.format(season_number), ('xf_season', season_number)))
+    return jobs
+
+
+def english_database(pages, episode_pages):
+    """English Twilight Zone database from the parsed season tables, French pages and episode pages"""
+    database = {'series_title': 'The Twilight Zone', 'total_seasons': 0, 'total_episodes': 0, 'scrape_date': None,
+                'seasons': []}
+    for season_number, url in enumerate(scraper_english.SEASON_URLS, 1):
+        rows = pages[url]
+        if not rows:
+            print(f"  [ERROR] English season {season_number}: no episode table in the cache")
+            continue
+        french_data_map = pages[scraper_english.french_season_url(season_number)]
+        episodes = []
+        for row in rows:
+            episode_url = scraper_english.BASE_URL + row['episode_url'] if row['episode_url'] else None
+            plot, cast, crew = episode_pages.get(episode_url) or (None, [], [])
+            episodes.append(scraper_english.build_episode(
+                row, season_number, plot, cast, crew, french_data_map.get(row['episode_num_int'])
+            ))
+        database['seasons'].append({'season_number': season_number, 'url': url, 'episodes': episodes})
+    scraper_english.refresh_totals(database)
+    return database
+
+
+def x_files_database(pages):
+    """X-Files database from the parsed list page and season summaries"""
+    all_seasons = pages[scraper_x_files.LIST_URL]
+    if not all_seasons:
+        print("  [ERROR] X-Files list page: no episodes in the cache")
+        return None
+    for season_number, episodes in all_seasons.items():
+        summaries = pages.get(scraper_x_files.SEASON_URL_TEMPLATE.format(season_number))
+        if summaries:
+            scraper_x_files.apply_summaries(episodes, summaries)
+    return scraper_x_files.build_database(all_seasons)
+
+
+def save_json(data, path):
+    """Write a dataset with the scrapers' JSON formatting"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"[SAVED] {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parse every series from the response cache, without the network")
+    parser.add_argument('--workers', type=int, default=REPARSE_WORKERS,
+                        help=f'Parser processes (default: {REPARSE_WORKERS}, every core)')
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")  # progress is printed; only surface cache misses
+
+    started = time.time()
+    client = WikipediaClient(mode='cache')
+    backend = resolve_backend(None)
+
+    # The French season list comes from the cached main page and sequential probes, as in main.py
+    discovery = SeasonDiscovery(client, backend)
+    french_seasons = discovery.discover_seasons()
+    print(f"French seasons in the cache: {[n for n, _ in french_seasons]}")
+
+    pipeline = ParsePipeline(client, parse_cached, workers=args.workers, log_level="WARNING")
+    jobs = page_jobs(french_seasons, backend)
+    print(f"Parsing {len(jobs)} season and list pages in {args.workers} processes")
+    pages = dict(pipeline.run(jobs, discovery.prefetched))
+    print(f"  Pipeline: {pipeline.summary()}")
+
+    # Episode pages linked from the English tables and from the X-Files data
+    english_urls = [
+        scraper_english.BASE_URL + row['episode_url']
+        for season_url in scraper_english.SEASON_URLS for row in pages[season_url] if row['episode_url']
+    ]
+    web_data_path = PROJECT_ROOT / 'web' / 'data' / 'x_files_episodes.json'
+    web_data = None
+    plot_urls = []
+    if web_data_path.exists():
+        with open(web_data_path, 'r', encoding='utf-8') as f:
+            web_data = json.load(f)
+        plot_urls = [
+            episode['episode_url'] for _, episode in enrich_x_files_plots.select_episodes(web_data, None)
+            if episode.get('episode_url', '').startswith('http')
+        ]
+    jobs = [(url, ('en_episode',)) for url in dict.fromkeys(english_urls)]
+    jobs += [(url, ('xf_plot',)) for url in dict.fromkeys(plot_urls)]
+    print(f"Parsing {len(jobs)} episode pages")
+    episode_pages = dict(pipeline.run(jobs))
+    print(f"  Pipeline: {pipeline.summary()}")
+
+    print()
+    seasons = [pages[url] for _, url in french_seasons]
+    french = TwilightZoneDatabase(
+        total_seasons=len(seasons),
+        total_episodes=sum(len(season.episodes) for season in seasons),
+        scrape_date=datetime.now().isoformat(),
+        seasons=seasons
+    )
+    output_dir = Path(OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    save_to_json(french, output_dir / OUTPUT_JSON_FILE)
+    print(f"  La Quatrième Dimension: {french.total_episodes} episodes in {french.total_seasons} seasons")
+
+    english = english_database(pages, episode_pages)
+    save_json(english, PROJECT_ROOT / 'output' / 'twilight_zone_episodes_english.json')
+    print(f"  The Twilight Zone: {english['total_episodes']} episodes in {english['total_seasons']} seasons")
+
+    x_files = x_files_database(pages)
+    if x_files:
+        save_json(x_files, PROJECT_ROOT / 'output' / 'x_files_episodes.json')
+        print(f"  The X-Files: {x_files['total_episodes']} episodes in {x_files['total_seasons']} seasons")
+
+    if web_data is not None:
+        enriched = 0
+        for _, episode in enrich_x_files_plots.select_episodes(web_data, None):
+            plot = episode_pages.get(episode.get('episode_url'))
+            if plot:
+                enrich_x_files_plots.apply_plot(episode, plot)
+                enriched += 1
+        save_json(web_data, web_data_path)
+        print(f"  X-Files plots: {enriched} of {len(plot_urls)} episode pages")
+    else:
+        print(f"[SKIP] X-Files plots: {web_data_path} not found")
+
+    client.close()
+    print(f"\n  Cache: {client.summary()}")
+    print(f"  Time: {time.time() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,25 @@ Enhanced Twilight Zone scraper for English Wikipedia
 Extracts complete episode data including plot summaries
 """
 
+import argparse
 import json
-import time
 import re
+import sys
 from datetime import datetime
 from pathlib import Path
 from bs4 import BeautifulSoup
-import requests
+from loguru import logger
+from lxml import etree
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scraper.http_client import get_shared_client
+from scraper.config import PARSE_WORKERS
+from scraper.journal import EpisodeJournal
+from scraper.memo import get_shared_memo
+from scraper.pipeline import ParsePipeline
+from scraper.revisions import RevisionTracker
+from scraper.parse_backend import resolve_backend, parse_lxml, trim_page, has_class, next_element, single_string
+from scraper.wikitext import episode_list_entries, fetch_wikitext
 
 # Configuration
 BASE_URL = "https://en.wikipedia.org"
@@ -22,59 +34,187 @@ SEASON_URLS = [
     "https://en.wikipedia.org/wiki/The_Twilight_Zone_(1959_TV_series)_season_5"
 ]
 
-HEADERS = {
-    'User-Agent': 'TwilightZoneScraper/2.0 (Educational) Python-requests'
+# Expected episode counts per season (approximate)
+EXPECTED_EPISODE_COUNTS = {1: 36, 2: 29, 3: 37, 4: 18, 5: 36}
+JOURNAL_SUFFIX = '.journal.jsonl'
+# Parse memo kinds; bump the version when the matching parser changes
+EPISODE_PAGE_MEMO = 'english_episode_page/1'
+FRENCH_DATA_MEMO = 'french_season_data/1'
+REVISIONS_SUFFIX = '.revisions.json'
+
+CREW_INFOBOX_FIELDS = {
+    'Directed by': 'director',
+    'Written by': 'writer',
+    'Screenplay by': 'writer',
+    'Story by': 'writer',
+    'Music by': 'composer',
+    'Cinematography by': 'cinematographer',
+    'Edited by': 'editor',
+    'Produced by': 'producer'
 }
+CREW_ROLE_MAPPING = {
+    'directed by': 'director',
+    'written by': 'writer',
+    'music by': 'composer',
+    'cinematography by': 'cinematographer'
+}
+CREW_HEADING_RE = re.compile(r'^(Cast and crew|Production)', re.I)
 
-REQUEST_DELAY = 2.0  # seconds between requests
+# Compiled XPath for the lxml parse backend
+LX_CONTENT_XPATH = etree.XPath("//div[@id='mw-content-text']")
+LX_INFOBOX_XPATH = etree.XPath(f"(//table[{has_class('infobox')}])[1]")
+LX_ROWS_XPATH = etree.XPath(".//tr")
+LX_FIRST_TH_XPATH = etree.XPath("(.//th)[1]")
+LX_FIRST_TD_XPATH = etree.XPath("(.//td)[1]")
+LX_LINKS_XPATH = etree.XPath(".//a")
 
 
 def fetch_page(url):
-    """Fetch a Wikipedia page with rate limiting"""
+    """Fetch a Wikipedia page through the shared, rate-limited scraper client"""
     print(f"Fetching: {url}")
-    time.sleep(REQUEST_DELAY)
-
     try:
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        print(f"  [OK] Success ({len(response.text)} bytes)")
-        return response.text
+        html = get_shared_client().get(url)
     except Exception as e:
         print(f"  [ERROR] Error: {e}")
         return None
+    if html:
+        print(f"  [OK] Success ({len(html)} bytes)")
+    else:
+        print(f"  [ERROR] Page not available")
+    return html
 
 
-def extract_cast_from_english_wikipedia(soup):
-    """Extract cast information from English Wikipedia episode page"""
+class SoupNodes:
+    """Node access of the cast/crew extractors for a BeautifulSoup document"""
+
+    @staticmethod
+    def infobox(doc):
+        return doc.find('table', class_='infobox')
+
+    @staticmethod
+    def rows(table):
+        return table.find_all('tr')
+
+    @staticmethod
+    def first(node, tag):
+        return node.find(tag)
+
+    @staticmethod
+    def descendants(node, tag):
+        return node.find_all(tag)
+
+    @staticmethod
+    def headings(doc):
+        return doc.find_all(['h2', 'h3'])
+
+    @staticmethod
+    def text(node):
+        return node.get_text()
+
+    @staticmethod
+    def string(node):
+        return node.string
+
+    @staticmethod
+    def parent(node):
+        return node.parent
+
+    @staticmethod
+    def tag(node):
+        return node.name
+
+    @staticmethod
+    def next_sibling(node):
+        return node.find_next_sibling()
+
+
+class LxmlNodes:
+    """Node access of the cast/crew extractors for an lxml document"""
+
+    @staticmethod
+    def infobox(doc):
+        tables = LX_INFOBOX_XPATH(doc)
+        return tables[0] if tables else None
+
+    @staticmethod
+    def rows(table):
+        return LX_ROWS_XPATH(table)
+
+    @staticmethod
+    def first(node, tag):
+        found = (LX_FIRST_TH_XPATH if tag == 'th' else LX_FIRST_TD_XPATH)(node)
+        return found[0] if found else None
+
+    @staticmethod
+    def descendants(node, tag):
+        return LX_LINKS_XPATH(node) if tag == 'a' else list(node.iter(tag))
+
+    @staticmethod
+    def headings(doc):
+        return doc.iter('h2', 'h3')
+
+    @staticmethod
+    def text(node):
+        return node.text_content()
+
+    @staticmethod
+    def string(node):
+        # Same match rule as BeautifulSoup's .string: the node must hold a single string
+        return single_string(node)
+
+    @staticmethod
+    def parent(node):
+        return node.getparent()
+
+    @staticmethod
+    def tag(node):
+        return node.tag
+
+    @staticmethod
+    def next_sibling(node):
+        return next_element(node)
+
+
+def _section_blocks(heading, nodes):
+    """Elements following a heading, up to the next h2/h3"""
+    current = nodes.next_sibling(heading)
+    while current is not None and nodes.tag(current) not in ['h2', 'h3']:
+        yield current
+        current = nodes.next_sibling(current)
+
+
+def _extract_cast(doc, nodes):
+    """Cast of an episode page; `nodes` gives access to the parse backend's document"""
     cast = []
-    
+
     try:
         # Method 1: Look in infobox first (most reliable)
-        infobox = soup.find('table', class_='infobox')
-        if infobox:
+        infobox = nodes.infobox(doc)
+        if infobox is not None:
             # Look for various cast-related rows
             cast_keywords = ['starring', 'cast', 'featuring', 'guest']
-            for row in infobox.find_all('tr'):
-                header = row.find('th')
-                if header:
-                    header_text = header.get_text().lower().strip()
+            for row in nodes.rows(infobox):
+                header = nodes.first(row, 'th')
+                if header is not None:
+                    header_text = nodes.text(header).lower().strip()
                     for keyword in cast_keywords:
                         if keyword in header_text:
-                            data_cell = row.find('td')
-                            if data_cell:
+                            data_cell = nodes.first(row, 'td')
+                            if data_cell is not None:
                                 # Extract all text and links
-                                text_content = data_cell.get_text()
+                                text_content = nodes.text(data_cell)
                                 # Also get links for actor names
-                                for link in data_cell.find_all('a'):
-                                    actor = link.get_text().strip()
+                                for link in nodes.descendants(data_cell, 'a'):
+                                    actor = nodes.text(link).strip()
                                     if actor and len(actor) > 1 and actor not in ['edit', 'N/A']:
                                         # Try to find character name in parent text
-                                        parent_text = link.parent.get_text() if link.parent else ''
+                                        parent = nodes.parent(link)
+                                        parent_text = nodes.text(parent) if parent is not None else ''
                                         # Look for "as Character" or "(Character)" pattern
                                         char_match = re.search(r'(?:as|\(|–)\s*([^)]+?)(?:\)|$)', parent_text, re.I)
                                         character = char_match.group(1).strip() if char_match else None
                                         cast.append({'actor': actor, 'character': character})
-                                
+
                                 # If no links found, try parsing the text directly
                                 if not cast and text_content:
                                     # Split by common separators
@@ -91,19 +231,17 @@ def extract_cast_from_english_wikipedia(soup):
                                             else:
                                                 cast.append({'actor': part, 'character': None})
                             break
-        
+
         # Method 2: Look for "Cast" or "Cast and crew" section heading
         if not cast:
-            headings = soup.find_all(['h2', 'h3'])
-            for heading in headings:
-                heading_text = heading.get_text().strip()
+            for heading in nodes.headings(doc):
+                heading_text = nodes.text(heading).strip()
                 if re.match(r'^Cast', heading_text, re.I):
                     # Find the list after the heading
-                    current = heading.find_next_sibling()
-                    while current and current.name not in ['h2', 'h3']:
-                        if current.name == 'ul':
-                            for li in current.find_all('li'):
-                                text = li.get_text().strip()
+                    for block in _section_blocks(heading, nodes):
+                        if nodes.tag(block) == 'ul':
+                            for li in nodes.descendants(block, 'li'):
+                                text = nodes.text(li).strip()
                                 if not text or len(text) < 2:
                                     continue
                                 # Pattern: "Actor Name as Character Name" or "Actor Name (Character Name)" or "Actor Name – Character"
@@ -118,20 +256,19 @@ def extract_cast_from_english_wikipedia(soup):
                                 elif text and len(text) > 2:
                                     # Just actor name
                                     cast.append({'actor': text, 'character': None})
-                        elif current.name == 'p':
+                        elif nodes.tag(block) == 'p':
                             # Sometimes cast is in paragraphs
-                            text = current.get_text().strip()
+                            text = nodes.text(block).strip()
                             if 'starring' in text.lower() or 'cast' in text.lower():
                                 # Extract names from paragraph
                                 # Look for links (actor names are usually linked)
-                                for link in current.find_all('a'):
-                                    actor = link.get_text().strip()
+                                for link in nodes.descendants(block, 'a'):
+                                    actor = nodes.text(link).strip()
                                     if actor and len(actor) > 1:
                                         cast.append({'actor': actor, 'character': None})
-                        current = current.find_next_sibling()
                     if cast:
                         break
-        
+
         # Remove duplicates
         seen = set()
         unique_cast = []
@@ -140,88 +277,125 @@ def extract_cast_from_english_wikipedia(soup):
             if actor_key not in seen:
                 seen.add(actor_key)
                 unique_cast.append(member)
-        
+
         return unique_cast
     except Exception as e:
         print(f"        [DEBUG] Cast extraction error: {e}")
         return []
 
 
-def extract_crew_from_english_wikipedia(soup):
-    """Extract crew information from English Wikipedia episode page"""
+def _extract_crew(doc, nodes):
+    """Crew of an episode page; `nodes` gives access to the parse backend's document"""
     crew = []
-    
+
     try:
         # Method 1: Look in infobox
-        infobox = soup.find('table', class_='infobox')
-        if infobox:
-            crew_fields = {
-                'Directed by': 'director',
-                'Written by': 'writer',
-                'Screenplay by': 'writer',
-                'Story by': 'writer',
-                'Music by': 'composer',
-                'Cinematography by': 'cinematographer',
-                'Edited by': 'editor',
-                'Produced by': 'producer'
-            }
-            
-            for row in infobox.find_all('tr'):
-                header = row.find('th')
-                if header:
-                    header_text = header.get_text().strip()
-                    for field_name, role in crew_fields.items():
+        infobox = nodes.infobox(doc)
+        if infobox is not None:
+            for row in nodes.rows(infobox):
+                header = nodes.first(row, 'th')
+                if header is not None:
+                    header_text = nodes.text(header).strip()
+                    for field_name, role in CREW_INFOBOX_FIELDS.items():
                         if field_name.lower() in header_text.lower():
-                            data_cell = row.find('td')
-                            if data_cell:
+                            data_cell = nodes.first(row, 'td')
+                            if data_cell is not None:
                                 # Get all links (multiple people possible)
-                                for link in data_cell.find_all('a'):
-                                    name = link.get_text().strip()
+                                for link in nodes.descendants(data_cell, 'a'):
+                                    name = nodes.text(link).strip()
                                     if name and name != 'N/A':
                                         crew.append({'role': role, 'name': name})
-        
+
         # Method 2: Look for "Cast and crew" or "Production" section
-        crew_heading = soup.find(['h2', 'h3'], string=re.compile(r'^(Cast and crew|Production)', re.I))
-        if crew_heading:
-            current = crew_heading.find_next_sibling()
-            while current and current.name not in ['h2', 'h3']:
-                if current.name == 'ul':
-                    for li in current.find_all('li'):
-                        text = li.get_text().strip()
+        crew_heading = next(
+            (heading for heading in nodes.headings(doc) if CREW_HEADING_RE.search(nodes.string(heading) or '')),
+            None
+        )
+        if crew_heading is not None:
+            for block in _section_blocks(crew_heading, nodes):
+                if nodes.tag(block) == 'ul':
+                    for li in nodes.descendants(block, 'li'):
+                        text = nodes.text(li).strip()
                         # Pattern: "Role: Name" or "Role – Name"
                         match = re.match(r'^(.+?)[:–]\s*(.+)$', text)
                         if match:
                             role = match.group(1).strip().lower()
                             name = match.group(2).strip()
                             # Map common role names
-                            role_mapping = {
-                                'directed by': 'director',
-                                'written by': 'writer',
-                                'music by': 'composer',
-                                'cinematography by': 'cinematographer'
-                            }
-                            mapped_role = role_mapping.get(role, role)
-                            crew.append({'role': mapped_role, 'name': name})
-                current = current.find_next_sibling()
-        
+                            crew.append({'role': CREW_ROLE_MAPPING.get(role, role), 'name': name})
+
         return crew
-    except Exception as e:
+    except Exception:
         return []
 
 
-def fetch_episode_plot_and_metadata(episode_url):
-    """Fetch full plot, cast, and crew from individual episode page
-    Returns: (plot, cast, crew) tuple
-    """
-    if not episode_url:
-        return None, [], []
+def extract_cast_from_english_wikipedia(soup):
+    """Extract cast information from English Wikipedia episode page"""
+    return _extract_cast(soup, SoupNodes)
 
-    full_url = BASE_URL + episode_url
-    html = fetch_page(full_url)
-    if not html:
-        return None, [], []
 
+def extract_crew_from_english_wikipedia(soup):
+    """Extract crew information from English Wikipedia episode page"""
+    return _extract_crew(soup, SoupNodes)
+
+
+def extract_cast_from_english_wikipedia_lxml(root):
+    """lxml implementation of extract_cast_from_english_wikipedia (root: lxml document)"""
+    return _extract_cast(root, LxmlNodes)
+
+
+def extract_crew_from_english_wikipedia_lxml(root):
+    """lxml implementation of extract_crew_from_english_wikipedia (root: lxml document)"""
+    return _extract_crew(root, LxmlNodes)
+
+
+def _plot_from_paragraph_texts(texts):
+    """Pick the plot paragraphs out of an episode page's paragraph texts"""
+    # Plot paragraphs typically start after the opening narration sections
+    plot_paragraphs = []
+
+    for i, text in enumerate(texts):
+        text = text.strip()
+        if not text:
+            continue
+
+        # Skip initial intro paragraphs (first 5)
+        if i < 5:
+            continue
+
+        # Stop if we hit closing narration or other sections
+        if any(keyword in text.lower() for keyword in ['closing narration', 'production', 'reception', 'cast and crew']):
+            break
+
+        # Look for plot-like content (detailed narrative)
+        if len(text) > 100:  # Plot paragraphs are substantial
+            plot_paragraphs.append(text)
+
+        # Limit to reasonable number of paragraphs
+        if len(plot_paragraphs) >= 10:
+            break
+
+    return '\n\n'.join(plot_paragraphs) if plot_paragraphs else None
+
+
+def parse_episode_page(html, backend=None, content_only=None):
+    """Parse plot, cast, and crew from an English Wikipedia episode page
+    backend: 'bs4' or 'lxml' (defaults to the scraper's PARSE_BACKEND)
+    content_only: parse only the mw-content-text region (defaults to the scraper's PARSE_CONTENT_ONLY)
+    Returns: (plot, cast, crew) tuple
+    """
     try:
+        html = trim_page(html, content_only)
+        if resolve_backend(backend) == 'lxml':
+            root = parse_lxml(html)
+            content_div = LX_CONTENT_XPATH(root)
+            if not content_div:
+                return None, [], []
+            cast = extract_cast_from_english_wikipedia_lxml(root)
+            crew = extract_crew_from_english_wikipedia_lxml(root)
+            texts = [p.text_content() for p in content_div[0].iter('p')]
+            return _plot_from_paragraph_texts(texts), cast, crew
+
         soup = BeautifulSoup(html, 'lxml')
 
         # Find the content div
@@ -233,43 +407,28 @@ def fetch_episode_plot_and_metadata(episode_url):
         cast = extract_cast_from_english_wikipedia(soup)
         crew = extract_crew_from_english_wikipedia(soup)
 
-        # Get all paragraphs for plot
-        all_paragraphs = content_div.find_all('p')
-
-        # Plot paragraphs typically start after the opening narration sections
-        plot_paragraphs = []
+        texts = [p.get_text() for p in content_div.find_all('p')]
+        return _plot_from_paragraph_texts(texts), cast, crew
 
-        for i, p in enumerate(all_paragraphs):
-            text = p.get_text().strip()
-            if not text:
-                continue
-
-            # Skip initial intro paragraphs (first 5)
-            if i < 5:
-                continue
-
-            # Stop if we hit closing narration or other sections
-            if any(keyword in text.lower() for keyword in ['closing narration', 'production', 'reception', 'cast and crew']):
-                break
-
-            # Look for plot-like content (detailed narrative)
-            if len(text) > 100:  # Plot paragraphs are substantial
-                plot_paragraphs.append(text)
-
-            # Limit to reasonable number of paragraphs
-            if len(plot_paragraphs) >= 10:
-                break
+    except Exception as e:
+        print(f"    [ERROR] Error extracting plot/metadata: {e}")
+        return None, [], []
 
-        full_plot = None
-        if plot_paragraphs:
-            full_plot = '\n\n'.join(plot_paragraphs)
 
-        return full_plot, cast, crew
+def fetch_episode_plot_and_metadata(episode_url):
+    """Fetch full plot, cast, and crew from individual episode page
+    Returns: (plot, cast, crew) tuple
+    """
+    if not episode_url:
+        return None, [], []
 
-    except Exception as e:
-        print(f"    [ERROR] Error extracting plot/metadata: {e}")
+    full_url = BASE_URL + episode_url
+    html = fetch_page(full_url)
+    if not html:
         return None, [], []
 
+    return get_shared_memo().product(EPISODE_PAGE_MEMO, full_url, html, lambda: parse_episode_page(html))
+
 
 def save_database(database, output_file, verbose=True):
     """Save database to JSON file"""
@@ -291,6 +450,64 @@ def save_database(database, output_file, verbose=True):
         return False
 
 
+def refresh_totals(database):
+    """Recompute season and database totals"""
+    for season in database['seasons']:
+        season['total_episodes'] = len(season['episodes'])
+    database['total_seasons'] = len(database['seasons'])
+    database['total_episodes'] = sum(len(s['episodes']) for s in database['seasons'])
+    database['scrape_date'] = datetime.now().isoformat()
+
+
+def apply_journal_record(database, record):
+    """Apply one journal record to the database
+    'season' records (re)start a season, 'episode' records insert or replace an episode.
+    Applying a record twice has no further effect, so replaying after a partial compaction is safe.
+    """
+    season_number = record['season_number']
+    if record['type'] == 'season':
+        database['seasons'] = [s for s in database['seasons'] if s['season_number'] != season_number]
+        database['seasons'].append({
+            'season_number': season_number,
+            'url': record['url'],
+            'episodes': [],
+            'total_episodes': 0
+        })
+        database['seasons'].sort(key=lambda x: x['season_number'])
+        return
+
+    season = next((s for s in database['seasons'] if s['season_number'] == season_number), None)
+    if season is None:
+        return
+    episode = record['episode']
+    for index, existing in enumerate(season['episodes']):
+        if existing['episode_number'] == episode['episode_number']:
+            season['episodes'][index] = episode
+            return
+    season['episodes'].append(episode)
+
+
+def journal_record(database, journal, record):
+    """Append a record to the journal and apply it to the in-memory database"""
+    journal.append(record)
+    apply_journal_record(database, record)
+
+
+def replay_journal(database, journal):
+    """Apply the records left by an interrupted run; returns how many were replayed"""
+    replayed = 0
+    for record in journal.replay():
+        apply_journal_record(database, record)
+        replayed += 1
+    return replayed
+
+
+def compact_database(database, output_file, journal, verbose=True):
+    """Write the full JSON snapshot and empty the journal"""
+    refresh_totals(database)
+    return journal.compact(lambda: save_database(database, output_file, verbose))
+
+
 def _get_section_content(heading):
     """Get all text content following a heading until the next heading"""
     content_parts = []
@@ -434,16 +651,16 @@ def parse_french_episode_data_from_season_page(html):
         return {}
 
 
-def parse_episode_table(table, season_number, database, output_file, season_data, french_data_map=None):
-    """Parse English Wikipedia episode table and save after each episode"""
-    if french_data_map is None:
-        french_data_map = {}
+def collect_episode_rows(table):
+    """Read the English Wikipedia episode table into row dicts, without fetching anything
+    Each episode is a metadata row (th = overall number) optionally followed by a short summary row.
+    """
     rows = table.find_all('tr')
 
     print(f"  Found {len(rows)} rows in table")
 
+    episode_rows = []
     i = 1  # Skip header row
-    episode_count = 0
 
     while i < len(rows):
         # Check if this is a metadata row (has th for episode number)
@@ -473,12 +690,6 @@ def parse_episode_table(table, season_number, database, output_file, season_data
             if title_link and title_link.get('href'):
                 episode_url = title_link.get('href')
 
-            director = cells[2].get_text().strip()
-            writer = cells[3].get_text().strip()
-            music = cells[4].get_text().strip() if len(cells) > 4 else None
-            air_date = cells[5].get_text().strip() if len(cells) > 5 else None
-            prod_code = cells[6].get_text().strip() if len(cells) > 6 else None
-
             # Get short summary from next row (if exists)
             short_summary = None
             if i + 1 < len(rows):
@@ -493,174 +704,338 @@ def parse_episode_table(table, season_number, database, output_file, season_data
                     if short_summary:
                         i += 1  # Skip plot row in next iteration
 
-            # Fetch full plot, cast, and crew from individual episode page
-            print(f"    Episode {episode_number}: {title[:50]}")
-            print(f"      Fetching plot, cast, and crew from episode page...")
-            full_plot, cast, crew = fetch_episode_plot_and_metadata(episode_url)
-
-            if full_plot:
-                print(f"      [OK] Got full plot ({len(full_plot)} chars)")
-            else:
-                print(f"      [WARNING] Using short summary ({len(short_summary) if short_summary else 0} chars)")
-                full_plot = short_summary
-            
-            if cast:
-                print(f"      [OK] Found {len(cast)} cast members")
-            if crew:
-                print(f"      [OK] Found {len(crew)} crew members")
-
-            # Get French data from cached map
-            episode_num_int = int(episode_number) if episode_number.isdigit() else episode_count + 1
-            french_data = french_data_map.get(episode_num_int, {})
-            title_french = french_data.get('title_french') if french_data else None
-            if title_french:
-                print(f"      [OK] Found French title: {title_french}")
-            else:
-                print(f"      [INFO] French title not found for episode {episode_num_int}")
-
-            # Flatten crew into individual fields
-            composer = None
-            cinematographer = None
-            editor = None
-            producer = None
-            
-            if crew:
-                for crew_member in crew:
-                    role = crew_member.get('role', '').lower()
-                    name = crew_member.get('name', '')
-                    if not name or name == 'N/A':
-                        continue
-                    
-                    if role == 'composer':
-                        composer = name
-                    elif role == 'cinematographer':
-                        cinematographer = name
-                    elif role == 'editor':
-                        editor = name
-                    elif role == 'producer':
-                        producer = name
-            
-            episode = {
-                'season_number': season_number,
-                'episode_number': episode_num_int,
-                'episode_number_overall': int(episode_overall) if episode_overall.isdigit() else None,
-                'title_french': title_french,  # Fetched from French Wikipedia
-                'title_original': title,
-                'air_date_france': french_data.get('air_date_france') if french_data else None,
-                'air_date_usa': air_date if air_date and air_date != 'N/A' else None,
-                'summary': short_summary,  # Keep short summary separate
-                'plot': full_plot,  # Full detailed plot
+            episode_rows.append({
+                'episode_overall': episode_overall,
+                'episode_number': episode_number,
+                'episode_num_int': int(episode_number) if episode_number.isdigit() else len(episode_rows) + 1,
+                'title': title,
                 'episode_url': episode_url,
-                'cast': cast,  # From English Wikipedia
-                'director': director if director and director != 'N/A' else None,
-                'writer': writer if writer and writer != 'N/A' else None,
-                'composer': composer,
-                'cinematographer': cinematographer,
-                'editor': editor,
-                'producer': producer,
-                'production_code': prod_code if prod_code and prod_code != 'N/A' else None
-            }
-
-            # Add episode to season (season_data is a reference to the one in database['seasons'])
-            season_data['episodes'].append(episode)
-            episode_count += 1
-            
-            # Update database totals (season_data is already in database['seasons'])
-            database['total_episodes'] = sum(len(s['episodes']) for s in database['seasons'])
-            database['total_seasons'] = len(database['seasons'])
-            database['scrape_date'] = datetime.now().isoformat()
-            
-            # Save after each episode
-            save_database(database, output_file)
+                'director': cells[2].get_text().strip(),
+                'writer': cells[3].get_text().strip(),
+                'air_date': cells[5].get_text().strip() if len(cells) > 5 else None,
+                'prod_code': cells[6].get_text().strip() if len(cells) > 6 else None,
+                'short_summary': short_summary
+            })
 
         except Exception as e:
             print(f"    [ERROR] Error parsing row {i}: {e}")
 
         i += 1
 
+    return episode_rows
+
+
+def collect_episode_rows_from_wikitext(wikitext):
+    """Read the season's {{Episode list}} template calls into the same row dicts as collect_episode_rows
+    Parameters are read by name, so no column positions or summary rows are involved.
+    """
+    episode_rows = []
+    for entry in episode_list_entries(wikitext):
+        title = (entry['title'] or '').strip('"')
+        if not title:
+            continue
+        episode_number = entry['episode_number'] or ''
+        episode_rows.append({
+            'episode_overall': entry['episode_number_overall'] or '',
+            'episode_number': episode_number,
+            'episode_num_int': int(episode_number) if episode_number.isdigit() else len(episode_rows) + 1,
+            'title': title,
+            'episode_url': entry['episode_href'],
+            'director': entry['director'] or '',
+            'writer': entry['writer'] or '',
+            'air_date': entry['air_date'],
+            'prod_code': entry['production_code'],
+            'short_summary': entry['short_summary']
+        })
+
+    print(f"  Found {len(episode_rows)} episodes in the wikitext")
+    return episode_rows
+
+
+def parse_fetched_episode_page(url, html):
+    """ParsePipeline worker: (plot, cast, crew) from an already fetched episode page"""
+    if not html:
+        return None, [], []
+    return get_shared_memo().product(EPISODE_PAGE_MEMO, url, html, lambda: parse_episode_page(html))
+
+
+def build_episode(row, season_number, full_plot, cast, crew, french_data=None):
+    """Episode record from a table row, the parsed episode page and the French season data
+    full_plot falls back to the row's short summary when the episode page gave none
+    """
+    if french_data is None:
+        french_data = {}
+
+    # Flatten crew into individual fields
+    composer = None
+    cinematographer = None
+    editor = None
+    producer = None
+
+    if crew:
+        for crew_member in crew:
+            role = crew_member.get('role', '').lower()
+            name = crew_member.get('name', '')
+            if not name or name == 'N/A':
+                continue
+
+            if role == 'composer':
+                composer = name
+            elif role == 'cinematographer':
+                cinematographer = name
+            elif role == 'editor':
+                editor = name
+            elif role == 'producer':
+                producer = name
+
+    director = row['director']
+    writer = row['writer']
+    air_date = row['air_date']
+    prod_code = row['prod_code']
+    episode_overall = row['episode_overall']
+    return {
+        'season_number': season_number,
+        'episode_number': row['episode_num_int'],
+        'episode_number_overall': int(episode_overall) if episode_overall.isdigit() else None,
+        'title_french': french_data.get('title_french'),  # Fetched from French Wikipedia
+        'title_original': row['title'],
+        'air_date_france': french_data.get('air_date_france'),
+        'air_date_usa': air_date if air_date and air_date != 'N/A' else None,
+        'summary': row['short_summary'],  # Keep short summary separate
+        'plot': full_plot or row['short_summary'],  # Full detailed plot
+        'episode_url': row['episode_url'],
+        'cast': cast,  # From English Wikipedia
+        'director': director if director and director != 'N/A' else None,
+        'writer': writer if writer and writer != 'N/A' else None,
+        'composer': composer,
+        'cinematographer': cinematographer,
+        'editor': editor,
+        'producer': producer,
+        'production_code': prod_code if prod_code and prod_code != 'N/A' else None
+    }
+
+
+def parse_episode_table(episode_rows, season_number, database, journal, french_data_map=None, resume_episodes=None,
+                        pipeline=None):
+    """Parse English Wikipedia episode table and journal each episode
+    episode_rows: rows from collect_episode_rows (HTML table) or collect_episode_rows_from_wikitext
+    resume_episodes: episode_number -> episode already scraped by an interrupted run (reused without fetching)
+    pipeline: ParsePipeline fetching and parsing the episode pages ahead, in worker processes;
+              None fetches and parses each page inline
+    """
+    if french_data_map is None:
+        french_data_map = {}
+    if resume_episodes is None:
+        resume_episodes = {}
+
+    to_fetch = [
+        row for row in episode_rows
+        if row['episode_num_int'] not in resume_episodes and row['episode_url']
+    ]
+    # Results come back in table order, so they are consumed in step with the rows below
+    fetched = pipeline.run((BASE_URL + row['episode_url'], ()) for row in to_fetch) if pipeline else None
+
+    episode_count = 0
+    try:
+        for row in episode_rows:
+            episode_number = row['episode_number']
+            episode_num_int = row['episode_num_int']
+            title = row['title']
+            episode_url = row['episode_url']
+            short_summary = row['short_summary']
+
+            resumed = resume_episodes.get(episode_num_int)
+            if resumed:
+                print(f"    Episode {episode_number}: {title[:50]} [RESUME] already scraped")
+                # The French season page was just fetched, so its data is current
+                french_data = french_data_map.get(episode_num_int)
+                if french_data:
+                    resumed = {
+                        **resumed,
+                        'title_french': french_data.get('title_french') or resumed.get('title_french'),
+                        'air_date_france': french_data.get('air_date_france') or resumed.get('air_date_france')
+                    }
+                journal_record(database, journal, {'type': 'episode', 'season_number': season_number, 'episode': resumed})
+                episode_count += 1
+                continue
+
+            try:
+                # Fetch full plot, cast, and crew from individual episode page
+                print(f"    Episode {episode_number}: {title[:50]}")
+                if fetched is not None and episode_url:
+                    _, (full_plot, cast, crew) = next(fetched)
+                else:
+                    print(f"      Fetching plot, cast, and crew from episode page...")
+                    full_plot, cast, crew = fetch_episode_plot_and_metadata(episode_url)
+
+                if full_plot:
+                    print(f"      [OK] Got full plot ({len(full_plot)} chars)")
+                else:
+                    print(f"      [WARNING] Using short summary ({len(short_summary) if short_summary else 0} chars)")
+                    full_plot = short_summary
+
+                if cast:
+                    print(f"      [OK] Found {len(cast)} cast members")
+                if crew:
+                    print(f"      [OK] Found {len(crew)} crew members")
+
+                # Get French data from cached map
+                french_data = french_data_map.get(episode_num_int, {})
+                title_french = french_data.get('title_french') if french_data else None
+                if title_french:
+                    print(f"      [OK] Found French title: {title_french}")
+                else:
+                    print(f"      [INFO] French title not found for episode {episode_num_int}")
+
+                episode = build_episode(row, season_number, full_plot, cast, crew, french_data)
+
+                # Journal the episode: one appended line instead of rewriting the whole database
+                journal_record(database, journal, {'type': 'episode', 'season_number': season_number, 'episode': episode})
+                episode_count += 1
+                print(f"      [SAVED] Episode journaled")
+
+            except Exception as e:
+                print(f"    [ERROR] Error processing episode {episode_number}: {e}")
+    finally:
+        if fetched is not None:
+            fetched.close()  # stops the fetchers and parser processes if the loop ended early
+
     return episode_count
 
 
-def scrape_season(season_number, url, database, output_file):
-    """Scrape a single season and save incrementally"""
+def french_season_url(season_number):
+    """French Wikipedia season page, source of the French titles and air dates"""
+    return f"{FR_BASE_URL}/wiki/Saison_{season_number}_de_La_Quatrième_Dimension"
+
+
+def fetch_french_data_map(season_number):
+    """French data of a season (see parse_french_episode_data_from_season_page)
+    The page is parsed once per revision, whichever workflow fetches it
+    Returns None if the French season page could not be fetched
+    """
+    url = french_season_url(season_number)
+    html = fetch_page(url)
+    if not html:
+        return None
+    return get_shared_memo().product(FRENCH_DATA_MEMO, url, html,
+                                     lambda: parse_french_episode_data_from_season_page(html))
+
+
+def scrape_season(season_number, url, database, output_file, journal, pipeline=None, reuse_episodes=None,
+                  wikitext=None):
+    """Scrape a single season, journaling each episode and compacting at the end
+    reuse_episodes: episode_number -> episode to keep without refetching (incremental mode);
+                    None skips complete seasons and resumes incomplete ones
+    wikitext: source of the season page (--source wikitext); None reads the rendered episode table
+    """
     print(f"\n{'='*60}")
     print(f"SEASON {season_number}")
     print(f"{'='*60}")
 
     # Check if season already exists in database
-    existing_season = None
-    for season in database['seasons']:
-        if season['season_number'] == season_number:
-            existing_season = season
-            # Expected episode counts per season (approximate)
-            expected_counts = {1: 36, 2: 29, 3: 37, 4: 18, 5: 36}
-            expected = expected_counts.get(season_number, 0)
-            actual = len(season['episodes'])
+    resume_episodes = {}
+    if reuse_episodes is not None:
+        resume_episodes = reuse_episodes
+        print(f"  [INCREMENTAL] Re-scraping season {season_number}, reusing {len(reuse_episodes)} unchanged episodes")
+    else:
+        for season in database['seasons']:
+            if season['season_number'] == season_number:
+                expected = EXPECTED_EPISODE_COUNTS.get(season_number, 0)
+                actual = len(season['episodes'])
             
-            if expected > 0 and actual >= expected:
-                print(f"  [SKIP] Season {season_number} already complete ({actual} episodes)")
-                return existing_season
-            else:
-                print(f"  [INFO] Season {season_number} exists with {actual} episodes, re-scraping...")
-                # Remove existing season to re-scrape
-                database['seasons'] = [s for s in database['seasons'] if s['season_number'] != season_number]
-            break
+                if expected > 0 and actual >= expected:
+                    print(f"  [SKIP] Season {season_number} already complete ({actual} episodes)")
+                    return season
+                else:
+                    print(f"  [INFO] Season {season_number} exists with {actual} episodes, resuming...")
+                    # Episodes with a plot are reused when the season is re-scraped
+                    resume_episodes = {ep['episode_number']: ep for ep in season['episodes'] if ep.get('plot')}
+                break
 
-    html = fetch_page(url)
-    if not html:
-        return None
+    if wikitext:
+        episode_rows = collect_episode_rows_from_wikitext(wikitext)
+        if not episode_rows:
+            print("  [ERROR] No {{Episode list}} entries found")
+            return None
+    else:
+        html = fetch_page(url)
+        if not html:
+            return None
 
-    soup = BeautifulSoup(html, 'lxml')
+        soup = BeautifulSoup(html, 'lxml')
 
-    # Find the episode table
-    table = soup.find('table', class_='wikitable')
+        # Find the episode table
+        table = soup.find('table', class_='wikitable')
 
-    if not table:
-        print("  [ERROR] No episode table found")
-        return None
+        if not table:
+            print("  [ERROR] No episode table found")
+            return None
+        episode_rows = collect_episode_rows(table)
 
     # Fetch French season page once for all episodes
     print(f"  Fetching French Wikipedia season page for French data...")
-    french_season_html = fetch_page(f"{FR_BASE_URL}/wiki/Saison_{season_number}_de_La_Quatrième_Dimension")
-    french_data_map = {}
-    if french_season_html:
-        french_data_map = parse_french_episode_data_from_season_page(french_season_html)
+    french_data_map = fetch_french_data_map(season_number)
+    if french_data_map is not None:
         print(f"  [OK] Loaded French data for {len(french_data_map)} episodes from French Wikipedia")
     else:
+        french_data_map = {}
         print(f"  [WARNING] Could not fetch French season page, French data will be missing")
 
-    # Create new season data structure
-    season_data = {
-        'season_number': season_number,
-        'url': url,
-        'episodes': [],
-        'total_episodes': 0
+    # Start the season (replaces any partial copy) before journaling its episodes
+    journal_record(database, journal, {'type': 'season', 'season_number': season_number, 'url': url})
+
+    # Parse episodes and journal them incrementally
+    parse_episode_table(episode_rows, season_number, database, journal, french_data_map, resume_episodes, pipeline)
+    if pipeline and pipeline.started:
+        print(f"  Pipeline: {pipeline.summary()}")
+
+    # Fold the season into the JSON file
+    compact_database(database, output_file, journal)
+
+    return next(s for s in database['seasons'] if s['season_number'] == season_number)
+
+
+def scrape_incremental(database, output_file, journal, pipeline=None, sources=None):
+    """Re-scrape only what was edited on Wikipedia since the last run
+    One batched revision query covers the English season pages, the French season pages and every
+    episode page. A season is re-scraped when any of its pages changed; its unchanged episodes are
+    reused without fetching their pages. Episodes still without a plot are not recorded as up to
+    date, so the next run fetches them again.
+    sources: season URL -> wikitext (--source wikitext)
+    """
+    sources = sources or {}
+    tracker = RevisionTracker(get_shared_client(), output_file.with_suffix(REVISIONS_SUFFIX))
+    episode_pages = {
+        season['season_number']: {
+            ep['episode_number']: BASE_URL + ep['episode_url'] for ep in season['episodes'] if ep.get('episode_url')
+        }
+        for season in database['seasons']
     }
+    season_pages = {n: [url, french_season_url(n)] for n, url in enumerate(SEASON_URLS, 1)}
+    changed = set(tracker.refresh(
+        [url for urls in season_pages.values() for url in urls]
+        + [url for pages in episode_pages.values() for url in pages.values()]
+    ))
+    print(f"  [INCREMENTAL] {len(changed)} pages changed since the last run")
 
-    # Add season to database BEFORE parsing episodes (so saves include it)
-    database['seasons'].append(season_data)
-    database['seasons'].sort(key=lambda x: x['season_number'])
-    
-    # Update totals
-    database['total_seasons'] = len(database['seasons'])
-    database['scrape_date'] = datetime.now().isoformat()
-    
-    # Initial save with empty season
-    save_database(database, output_file, verbose=False)
+    for season_num, url in enumerate(SEASON_URLS, 1):
+        season = next((s for s in database['seasons'] if s['season_number'] == season_num), None)
+        pages = episode_pages.get(season_num, {})
+        stale = {n for n, page in pages.items() if page in changed}
+        if season and not stale and not changed.intersection(season_pages[season_num]):
+            print(f"  [SKIP] Season {season_num} unchanged")
+            continue
 
-    # Parse episodes and save incrementally
-    episode_count = parse_episode_table(table, season_number, database, output_file, season_data, french_data_map)
-    
-    season_data['total_episodes'] = episode_count
-    
-    # Update totals after all episodes are parsed
-    database['total_episodes'] = sum(len(s['episodes']) for s in database['seasons'])
-    database['scrape_date'] = datetime.now().isoformat()
-    
-    # Final save for season
-    save_database(database, output_file)
-    
-    return season_data
+        reuse = {
+            ep['episode_number']: ep for ep in (season['episodes'] if season else [])
+            if ep['episode_number'] not in stale and ep.get('plot')
+        }
+        if scrape_season(season_num, url, database, output_file, journal, pipeline, reuse, sources.get(url)):
+            scraped = next(s for s in database['seasons'] if s['season_number'] == season_num)
+            # Episodes left without a plot stay stale, so the next run fetches them again
+            tracker.commit(season_pages[season_num] + [
+                BASE_URL + ep['episode_url'] for ep in scraped['episodes'] if ep.get('episode_url') and ep.get('plot')
+            ])
 
 
 def load_existing_data(output_file):
@@ -685,7 +1060,7 @@ def load_existing_data(output_file):
     }
 
 
-def update_french_data_only(database, output_file):
+def update_french_data_only(database, output_file, journal):
     """Update only missing French data (titles, air dates) and cast/crew from English Wikipedia"""
     print("\n" + "="*70)
     print(" UPDATING EPISODE DATA ".center(70, "="))
@@ -746,14 +1121,12 @@ def update_french_data_only(database, output_file):
         
         # Fetch French season page once
         print(f"    Fetching French Wikipedia season page...")
-        french_season_html = fetch_page(f"{FR_BASE_URL}/wiki/Saison_{season_number}_de_La_Quatrième_Dimension")
+        french_data_map = fetch_french_data_map(season_number)
         
-        if not french_season_html:
+        if french_data_map is None:
             print(f"    [WARNING] Could not fetch French season page for season {season_number}")
             continue
         
-        # Parse French episode data
-        french_data_map = parse_french_episode_data_from_season_page(french_season_html)
         print(f"    [OK] Loaded French data for {len(french_data_map)} episodes")
         if len(french_data_map) == 0:
             print(f"    [WARNING] No French data parsed from season page. Check parsing logic.")
@@ -908,20 +1281,16 @@ def update_french_data_only(database, output_file):
                     del episode['crew']
                     episode_updated = True
             
-            # Save immediately after each episode update (real-time saving)
+            # Journal each updated episode (real-time saving)
             if episode_updated:
-                database['scrape_date'] = datetime.now().isoformat()
-                if save_database(database, output_file, verbose=False):
-                    print(f"        [SAVED] Episode {episode_num} updates saved to JSON")
-                else:
-                    print(f"        [ERROR] Failed to save episode {episode_num} updates")
+                journal_record(database, journal, {'type': 'episode', 'season_number': season_number, 'episode': episode})
+                print(f"        [SAVED] Episode {episode_num} updates journaled")
         
         print(f"    [OK] Season {season_number}: Updated {season_updates['titles']} titles, {season_updates['air_dates']} air dates, {season_updates['cast']} cast, {season_updates['crew']} crew")
         
         # Final save for season (in case any updates happened that weren't saved yet)
         if season_updates['titles'] > 0 or season_updates['air_dates'] > 0 or season_updates['cast'] > 0 or season_updates['crew'] > 0:
-            database['scrape_date'] = datetime.now().isoformat()
-            save_database(database, output_file, verbose=False)
+            compact_database(database, output_file, journal, verbose=False)
             print(f"    [FINAL SAVE] Season {season_number} complete")
         print("")
     
@@ -934,22 +1303,49 @@ def update_french_data_only(database, output_file):
     print("="*70 + "\n")
 
 
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Scrape The Twilight Zone episodes from English Wikipedia")
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Parse episode pages in worker processes while the next pages are being fetched')
+    parser.add_argument('--workers', type=int, default=PARSE_WORKERS,
+                        help=f'Parser processes for --pipeline (default: {PARSE_WORKERS})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-scrape pages edited since the last run, reusing unchanged episodes')
+    parser.add_argument('--source', choices=('html', 'wikitext'), default='html',
+                        help='Read episode tables from rendered HTML, or from {{Episode list}} templates in the wikitext')
+    return parser.parse_args()
+
+
 def main():
     """Main scraper execution"""
+    args = parse_args()
     print("\n" + "="*70)
     print(" TWILIGHT ZONE ENGLISH WIKIPEDIA SCRAPER ".center(70, "="))
     print("="*70 + "\n")
 
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")  # progress is printed; only surface HTTP problems
+
     # Setup output file
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
     output_file = output_dir / "twilight_zone_episodes_english.json"
 
-    # Load existing data or create new database
+    # Load existing data or create new database, then replay what an interrupted run journaled
     database = load_existing_data(output_file)
+    journal = EpisodeJournal(output_file.with_suffix(JOURNAL_SUFFIX))
+    replayed = replay_journal(database, journal)
+    if replayed:
+        print(f"  [RESUME] Replayed {replayed} journal records from an interrupted run")
+        compact_database(database, output_file, journal, verbose=False)
     
+    # Seasons left incomplete by an interrupted run are scraped (resumed) before any update
+    scraped = {s['season_number']: len(s['episodes']) for s in database['seasons']}
+    incomplete = any(scraped.get(n, 0) < EXPECTED_EPISODE_COUNTS.get(n, 0) for n in range(1, len(SEASON_URLS) + 1))
+
     # Check if we should just update French data
-    if database.get('total_episodes', 0) > 0:
+    if database.get('total_episodes', 0) > 0 and not incomplete and not args.incremental:
         # Check if any episodes are missing French data
         missing_french_data = False
         for season in database.get('seasons', []):
@@ -966,20 +1362,41 @@ def main():
         if missing_french_data:
             print(f"\n  [INFO] Existing data found with episodes missing French data")
             print(f"  [INFO] Updating French data only (titles, air dates, cast, crew)...\n")
-            update_french_data_only(database, output_file)
+            update_french_data_only(database, output_file, journal)
+            journal.close()
+            print(f"  HTTP: {get_shared_client().summary()}")
+            print(f"  Parse memo: {get_shared_memo().summary()}")
             return
     
     print(f"\n  Output file: {output_file}")
-    print(f"  Saving after each episode...\n")
+    print(f"  Journaling after each episode...\n")
+
+    pipeline = None
+    if args.pipeline:
+        pipeline = ParsePipeline(get_shared_client(), parse_fetched_episode_page, workers=args.workers, log_level="WARNING")
+        print(f"  Parsing episode pages in {args.workers} worker processes\n")
+
+    # Season page sources for --source wikitext, all in one batched API request
+    sources = {}
+    if args.source == 'wikitext':
+        print(f"  Fetching wikitext of {len(SEASON_URLS)} season pages\n")
+        sources = fetch_wikitext(get_shared_client(), SEASON_URLS)
 
     # Scrape each season
-    for season_num, url in enumerate(SEASON_URLS, 1):
-        season_data = scrape_season(season_num, url, database, output_file)
+    if args.incremental:
+        scrape_incremental(database, output_file, journal, pipeline, sources)
+    else:
+        for season_num, url in enumerate(SEASON_URLS, 1):
+            season_data = scrape_season(season_num, url, database, output_file, journal, pipeline,
+                                        wikitext=sources.get(url))
+
+            if season_data:
+                print(f"  [OK] Season {season_num} complete: {len(season_data['episodes'])} episodes")
+            else:
+                print(f"  [ERROR] Season {season_num} failed")
 
-        if season_data:
-            print(f"  [OK] Season {season_num} complete: {len(season_data['episodes'])} episodes")
-        else:
-            print(f"  [ERROR] Season {season_num} failed")
+    compact_database(database, output_file, journal, verbose=False)
+    journal.close()
 
     # Final summary
     print(f"\n{'='*70}")
@@ -993,6 +1410,8 @@ def main():
     file_size = output_file.stat().st_size
     print(f"\n  Final file size: {file_size:,} bytes")
     print(f"  Output: {output_file}")
+    print(f"  HTTP: {get_shared_client().summary()}")
+    print(f"  Parse memo: {get_shared_memo().summary()}")
     print(f"{'='*70}\n")
 
 
@@ -4,15 +4,25 @@ Extracts episode data from List of The X-Files episodes and season pages for sum
 Sources:
 - https://en.wikipedia.org/wiki/List_of_The_X-Files_episodes (episode tables)
 - https://en.wikipedia.org/wiki/The_X-Files_season_N (summaries per season)
+With --source wikitext, the season pages' wikitext is fetched instead (one batched API request)
+and episodes are read from their {{Episode list}} template calls, short summaries included.
 """
 
+import argparse
 import json
 import re
-import time
+import sys
 from datetime import datetime
 from pathlib import Path
 from bs4 import BeautifulSoup
-import requests
+from loguru import logger
+from lxml import etree
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scraper.http_client import get_shared_client
+from scraper.parse_backend import resolve_backend, parse_lxml, trim_page, has_class
+from scraper.revisions import RevisionTracker
+from scraper.wikitext import episode_list_entries, fetch_wikitext
 
 BASE_URL = "https://en.wikipedia.org"
 LIST_URL = "https://en.wikipedia.org/wiki/List_of_The_X-Files_episodes"
@@ -21,31 +31,100 @@ SEASON_URL_TEMPLATE = "https://en.wikipedia.org/wiki/The_X-Files_season_{}"
 # Seasons 1-11 (TV series). Films are excluded for now.
 SEASONS = list(range(1, 12))
 
-HEADERS = {'User-Agent': 'XFilesScraper/1.0 (Educational) Python-requests'}
-REQUEST_DELAY = 2.0
-
 
 def fetch_page(url):
-    """Fetch a Wikipedia page with rate limiting."""
+    """Fetch a Wikipedia page through the shared, rate-limited scraper client."""
     print(f"Fetching: {url}")
-    time.sleep(REQUEST_DELAY)
     try:
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        print(f"  [OK] Success ({len(response.text)} bytes)")
-        return response.text
+        html = get_shared_client().get(url)
     except Exception as e:
         print(f"  [ERROR] {e}")
         return None
+    if html:
+        print(f"  [OK] Success ({len(html)} bytes)")
+    else:
+        print(f"  [ERROR] Page not available")
+    return html
+
+
+SEASON_HEADING_RE = re.compile(r'Season\s+(\d+)\s*[\(\[]?\d', re.I)
+
+LX_CONTENT_XPATH = etree.XPath("//div[@id='mw-content-text']")
+LX_HEADLINE_XPATH = etree.XPath(f".//span[{has_class('mw-headline')}]")
+LX_ROWS_XPATH = etree.XPath(".//tr")
+LX_FIRST_TH_XPATH = etree.XPath("(.//th)[1]")
+LX_CELLS_XPATH = etree.XPath(".//td")
+LX_FIRST_LINK_XPATH = etree.XPath("(.//a)[1]")
 
 
-def extract_episodes_from_list_page(html):
+def _season_from_heading(text):
+    """Season number from a "Season N (year)" heading, or None for other sections."""
+    match = SEASON_HEADING_RE.search(text)
+    return int(match.group(1)) if match else None
+
+
+def _clean_field(value):
+    """None for empty and placeholder cell values."""
+    value = value.strip() if value else None
+    return None if value in (None, 'N/A', '—', '-', '') else value
+
+
+def _episode_from_row(current_season, overall_text, cell_texts, title_href, episodes):
+    """
+    Build an episode dict from the texts of one episode table row.
+    cell_texts: [No.in season, Title, Director, Writer, Date, Prod, Viewers]
+    Returns None for rows without a usable title.
+    """
+    overall_parts = re.findall(r'\d+', overall_text)
+    episode_overall = int(overall_parts[0]) if overall_parts else len(episodes) + 1
+
+    ep_in_season = cell_texts[0].strip()
+    title = cell_texts[1].strip().strip('"').replace('‡', '').strip()
+    if not title or title in ('—', '-', '---'):
+        return None
+
+    episode_url = None
+    if title_href:
+        episode_url = BASE_URL + title_href if not title_href.startswith('http') else title_href
+
+    director = _clean_field(cell_texts[2])
+    writer = _clean_field(cell_texts[3])
+    air_date = _clean_field(cell_texts[4])
+    prod_code = _clean_field(cell_texts[5]) if len(cell_texts) > 5 else None
+
+    ep_num = int(ep_in_season) if ep_in_season.isdigit() else len(episodes) + 1
+
+    return {
+        'season_number': current_season,
+        'episode_number': ep_num,
+        'episode_number_overall': episode_overall,
+        'title_original': title,
+        'title_french': None,
+        'air_date_usa': air_date,
+        'air_date_france': None,
+        'director': director,
+        'writer': writer,
+        'production_code': prod_code,
+        'summary': None,
+        'plot': None,
+        'episode_url': episode_url,
+        'cast': []
+    }
+
+
+def extract_episodes_from_list_page(html, backend=None, content_only=None):
     """
     Parse the List of The X-Files episodes page.
     Returns dict: season_number -> list of episode dicts (without summary)
     Wikipedia structure: h3 "Season N (year)" followed by wikitable with episode rows.
     Rows: th (No.overall) + td (No.in season, Title, Directed by, Written by, Date, Prod.code, Viewers)
+    backend: 'bs4' or 'lxml' (defaults to the scraper's PARSE_BACKEND); both give identical output.
+    content_only: parse only the mw-content-text region (defaults to the scraper's PARSE_CONTENT_ONLY).
     """
+    html = trim_page(html, content_only, LIST_URL)
+    if resolve_backend(backend) == 'lxml':
+        return _extract_episodes_from_list_page_lxml(html)
+
     soup = BeautifulSoup(html, 'lxml')
     seasons_data = {}
     
@@ -59,12 +138,8 @@ def extract_episodes_from_list_page(html):
         if elem.name in ('h2', 'h3'):
             # Wikipedia may use mw-headline span or have text directly in heading
             span = elem.find('span', class_='mw-headline')
-            text = span.get_text() if span else elem.get_text()
-            match = re.search(r'Season\s+(\d+)\s*[\(\[]?\d', text, re.I)
-            if match:
-                current_season = int(match.group(1))
-            else:
-                current_season = None  # e.g. "The X-Files (1998)" film section
+            # None for e.g. "The X-Files (1998)" film section
+            current_season = _season_from_heading(span.get_text() if span else elem.get_text())
             continue
         
         if elem.name == 'table':
@@ -88,54 +163,14 @@ def extract_episodes_from_list_page(html):
                 if not cells or len(cells) < 5:
                     continue
                 
-                overall_text = th.get_text().strip() if th else cells[0].get_text().strip() if cells else ''
-                overall_parts = re.findall(r'\d+', overall_text)
-                episode_overall = int(overall_parts[0]) if overall_parts else len(episodes) + 1
-                
-                # No.overall in th: cells = [No.in season, Title, Director, Writer, Date, Prod, Viewers]
-                # No.overall in first td: same
-                ep_in_season = cells[0].get_text().strip()
-                title_cell = cells[1]
-                title = title_cell.get_text().strip().strip('"').replace('‡', '').strip()
-                if not title or title in ('—', '-', '---'):
-                    continue
-                
-                episode_url = None
-                title_link = title_cell.find('a')
-                if title_link and title_link.get('href'):
-                    href = title_link.get('href')
-                    episode_url = BASE_URL + href if href and not href.startswith('http') else href
-                
-                director = cells[2].get_text().strip() or None
-                writer = cells[3].get_text().strip() or None
-                air_date = cells[4].get_text().strip() or None
-                prod_code = cells[5].get_text().strip() if len(cells) > 5 else None
-                
-                for bad in ('N/A', '—', '-', ''):
-                    if director == bad: director = None
-                    if writer == bad: writer = None
-                    if air_date == bad: air_date = None
-                    if prod_code == bad: prod_code = None
-                
-                ep_num = int(ep_in_season) if ep_in_season.isdigit() else len(episodes) + 1
-                
-                episode = {
-                    'season_number': current_season,
-                    'episode_number': ep_num,
-                    'episode_number_overall': episode_overall,
-                    'title_original': title,
-                    'title_french': None,
-                    'air_date_usa': air_date,
-                    'air_date_france': None,
-                    'director': director,
-                    'writer': writer,
-                    'production_code': prod_code,
-                    'summary': None,
-                    'plot': None,
-                    'episode_url': episode_url,
-                    'cast': []
-                }
-                episodes.append(episode)
+                overall_text = th.get_text().strip() if th else cells[0].get_text().strip()
+                title_link = cells[1].find('a')
+                title_href = title_link.get('href') if title_link else None
+                episode = _episode_from_row(
+                    current_season, overall_text, [cell.get_text() for cell in cells], title_href, episodes
+                )
+                if episode:
+                    episodes.append(episode)
             
             if episodes:
                 seasons_data[current_season] = episodes
@@ -145,6 +180,98 @@ def extract_episodes_from_list_page(html):
     return seasons_data
 
 
+def _extract_episodes_from_list_page_lxml(html):
+    """lxml/XPath implementation of extract_episodes_from_list_page."""
+    seasons_data = {}
+
+    content = LX_CONTENT_XPATH(parse_lxml(html))
+    if not content:
+        return seasons_data
+
+    current_season = None
+    for elem in content[0].iter('h2', 'h3', 'table'):
+        if elem.tag in ('h2', 'h3'):
+            spans = LX_HEADLINE_XPATH(elem)
+            current_season = _season_from_heading((spans[0] if spans else elem).text_content())
+            continue
+
+        if current_season is None or current_season not in SEASONS:
+            continue
+        if 'wikitable' not in (elem.get('class') or '').split():
+            continue
+        rows = LX_ROWS_XPATH(elem)
+        if len(rows) < 2:
+            continue
+        header_text = rows[0].text_content().lower()
+        if 'directed' not in header_text or 'title' not in header_text:
+            continue
+
+        episodes = []
+        for row in rows[1:]:
+            th = LX_FIRST_TH_XPATH(row)
+            cells = LX_CELLS_XPATH(row)
+            if not cells or len(cells) < 5:
+                continue
+
+            overall_text = th[0].text_content().strip() if th else cells[0].text_content().strip()
+            title_link = LX_FIRST_LINK_XPATH(cells[1])
+            title_href = title_link[0].get('href') if title_link else None
+            episode = _episode_from_row(
+                current_season, overall_text, [cell.text_content() for cell in cells], title_href, episodes
+            )
+            if episode:
+                episodes.append(episode)
+
+        if episodes:
+            seasons_data[current_season] = episodes
+            print(f"  Season {current_season}: {len(episodes)} episodes")
+        current_season = None  # Reset until next Season h3
+
+    return seasons_data
+
+
+def _episode_from_entry(season_number, entry, episodes):
+    """
+    Build an episode dict from one {{Episode list}} entry (see scraper.wikitext.episode_list_entries).
+    Returns None for entries without a usable title.
+    """
+    title = (entry['title'] or '').strip('"').replace('‡', '').strip()
+    if not title or title in ('—', '-', '---'):
+        return None
+
+    overall = entry['episode_number_overall'] or ''
+    number = entry['episode_number'] or ''
+    return {
+        'season_number': season_number,
+        'episode_number': int(number) if number.isdigit() else len(episodes) + 1,
+        'episode_number_overall': int(overall) if overall.isdigit() else len(episodes) + 1,
+        'title_original': title,
+        'title_french': None,
+        'air_date_usa': _clean_field(entry['air_date']),
+        'air_date_france': None,
+        'director': _clean_field(entry['director']),
+        'writer': _clean_field(entry['writer']),
+        'production_code': _clean_field(entry['production_code']),
+        'summary': entry['short_summary'],
+        'plot': entry['short_summary'],
+        'episode_url': BASE_URL + entry['episode_href'] if entry['episode_href'] else None,
+        'cast': []
+    }
+
+
+def extract_episodes_from_wikitext(wikitext, season_number):
+    """
+    Read a season page's episodes from its {{Episode list}} template calls.
+    Returns the list of episode dicts, summary and plot set from the ShortSummary parameter.
+    """
+    episodes = []
+    for entry in episode_list_entries(wikitext):
+        episode = _episode_from_entry(season_number, entry, episodes)
+        if episode:
+            episodes.append(episode)
+    return episodes
+
+
 def extract_summaries_from_season_page(html, season_number):
     """
     Extract episode summaries from a season page.
@@ -175,12 +302,26 @@ def extract_summaries_from_season_page(html, season_number):
     return summaries
 
 
-def scrape_full():
-    """Scrape all X-Files data."""
-    print("\n" + "=" * 60)
-    print(" X-FILES WIKIPEDIA SCRAPER ")
-    print("=" * 60 + "\n")
-    
+def scrape_seasons_from_wikitext():
+    """Episodes of every season from the season pages' wikitext, fetched in one batched API request."""
+    urls = [SEASON_URL_TEMPLATE.format(season_num) for season_num in SEASONS]
+    print(f"Fetching wikitext of {len(urls)} season pages")
+    sources = fetch_wikitext(get_shared_client(), urls)
+
+    all_seasons = {}
+    for season_num, url in zip(SEASONS, urls):
+        if not sources.get(url):
+            print(f"  [ERROR] No wikitext for {url}")
+            continue
+        episodes = extract_episodes_from_wikitext(sources[url], season_num)
+        if episodes:
+            all_seasons[season_num] = episodes
+            print(f"  Season {season_num}: {len(episodes)} episodes")
+    return all_seasons
+
+
+def scrape_seasons_from_html():
+    """Episodes of every season from the rendered list page, summaries from the season pages."""
     # Fetch list page
     html = fetch_page(LIST_URL)
     if not html:
@@ -198,14 +339,20 @@ def scrape_full():
         url = SEASON_URL_TEMPLATE.format(season_num)
         season_html = fetch_page(url)
         if season_html:
-            summaries = extract_summaries_from_season_page(season_html, season_num)
-            episodes = all_seasons[season_num]
-            for i, summary in enumerate(summaries):
-                if i < len(episodes):
-                    episodes[i]['summary'] = summary
-                    episodes[i]['plot'] = summary
-    
-    # Build database structure
+            apply_summaries(all_seasons[season_num], extract_summaries_from_season_page(season_html, season_num))
+    return all_seasons
+
+
+def apply_summaries(episodes, summaries):
+    """Set summary and plot of a season's episodes from its season page summaries, in order."""
+    for i, summary in enumerate(summaries):
+        if i < len(episodes):
+            episodes[i]['summary'] = summary
+            episodes[i]['plot'] = summary
+
+
+def build_database(all_seasons):
+    """Database dict of the series from season number -> episodes."""
     seasons_list = []
     total_episodes = 0
     
@@ -231,19 +378,62 @@ def scrape_full():
     return database
 
 
+def scrape_full(source='html'):
+    """Scrape all X-Files data; source is 'html' (rendered pages) or 'wikitext' (page sources)."""
+    print("\n" + "=" * 60)
+    print(" X-FILES WIKIPEDIA SCRAPER ")
+    print("=" * 60 + "\n")
+
+    all_seasons = scrape_seasons_from_wikitext() if source == 'wikitext' else scrape_seasons_from_html()
+    if not all_seasons:
+        if source == 'wikitext':
+            print("[ERROR] No episodes found in the season pages' wikitext.")
+        return None
+
+    return build_database(all_seasons)
+
+
+def source_urls():
+    """Every page scrape_full reads"""
+    return [LIST_URL] + [SEASON_URL_TEMPLATE.format(season_num) for season_num in SEASONS]
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Scrape The X-Files episodes from English Wikipedia")
+    parser.add_argument('--incremental', action='store_true',
+                        help='Skip the scrape when neither the list page nor any season page was edited since the last run')
+    parser.add_argument('--source', choices=('html', 'wikitext'), default='html',
+                        help='Read episode tables from rendered HTML, or from {{Episode list}} templates in the wikitext')
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")  # progress is printed; only surface HTTP problems
+
     output_dir = Path(__file__).parent.parent / 'output'
     output_dir.mkdir(exist_ok=True)
     output_file = output_dir / 'x_files_episodes.json'
-    
-    database = scrape_full()
+
+    tracker = None
+    if args.incremental:
+        tracker = RevisionTracker(get_shared_client(), output_file.with_suffix('.revisions.json'))
+        changed = tracker.refresh(source_urls())
+        if not changed and output_file.exists():
+            print(f"[INCREMENTAL] No page edited since the last run, keeping {output_file}")
+            print(f"  HTTP: {get_shared_client().summary()}")
+            return
+        print(f"[INCREMENTAL] {len(changed)} pages edited since the last run, re-scraping")
+
+    database = scrape_full(args.source)
     if database:
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(database, f, ensure_ascii=False, indent=2)
+        if tracker:
+            tracker.commit(source_urls())
         print(f"\n[SAVED] {output_file}")
         print(f"  Total: {database['total_episodes']} episodes in {database['total_seasons']} seasons")
     else:
         print("[ERROR] Scrape failed")
+    print(f"  HTTP: {get_shared_client().summary()}")
 
 
 if __name__ == '__main__':
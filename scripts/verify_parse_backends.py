@@ -0,0 +1,132 @@
+"""
+Verify that the lxml parse backend gives the same results as BeautifulSoup,
+and that parsing only the mw-content-text region gives the same results as
+parsing the full page.
+Runs every parser with both backends, on full and trimmed pages, over the pages
+of a recorded fixture archive (see SCRAPER_HTTP_MODE=record), reports any
+mismatches, the parse time per backend and the per-page saving of trimming.
+
+Usage:
+  python scripts/verify_parse_backends.py output/fixtures/wikipedia.zip
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scraper.config import MAIN_PAGE_URL
+from scraper.episode_parser import EpisodeParser
+from scraper.fixtures import FixtureArchive
+from scraper.parse_backend import BACKENDS, trim_page
+from scraper.season_discovery import SeasonDiscovery
+import scraper_english
+import scraper_x_files
+
+
+class _ReplayOnlyClient:
+    """Stand-in client serving a single page, so discovery parses without fetching"""
+
+    def __init__(self, html):
+        self.html = html
+
+    def get(self, url):
+        return self.html
+
+
+def classify(url):
+    """Which parser a recorded page belongs to, or None to skip it."""
+    if url == MAIN_PAGE_URL:
+        return 'main_page'
+    if 'fr.wikipedia.org/wiki/Saison_' in url:
+        return 'fr_season'
+    if url == scraper_x_files.LIST_URL:
+        return 'xf_list'
+    if url.startswith(scraper_english.BASE_URL + '/wiki/') and url not in scraper_english.SEASON_URLS \
+            and '_season_' not in url and 'List_of_' not in url:
+        return 'en_episode'
+    return None
+
+
+def run_parser(kind, url, html, backend, content_only):
+    """Parse one page with the given backend, returning comparable plain data."""
+    if kind == 'main_page':
+        return SeasonDiscovery(_ReplayOnlyClient(html), backend)._parse_main_page()
+    if kind == 'fr_season':
+        season = EpisodeParser(None, backend, content_only).parse_season_html(0, url, html)
+        return [episode.model_dump() for episode in season.episodes]
+    if kind == 'xf_list':
+        return scraper_x_files.extract_episodes_from_list_page(html, backend, content_only)
+    return scraper_english.parse_episode_page(html, backend, content_only)
+
+
+def peak_memory(kind, url, html, content_only):
+    """Peak Python memory (bytes) of a BeautifulSoup parse; lxml trees live outside tracemalloc's view."""
+    tracemalloc.start()
+    run_parser(kind, url, html, 'bs4', content_only)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('archive', help='Fixture archive recorded with SCRAPER_HTTP_MODE=record')
+    args = parser.parse_args()
+
+    logger.remove()
+
+    archive = FixtureArchive(args.archive)
+    checked = 0
+    mismatches = []
+    timings = {(backend, content_only): 0.0 for backend in BACKENDS for content_only in (False, True)}
+
+    print(f"{'page':<60} {'full':>9} {'trimmed':>9}  {'bs4 ms':>15}  {'lxml ms':>13}  {'bs4 peak KB':>15}")
+    for response in archive.responses():
+        kind = classify(response.url)
+        if kind is None or not response.body:
+            continue
+        results = {}
+        page_times = {}
+        for backend, content_only in timings:
+            started = time.perf_counter()
+            results[backend, content_only] = run_parser(kind, response.url, response.body, backend, content_only)
+            page_times[backend, content_only] = time.perf_counter() - started
+            timings[backend, content_only] += page_times[backend, content_only]
+        checked += 1
+        reference = results['bs4', False]
+        for variant, result in results.items():
+            if result != reference:
+                mismatches.append((kind, variant, response.url))
+
+        if kind == 'main_page':
+            continue  # season discovery reads links from the whole page and is never trimmed
+        trimmed_size = len(trim_page(response.body, True))
+        peaks = [peak_memory(kind, response.url, response.body, content_only) for content_only in (False, True)]
+        name = response.url.rsplit('/', 1)[-1][:60]
+        print(
+            f"{name:<60} {len(response.body) // 1024:>7}KB {trimmed_size // 1024:>7}KB  "
+            f"{1000 * page_times['bs4', False]:>6.1f} -> {1000 * page_times['bs4', True]:<6.1f}  "
+            f"{1000 * page_times['lxml', False]:>5.1f} -> {1000 * page_times['lxml', True]:<5.1f}  "
+            f"{peaks[0] // 1024:>6} -> {peaks[1] // 1024:<6}"
+        )
+    archive.close()
+
+    print(f"\nChecked {checked} pages")
+    for (backend, content_only), seconds in timings.items():
+        print(f"  {backend} ({'content only' if content_only else 'full page'}): {seconds:.2f}s total parse time")
+    if mismatches:
+        print(f"\n{len(mismatches)} mismatch(es):")
+        for kind, (backend, content_only), url in mismatches:
+            print(f"  [{kind}] {backend}{' content only' if content_only else ''}: {url}")
+        sys.exit(1)
+    print("\nAll backends and parse modes agree.")
+
+
+if __name__ == '__main__':
+    main()
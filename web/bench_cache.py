@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes and time of a first and a repeat page load
+Loads the page like a browser with a private cache - index.html, the scripts and stylesheets it
+names, then the data files - once cold and then again, sending the validators of the first load
+(If-None-Match) and skipping what Cache-Control says is still fresh. Bodies are requested with
+the browser's Accept-Encoding; --accept-encoding "" measures uncompressed transfers.
+Usage: python bench_cache.py [--repeats 5] [--accept-encoding "gzip, deflate, br"]
+"""
+
+import argparse
+import contextlib
+import gzip
+import http.client
+import io
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import http_compress
+import server
+
+DATA_PATHS = ['/data/twilight_zone_episodes.json', '/data/x_files_episodes.json',
+              '/data/thunderbirds_episodes.json', '/data/new_avengers_episodes.json']
+ASSET = re.compile(rb'''(?:src|href)=["']([^"':#]+\.(?:js|css)(?:\?[^"']*)?)["']''')
+
+
+class BrowserCache:
+    """Just enough of a browser cache: fresh entries are reused, stale ones revalidated"""
+
+    def __init__(self, accept_encoding):
+        self.accept_encoding = accept_encoding
+        self.entries = {}
+
+    def fetch(self, conn, path):
+        """Returns (body, bytes received on the wire)"""
+        entry = self.entries.get(path)
+        if entry and 'immutable' in entry['cache_control']:
+            return entry['body'], 0
+        headers = {'If-None-Match': entry['etag']} if entry and entry['etag'] else {}
+        if self.accept_encoding:
+            headers['Accept-Encoding'] = self.accept_encoding
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        wire = len(body) + sum(len(k) + len(v) + 4 for k, v in response.getheaders())
+        if response.status == 304:
+            return entry['body'], wire
+        encoding = response.getheader('Content-Encoding')
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'br':
+            body = http_compress.brotli.decompress(body)
+        cache_control = response.getheader('Cache-Control', '')
+        if 'no-store' not in cache_control:
+            self.entries[path] = {'body': body, 'etag': response.getheader('ETag'), 'cache_control': cache_control}
+        return body, wire
+
+
+def page_load(port, cache):
+    """One page load; returns (bytes received, seconds)"""
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    page, total = cache.fetch(conn, '/')
+    for asset in ASSET.findall(page):
+        total += cache.fetch(conn, '/' + asset.decode().lstrip('/'))[1]
+    for path in DATA_PATHS:
+        total += cache.fetch(conn, path)[1]
+    conn.close()
+    return total, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="First and repeat page loads against the viewer server")
+    parser.add_argument('--repeats', type=int, default=5, help='repeat loads to average (default: 5)')
+    parser.add_argument('--accept-encoding', default='gzip, deflate, br',
+                        help='Accept-Encoding sent by the browser (default: "gzip, deflate, br")')
+    args = parser.parse_args()
+
+    os.chdir(Path(__file__).parent)
+    httpd = server.ThreadPoolHTTPServer(('127.0.0.1', 0), server.TwilightZoneHTTPRequestHandler, 4)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    cache = BrowserCache(args.accept_encoding)
+    # The server logs each request; keep the report readable
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        first_bytes, first_seconds = page_load(port, cache)
+        repeats = [page_load(port, cache) for _ in range(args.repeats)]
+    httpd.stop(grace=1)
+
+    repeat_bytes = sum(b for b, _ in repeats) / len(repeats)
+    repeat_seconds = sum(s for _, s in repeats) / len(repeats)
+    print(f"{'load':<10}{'KB':>12}{'ms':>10}")
+    print(f"{'first':<10}{first_bytes / 1024:>12.1f}{first_seconds * 1000:>10.1f}")
+    print(f"{'repeat':<10}{repeat_bytes / 1024:>12.1f}{repeat_seconds * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: server CPU and throughput of the video streaming paths
+Serves a generated video through /api/video/ with each path - sendfile, buffered reads of
+STREAM_CHUNK_SIZE bytes, and the former 8 KiB read/write loop for reference - and downloads
+it in full and in ranges. Server CPU is the thread time spent in the request handler, so the
+client's own reading does not count.
+Usage: python bench_sendfile.py [--video-mb 512] [--rounds 3]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import server
+
+VIDEO_NAME = 'bench.mp4'
+PATHS = ['sendfile', 'buffered', 'legacy 8 KiB']
+
+
+class TimedHandler(server.TwilightZoneHTTPRequestHandler):
+    """Handler accumulating the CPU time of its thread"""
+    cpu = 0.0
+    lock = threading.Lock()
+
+    def handle(self):
+        started = time.thread_time()
+        try:
+            super().handle()
+        finally:
+            with TimedHandler.lock:
+                TimedHandler.cpu += time.thread_time() - started
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LegacyHandler(TimedHandler):
+    """Former streaming loop: 8 KiB reads copied through Python"""
+
+    def send_file_range(self, f, start, length):
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(8192, remaining))
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            remaining -= len(chunk)
+        return length - remaining
+
+
+def download(port, headers, expected):
+    """Read one response to the end with large receives; returns body bytes"""
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        request = f"GET /api/video/{VIDEO_NAME} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n{headers}\r\n"
+        sock.sendall(request.encode())
+        buffer = bytearray(4 * 1024 * 1024)
+        received = 0
+        header_end = None
+        head = b''
+        while True:
+            n = sock.recv_into(buffer)
+            if not n:
+                break
+            if header_end is None:
+                head += bytes(buffer[:n])
+                if b'\r\n\r\n' in head:
+                    header_end = head.index(b'\r\n\r\n') + 4
+                    received = len(head) - header_end
+            else:
+                received += n
+    if received != expected:
+        raise RuntimeError(f"received {received} bytes, expected {expected}")
+    return received
+
+
+def bench(path, port, size, rounds, range_size):
+    """Full downloads, then range reads at 16 offsets across the file; returns (seconds, bytes, cpu)"""
+    server.USE_SENDFILE = path == 'sendfile'
+    TimedHandler.cpu = 0.0
+    total = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        total += download(port, '', size)
+        for offset in range(0, size, size // 16):
+            end = min(size, offset + range_size) - 1
+            total += download(port, f"Range: bytes={offset}-{end}\r\n", end - offset + 1)
+    return time.perf_counter() - started, total, TimedHandler.cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sendfile and buffered video streaming paths")
+    parser.add_argument('--video-mb', type=int, default=512, help='size of the generated video (default: 512)')
+    parser.add_argument('--rounds', type=int, default=3, help='full downloads per path (default: 3)')
+    parser.add_argument('--range-mb', type=int, default=8, help='size of each range request (default: 8)')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'sendfile'):
+        print("os.sendfile is not available on this system: only the buffered paths can be compared")
+    with tempfile.TemporaryDirectory() as video_dir:
+        video = Path(video_dir) / VIDEO_NAME
+        with open(video, 'wb') as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(args.video_mb):
+                f.write(block)
+        size = video.stat().st_size
+        server.VIDEO_BASE_PATH = video_dir
+
+        print(f"Video: {args.video_mb} MiB, {args.rounds} full downloads + {args.rounds * 16} ranges of "
+              f"{args.range_mb} MiB per path\n")
+        print(f"{'path':<14}{'MB/s':>10}{'server CPU s':>15}{'CPU s per GB':>15}{'MB/s per core':>16}")
+        for path in PATHS:
+            if path == 'sendfile' and not hasattr(os, 'sendfile'):
+                continue
+            handler = LegacyHandler if path.startswith('legacy') else TimedHandler
+            httpd = server.ThreadPoolHTTPServer(('127.0.0.1', 0), handler, 4)
+            threading.Thread(target=httpd.serve_forever, daemon=True).start()
+            # The video route prints a few lines per request; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                # Warm the page cache so every path reads from memory
+                bench(path, httpd.server_address[1], size, 1, args.range_mb * 1024 * 1024)
+                seconds, total, cpu = bench(path, httpd.server_address[1], size, args.rounds,
+                                            args.range_mb * 1024 * 1024)
+            httpd.stop(grace=1)
+            mb = total / 1024 / 1024
+            print(f"{path:<14}{mb / seconds:>10.0f}{cpu:>15.2f}{cpu / (mb / 1024):>15.3f}"
+                  f"{mb / max(cpu, 1e-6):>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
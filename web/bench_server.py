@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark: static file latency while video streams are playing
+Starts the viewer server on a free port with a generated video file, opens N video streams
+read at a viewer's pace, and times keep-alive requests for app.js, styles.css and the data
+files meanwhile. --legacy runs the same load against the former single-connection server.
+Usage: python bench_server.py [--streams 4] [--duration 10] [--legacy]
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import os
+import socketserver
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import server
+
+STATIC_PATHS = ['/app.js', '/styles.css', '/index.html', '/data/twilight_zone_episodes.json']
+VIDEO_NAME = 'bench episode.mp4'
+stats_lock = threading.Lock()
+
+
+class LegacyServer(socketserver.TCPServer):
+    """The former server: one connection at a time, HTTP/1.0"""
+    allow_reuse_address = True
+    draining = False
+
+    def connection_idle(self, request, idle):
+        pass
+
+    def handle_error(self, request, client_address):
+        pass  # viewers dropping their stream at the end of the run
+
+
+class LegacyHandler(server.TwilightZoneHTTPRequestHandler):
+    protocol_version = 'HTTP/1.0'
+
+
+def quiet(handler_class):
+    """Handler without the per-request log lines"""
+    return type('Quiet' + handler_class.__name__, (handler_class,), {'log_message': lambda self, *args: None})
+
+
+def stream_video(port, stop, rate, stats):
+    """One viewer: read the video from the start at `rate` bytes per second until stopped"""
+    chunk = 64 * 1024
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        conn.request('GET', '/api/video/' + VIDEO_NAME.replace(' ', '%20'), headers={'Range': 'bytes=0-'})
+        response = conn.getresponse()
+        started = time.monotonic()
+        received = 0
+        while not stop.is_set():
+            data = response.read(chunk)
+            if not data:
+                break
+            received += len(data)
+            # Viewer pace: stay no more than one chunk ahead of `rate`
+            ahead = received / rate - (time.monotonic() - started)
+            if ahead > 0:
+                stop.wait(ahead)
+        conn.close()
+        with stats_lock:
+            stats['video_bytes'] += received
+    except OSError as e:
+        with stats_lock:
+            stats['stream_errors'] += 1
+        stats['last_error'] = repr(e)
+
+
+def probe_static(port, stop, latencies, stats, timeout):
+    """One UI client: fetch the static files over a keep-alive connection, timing each request"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    i = 0
+    while not stop.is_set():
+        path = STATIC_PATHS[i % len(STATIC_PATHS)]
+        i += 1
+        started = time.monotonic()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.will_close:
+                conn.close()
+            latencies.append(time.monotonic() - started)
+        except OSError as e:
+            with stats_lock:
+                stats['static_errors'] += 1
+            stats['last_error'] = repr(e)
+            latencies.append(time.monotonic() - started)
+            conn.close()
+    conn.close()
+
+
+def percentile(values, p):
+    """p-th percentile (nearest rank)"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def run(args, video_dir):
+    server.VIDEO_BASE_PATH = str(video_dir)
+    if args.legacy:
+        httpd = LegacyServer(('127.0.0.1', 0), quiet(LegacyHandler))
+    else:
+        httpd = server.ThreadPoolHTTPServer(('127.0.0.1', 0), quiet(server.TwilightZoneHTTPRequestHandler),
+                                            args.workers)
+    port = httpd.server_address[1]
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    stop = threading.Event()
+    stats = {'video_bytes': 0, 'stream_errors': 0, 'static_errors': 0, 'last_error': None}
+    latencies = []
+    streams = [threading.Thread(target=stream_video, args=(port, stop, args.rate * 1024 * 1024, stats))
+               for _ in range(args.streams)]
+    for thread in streams:
+        thread.start()
+    time.sleep(0.5)  # streams established before the UI requests start
+    clients = [threading.Thread(target=probe_static, args=(port, stop, latencies, stats, args.timeout))
+               for _ in range(args.clients)]
+    for thread in clients:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in clients + streams:
+        thread.join()
+
+    if args.legacy:
+        httpd.shutdown()
+        httpd.server_close()
+    else:
+        httpd.stop(grace=1)
+    return latencies, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static latency under concurrent video streams")
+    parser.add_argument('--streams', type=int, default=4, help='video streams playing (default: 4)')
+    parser.add_argument('--clients', type=int, default=2, help='UI clients fetching static files (default: 2)')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of measurement (default: 10)')
+    parser.add_argument('--rate', type=float, default=2.0, help='MB/s read by each viewer (default: 2)')
+    parser.add_argument('--video-mb', type=int, default=256, help='size of the generated video (default: 256)')
+    parser.add_argument('--workers', type=int, default=server.SERVER_WORKERS, help='server worker threads')
+    parser.add_argument('--timeout', type=float, default=5, help='static request timeout in seconds (default: 5)')
+    parser.add_argument('--legacy', action='store_true', help='benchmark the former single-connection server')
+    args = parser.parse_args()
+
+    os.chdir(Path(__file__).parent)
+    with tempfile.TemporaryDirectory() as video_dir:
+        with open(Path(video_dir) / VIDEO_NAME, 'wb') as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(args.video_mb):
+                f.write(block)
+
+        # The video route prints a few lines per request; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, stats = run(args, video_dir)
+
+    label = 'legacy TCPServer' if args.legacy else f'thread pool ({args.workers} workers)'
+    print(f"Server: {label}")
+    print(f"Video streams: {args.streams} at {args.rate} MB/s, "
+          f"{stats['video_bytes'] / 1024 / 1024 / args.duration:.1f} MB/s delivered in total, "
+          f"{stats['stream_errors']} failed")
+    if latencies:
+        ms = [latency * 1000 for latency in latencies]
+        print(f"Static requests: {len(ms)} in {args.duration:.0f}s, {stats['static_errors']} failed or timed out")
+        print(f"  p50 {percentile(ms, 50):.1f} ms   p95 {percentile(ms, 95):.1f} ms   "
+              f"p99 {percentile(ms, 99):.1f} ms   max {max(ms):.1f} ms   mean {statistics.mean(ms):.1f} ms")
+    else:
+        print("Static requests: none completed")
+    if stats['last_error']:
+        print(f"Last error: {stats['last_error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+HTTP caching (RFC 7232 / RFC 9111) for the viewer server
+Cache-Control policy per route, conditional requests (If-None-Match,
+If-Modified-Since) answered with 304, and content-hashed URLs for the page's
+scripts and stylesheets so browsers may keep them without revalidating.
+"""
+
+import email.utils
+import hashlib
+import os
+import re
+import threading
+import urllib.parse
+from typing import Dict, Optional, Tuple
+
+# Versioned assets (?v=<content hash>): the URL changes whenever the file does
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Pages, scripts and data files: kept by the browser but revalidated on each use (304 when unchanged)
+REVALIDATE = 'no-cache'
+# Episodes: cached for a day, byte ranges resumed with If-Range
+VIDEO = 'public, max-age=86400'
+# Everything else (API proxy, errors, directory listings)
+NO_STORE = 'no-store'
+
+# Local scripts and stylesheets referenced by a page, rewritten to their versioned URL
+ASSET_REFERENCE = re.compile(r'''(\b(?:src|href)=["'])([^"':?#]+\.(?:js|css))(["'])''')
+
+
+def _etag_list(header: str):
+    """Entity tags of an If-None-Match header, without their weak prefix"""
+    return [tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip() for tag in header.split(',')]
+
+
+def not_modified(headers, etag: str, mtime: Optional[float] = None) -> bool:
+    """
+    Whether a GET or HEAD may be answered 304 Not Modified
+
+    If-None-Match takes precedence and uses the weak comparison (RFC 7232 3.2);
+    If-Modified-Since is only looked at when the client sent no entity tag,
+    and only for responses that carry a Last-Modified date (`mtime`).
+    """
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match is not None:
+        tags = _etag_list(if_none_match)
+        bare = etag[2:] if etag.startswith('W/') else etag
+        return '*' in tags or bare in tags
+    if_modified_since = headers.get('If-Modified-Since')
+    if if_modified_since is None or mtime is None:
+        return False
+    try:
+        since = email.utils.parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError, IndexError):
+        return False
+    if since is None or since.tzinfo is None:
+        return False
+    return int(mtime) <= since.timestamp()
+
+
+def body_etag(body: bytes) -> str:
+    """Strong entity tag of a response generated in memory"""
+    return '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+
+
+class AssetVersions:
+    """
+    Content hashes of the static files, for versioned URLs
+
+    Hashes are recomputed only when a file's modification time or size
+    changes, so looking one up costs a stat.
+    """
+
+    def __init__(self):
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def version(self, path: str) -> Optional[str]:
+        """Short content hash of a file, or None if it cannot be read"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            known = self._hashes.get(path)
+        if known and known[:2] == (st.st_mtime_ns, st.st_size):
+            return known[2]
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+        except OSError:
+            return None
+        version = digest.hexdigest()[:12]
+        with self._lock:
+            self._hashes[path] = (st.st_mtime_ns, st.st_size, version)
+        return version
+
+    def is_current(self, path: str, query: str) -> bool:
+        """Whether the request's ?v= names the file's current content"""
+        requested = urllib.parse.parse_qs(query).get('v')
+        return bool(requested) and requested[0] == self.version(path)
+
+    def fingerprint_html(self, html: str, directory: str) -> str:
+        """Page with its local scripts and stylesheets pointing at versioned URLs"""
+        def versioned(match):
+            version = self.version(os.path.join(directory, *match.group(2).lstrip('/').split('/')))
+            if version is None:
+                return match.group(0)
+            return f'{match.group(1)}{match.group(2)}?v={version}{match.group(3)}'
+        return ASSET_REFERENCE.sub(versioned, html)
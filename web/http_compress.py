@@ -0,0 +1,128 @@
+"""
+Content-Encoding negotiation (gzip, brotli) for the viewer server
+Picks an encoding from Accept-Encoding, finds precompressed .br/.gz siblings
+written by precompress.py, and otherwise compresses on the fly into a bounded
+in-memory cache keyed by the file's modification time.
+"""
+
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+# Preferred first when the client weighs them equally
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+# File suffix of the precompressed sibling of each encoding
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+# Smaller bodies gain less than the Content-Encoding header costs
+MIN_SIZE = 1024
+# Text formats worth compressing; video, images and archives already are
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml',
+                      'image/svg+xml')
+
+# On-the-fly levels favour speed; precompress.py uses the maximum levels ahead of time
+LIVE_GZIP_LEVEL = 6
+LIVE_BROTLI_QUALITY = 5
+
+
+def compressible(content_type: str, size: int) -> bool:
+    """Whether a response of this type and size is worth encoding"""
+    return size >= MIN_SIZE and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """
+    Encoding to answer with, or None for the identity encoding
+
+    Honours q-values (q=0 refuses an encoding) and the `*` wildcard; among
+    equally weighted encodings the order of `available` decides.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights['gzip' if name == 'x-gzip' else name] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Encode a body; `level` defaults to the on-the-fly level of the encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=LIVE_BROTLI_QUALITY if level is None else level)
+    if encoding == 'gzip':
+        # mtime=0: the same input always gives the same bytes
+        return gzip.compress(data, compresslevel=LIVE_GZIP_LEVEL if level is None else level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def precompressed_path(path: str, encoding: str, st: os.stat_result) -> Optional[str]:
+    """
+    Precompressed sibling of a file (app.js.br, app.js.gz), if it is current
+
+    precompress.py stamps each sibling with its source's modification time, so
+    a sibling left behind by an older version of the file is never served.
+    """
+    sibling = path + SUFFIXES[encoding]
+    try:
+        return sibling if os.stat(sibling).st_mtime_ns == st.st_mtime_ns else None
+    except OSError:
+        return None
+
+
+class CompressionCache:
+    """
+    Encoded bodies, least recently used first out once over `max_bytes`
+
+    Entries are keyed by (key, encoding) and remember the validator they were
+    built from (the file's mtime and size, or a page's ETag): a changed
+    validator rebuilds the entry.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[object, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, validator, encoding: str, load: Callable[[], bytes]) -> bytes:
+        """Encoded body for `key`, built from load() on a miss or when `validator` changed"""
+        with self._lock:
+            entry = self._entries.get((key, encoding))
+            if entry and entry[0] == validator:
+                self._entries.move_to_end((key, encoding))
+                return entry[1]
+        body = compress(load(), encoding)
+        with self._lock:
+            previous = self._entries.pop((key, encoding), None)
+            if previous:
+                self.size -= len(previous[1])
+            if len(body) <= self.max_bytes:
+                self._entries[(key, encoding)] = (validator, body)
+                self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return body
@@ -0,0 +1,149 @@
+"""
+HTTP range requests (RFC 7233) for the viewer server
+Parses Range and If-Range against a file's size and validators, and lays out
+multipart/byteranges bodies. Shared by the video route and the static files.
+"""
+
+import email.utils
+import os
+import uuid
+from typing import List, NamedTuple, Optional, Tuple
+
+# Beyond this many distinct ranges in one request, the Range header is ignored (full response)
+MAX_RANGES = 16
+
+
+class ByteRange(NamedTuple):
+    """Inclusive byte range of a representation"""
+    start: int
+    end: int
+
+    @property
+    def length(self):
+        return self.end - self.start + 1
+
+    def content_range(self, size):
+        return f'bytes {self.start}-{self.end}/{size}'
+
+
+class RangeNotSatisfiable(Exception):
+    """No requested range overlaps the file: answer 416 with Content-Range: bytes */size"""
+
+
+def file_validators(st: os.stat_result) -> Tuple[str, str]:
+    """Strong ETag and Last-Modified date of a file, from its modification time and size"""
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    return etag, email.utils.formatdate(st.st_mtime, usegmt=True)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[List[ByteRange]]:
+    """
+    Byte ranges a Range header asks for, clamped to the file
+
+    Handles first-last, open-ended (first-) and suffix (-length) specs, several
+    per header. Overlapping or adjacent ranges are merged, in ascending order.
+
+    Returns:
+        The ranges to send, or None to ignore the header and send the whole file
+        (no header, another unit, bad syntax, more than MAX_RANGES ranges)
+
+    Raises:
+        RangeNotSatisfiable: every range starts beyond the end of the file
+    """
+    if not header:
+        return None
+    unit, _, specs = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not specs.strip():
+        return None
+
+    ranges = []
+    for spec in specs.split(','):
+        spec = spec.strip()
+        if not spec:
+            continue  # empty list elements are allowed
+        first, dash, last = spec.partition('-')
+        first, last = first.strip(), last.strip()
+        if not dash or not (first.isdigit() or first == '') or not (last.isdigit() or last == ''):
+            return None
+        if first == '':
+            if last == '':
+                return None
+            # Suffix range: the last `last` bytes (the whole file if it is shorter)
+            suffix = int(last)
+            if suffix > 0 and size > 0:
+                ranges.append(ByteRange(max(0, size - suffix), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append(ByteRange(start, min(int(last), size - 1) if last else size - 1))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+    ranges.sort()
+    merged = [ranges[0]]
+    for current in ranges[1:]:
+        previous = merged[-1]
+        if current.start <= previous.end + 1:
+            merged[-1] = ByteRange(previous.start, max(previous.end, current.end))
+        else:
+            merged.append(current)
+    if len(merged) > MAX_RANGES:
+        return None
+    return merged
+
+
+def if_range_matches(if_range: Optional[str], etag: str, last_modified: str) -> bool:
+    """
+    Whether a Range may be honoured under If-Range
+
+    An entity tag must match strongly (a weak tag never does) and a date
+    must equal Last-Modified exactly; otherwise the file changed since the
+    client's partial copy and the whole file is sent instead.
+    """
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return if_range == last_modified
+
+
+def select_ranges(range_header: Optional[str], if_range: Optional[str], size: int,
+                  etag: str, last_modified: str) -> Optional[List[ByteRange]]:
+    """
+    Ranges to answer with, after If-Range
+
+    Returns:
+        None for a full 200 response, or the ranges of a 206 response
+
+    Raises:
+        RangeNotSatisfiable: answer 416
+    """
+    if not range_header or not if_range_matches(if_range, etag, last_modified):
+        return None
+    return parse_range(range_header, size)
+
+
+class MultipartByteRanges:
+    """
+    Layout of a multipart/byteranges body
+
+    Each part is a delimiter and headers followed by the part's bytes; the
+    body length is known before anything is sent, for Content-Length.
+    """
+
+    def __init__(self, ranges: List[ByteRange], content_type: str, size: int):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/byteranges; boundary={self.boundary}'
+        self.parts = [
+            (
+                (f'\r\n--{self.boundary}\r\nContent-Type: {content_type}\r\n'
+                 f'Content-Range: {byte_range.content_range(size)}\r\n\r\n').encode('ascii'),
+                byte_range
+            )
+            for byte_range in ranges
+        ]
+        self.closing = f'\r\n--{self.boundary}--\r\n'.encode('ascii')
+        self.length = sum(len(head) + byte_range.length for head, byte_range in self.parts) + len(self.closing)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Precompress the viewer's static files for server.py
+Writes a .gz (and a .br when the brotli module is installed) next to each JSON, JS and CSS file,
+at the maximum compression level, stamped with the source file's modification time so the server
+ignores a sibling as soon as its source changes. HTML pages are rewritten per request and are
+compressed on the fly instead.
+Usage: python precompress.py [--clean]
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import http_compress
+
+EXTENSIONS = ('.json', '.js', '.css', '.svg')
+LEVELS = {'gzip': 9, 'br': 11}
+
+
+def source_files(root):
+    """Files worth precompressing under the web directory"""
+    for path in sorted(root.rglob('*')):
+        if path.is_file() and path.suffix in EXTENSIONS and '__pycache__' not in path.parts:
+            if path.stat().st_size >= http_compress.MIN_SIZE:
+                yield path
+
+
+def precompress(path, encodings):
+    """Write the missing or stale siblings of one file; returns [(encoding, size, written)]"""
+    st = path.stat()
+    data = None
+    results = []
+    for encoding in encodings:
+        sibling = Path(str(path) + http_compress.SUFFIXES[encoding])
+        written = http_compress.precompressed_path(str(path), encoding, st) is None
+        if written:
+            if data is None:
+                data = path.read_bytes()
+            sibling.write_bytes(http_compress.compress(data, encoding, LEVELS[encoding]))
+            os.utime(sibling, ns=(st.st_atime_ns, st.st_mtime_ns))
+        results.append((encoding, sibling.stat().st_size, written))
+    return results
+
+
+def clean(root):
+    """Remove every precompressed sibling"""
+    removed = 0
+    for suffix in http_compress.SUFFIXES.values():
+        for sibling in root.rglob('*' + suffix):
+            if Path(str(sibling)[:-len(suffix)]).suffix in EXTENSIONS:
+                sibling.unlink()
+                removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings of the static files for server.py")
+    parser.add_argument('--clean', action='store_true', help='remove the precompressed files instead')
+    args = parser.parse_args()
+
+    root = Path(__file__).parent
+    if args.clean:
+        print(f"Removed {clean(root)} precompressed files")
+        return
+    if http_compress.brotli is None:
+        print("brotli is not installed (pip install brotli): writing .gz files only")
+
+    total = {encoding: 0 for encoding in http_compress.ENCODINGS}
+    original = 0
+    for path in source_files(root):
+        size = path.stat().st_size
+        original += size
+        results = precompress(path, http_compress.ENCODINGS)
+        sizes = '  '.join(f"{encoding} {compressed / 1024:8.1f} KB{'' if written else ' (up to date)'}"
+                          for encoding, compressed, written in results)
+        print(f"{str(path.relative_to(root)):<40}{size / 1024:10.1f} KB  {sizes}")
+        for encoding, compressed, _ in results:
+            total[encoding] += compressed
+    for encoding, compressed in total.items():
+        if compressed:
+            print(f"Total {encoding}: {original / 1024:.0f} KB -> {compressed / 1024:.0f} KB "
+                  f"({original / compressed:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,25 +6,307 @@ Usage: python server.py
 """
 
 import http.server
-import socketserver
+import signal
+import threading
+import time
 import webbrowser
 import os
 import urllib.parse
 import unicodedata
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import http_cache
+import http_compress
+import http_range
+
 PORT = 8000
 
+# Connexions servies en parallèle (flux vidéo compris) ; au-delà, les suivantes attendent un thread libre
+SERVER_WORKERS = 32
+# Secondes pendant lesquelles une connexion keep-alive inactive (ou un client qui ne lit plus) garde son thread
+KEEPALIVE_TIMEOUT = 15
+# À l'arrêt, secondes laissées aux réponses en cours avant de fermer leurs connexions
+SHUTDOWN_GRACE = 5
+# Envoi des fichiers : sendfile (copie noyau, sans passer par Python) quand le système le permet,
+# sinon lectures de STREAM_CHUNK_SIZE octets
+USE_SENDFILE = hasattr(os, 'sendfile')
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Mémoire maximale des fichiers JSON/JS/CSS compressés à la volée (gzip, brotli) faute de .gz/.br
+# préparés par precompress.py
+COMPRESSION_CACHE_BYTES = 32 * 1024 * 1024
+
 # Chemin de base pour les vidéos (modifiez selon votre configuration)
 # Par défaut, utilise le chemin réseau Windows
 # Vous pouvez aussi utiliser un chemin local comme: r"C:\Videos\Twilight Zone"
 # ou un chemin relatif depuis le dossier ui: r"..\videos"
 VIDEO_BASE_PATH = r"\\Freebox_Server\Videos\Series\Twilight Zone"
 
+# Content hashes of app.js, styles.css... for the versioned URLs written into the pages
+ASSET_VERSIONS = http_cache.AssetVersions()
+COMPRESSION_CACHE = http_compress.CompressionCache(COMPRESSION_CACHE_BYTES)
+
 class TwilightZoneHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """Custom handler with proper MIME types and video serving"""
 
+    # Keep-alive: a browser reuses its connections for app.js, the data files and video ranges
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    # Cache-Control of the response being written; end_headers falls back to no-store
+    cache_control = None
+    # Vary of the response being written (Accept-Encoding for compressible files)
+    vary = None
+
+    def handle_one_request(self):
+        """Serve one request of the connection, marking it idle while waiting for the next"""
+        self.server.connection_idle(self.connection, True)
+        super().handle_one_request()
+        if self.server.draining:
+            self.close_connection = True
+
+    def parse_request(self):
+        """A request line has arrived: the connection is busy until its response is sent"""
+        self.server.connection_idle(self.connection, False)
+        return super().parse_request()
+
+    def send_file_range(self, f, start, length):
+        """
+        Send `length` bytes of an open file from offset `start`, after the headers
+
+        Uses sendfile when available: the kernel copies straight from the page
+        cache to the socket. Otherwise (Windows, network paths without
+        sendfile support) falls back to STREAM_CHUNK_SIZE reads. A file that
+        turns out shorter than announced closes the connection, since the
+        client would wait for the missing bytes of Content-Length.
+        """
+        f.seek(start)
+        if USE_SENDFILE:
+            try:
+                self.connection.sendfile(f, start, length)
+            except (ConnectionError, TimeoutError):
+                raise
+            except OSError as e:
+                print(f"[INFO] sendfile unavailable ({e}), using buffered reads")
+        # sendfile leaves the file positioned after the last byte it sent
+        sent = f.tell() - start
+        if sent < length:
+            buffer = bytearray(min(STREAM_CHUNK_SIZE, length - sent))
+            view = memoryview(buffer)
+            while sent < length:
+                n = f.readinto(view[:min(len(buffer), length - sent)])
+                if not n:
+                    break
+                self.wfile.write(view[:n])
+                sent += n
+        if sent < length:
+            self.close_connection = True
+        return sent
+
+    def send_not_modified(self, etag, last_modified, cache_control):
+        """304 for a conditional request whose copy is still current"""
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        self.cache_control = cache_control
+        self.end_headers()
+
+    def send_file(self, path, content_type, cache_control=http_cache.REVALIDATE):
+        """
+        Answer GET or HEAD for a file, honouring Range and If-Range (RFC 7233)
+
+        Sends 304 when the client's copy is current (If-None-Match,
+        If-Modified-Since), 200 with the whole file, 206 with one range or a
+        multipart/byteranges body for several, or 416 when no range overlaps
+        the file. Every answer advertises Accept-Ranges and the file's
+        validators, which clients echo in If-Range to resume safely.
+        """
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            etag, last_modified = http_range.file_validators(st)
+            if http_cache.not_modified(self.headers, etag, st.st_mtime):
+                self.send_not_modified(etag, last_modified, cache_control)
+                return
+            try:
+                ranges = http_range.select_ranges(
+                    self.headers.get('Range'), self.headers.get('If-Range'), st.st_size, etag, last_modified
+                )
+            except http_range.RangeNotSatisfiable:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{st.st_size}')
+                self.send_header('Content-Length', '0')
+                self.send_header('Accept-Ranges', 'bytes')
+                self.end_headers()
+                return
+
+            multipart = None
+            if ranges is None:
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(st.st_size))
+            elif len(ranges) == 1:
+                self.send_response(206)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(ranges[0].length))
+                self.send_header('Content-Range', ranges[0].content_range(st.st_size))
+            else:
+                multipart = http_range.MultipartByteRanges(ranges, content_type, st.st_size)
+                self.send_response(206)
+                self.send_header('Content-Type', multipart.content_type)
+                self.send_header('Content-Length', str(multipart.length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.cache_control = cache_control
+            self.end_headers()
+            if self.command == 'HEAD':
+                return
+
+            if ranges is None:
+                self.send_file_range(f, 0, st.st_size)
+            elif multipart is None:
+                self.send_file_range(f, ranges[0].start, ranges[0].length)
+            else:
+                for head, byte_range in multipart.parts:
+                    self.wfile.write(head)
+                    if self.send_file_range(f, byte_range.start, byte_range.length) < byte_range.length:
+                        return
+                self.wfile.write(multipart.closing)
+
+    def static_file_path(self):
+        """File the static route would serve for this request, or None for redirects, listings and 404s"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith('/'):
+                return None
+            for index in ('index.html', 'index.htm'):
+                if os.path.isfile(os.path.join(path, index)):
+                    return os.path.join(path, index)
+            return None
+        if path.endswith('/') or not os.path.isfile(path):
+            return None
+        return path
+
+    def serve_static(self):
+        """Static files through send_file; directories and missing files keep the default handling"""
+        path = self.static_file_path()
+        if path is None:
+            if self.command == 'HEAD':
+                super().do_HEAD()
+            else:
+                super().do_GET()
+            return
+        try:
+            if path.endswith(('.html', '.htm')):
+                self.send_page(path)
+            elif ASSET_VERSIONS.is_current(path, urllib.parse.urlsplit(self.path).query):
+                self.send_static_file(path, self.guess_type(path), http_cache.IMMUTABLE)
+            else:
+                self.send_static_file(path, self.guess_type(path), http_cache.REVALIDATE)
+        except (FileNotFoundError, IsADirectoryError):
+            # Removed or replaced between static_file_path and open: nothing has been sent yet
+            self.send_error(404, "File not found")
+        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, TimeoutError):
+            # Client left mid-response: the status line is already out, drop the connection
+            self.close_connection = True
+
+    def negotiate_encoding(self, path=None, st=None):
+        """Content-Encoding for this request: brotli or gzip as the client accepts, None for identity"""
+        available = [
+            encoding for encoding in ('br', 'gzip')
+            if encoding in http_compress.ENCODINGS
+            or (path and http_compress.precompressed_path(path, encoding, st))
+        ]
+        return http_compress.negotiate(self.headers.get('Accept-Encoding'), available)
+
+    def send_static_file(self, path, content_type, cache_control):
+        """
+        Static file, compressed when its type allows and the client accepts it
+
+        Uses the precompressed .br/.gz sibling when it is current, otherwise
+        the compression cache. Range requests get the identity encoding, so
+        byte offsets always refer to the file itself.
+        """
+        st = os.stat(path)
+        if not http_compress.compressible(content_type, st.st_size):
+            self.send_file(path, content_type, cache_control)
+            return
+        self.vary = 'Accept-Encoding'
+        encoding = None if self.headers.get('Range') else self.negotiate_encoding(path, st)
+        if encoding is None:
+            self.send_file(path, content_type, cache_control)
+            return
+
+        etag, last_modified = http_range.file_validators(st)
+        etag = f'{etag[:-1]}-{encoding}"'
+        if http_cache.not_modified(self.headers, etag, st.st_mtime):
+            self.send_not_modified(etag, last_modified, cache_control)
+            return
+        sibling = http_compress.precompressed_path(path, encoding, st)
+        if sibling:
+            with open(sibling, 'rb') as f:
+                length = os.fstat(f.fileno()).st_size
+                self.send_encoded_headers(content_type, encoding, length, etag, last_modified, cache_control)
+                if self.command != 'HEAD':
+                    self.send_file_range(f, 0, length)
+            return
+
+        def load():
+            with open(path, 'rb') as f:
+                return f.read()
+        body = COMPRESSION_CACHE.get(path, (st.st_mtime_ns, st.st_size), encoding, load)
+        self.send_encoded_headers(content_type, encoding, len(body), etag, last_modified, cache_control)
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_encoded_headers(self, content_type, encoding, length, etag, last_modified, cache_control):
+        """Status and headers of a 200 response with a Content-Encoding"""
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(length))
+        self.send_header('ETag', etag)
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        self.vary = 'Accept-Encoding'
+        self.cache_control = cache_control
+        self.end_headers()
+
+    def send_page(self, path):
+        """
+        HTML page with its scripts and stylesheets at versioned URLs (app.js?v=<hash>)
+
+        The page itself is revalidated on every load; the assets it names are
+        cached as immutable, and a new hash is written as soon as one changes.
+        """
+        with open(path, encoding='utf-8') as f:
+            body = ASSET_VERSIONS.fingerprint_html(f.read(), os.path.dirname(path)).encode('utf-8')
+        etag = http_cache.body_etag(body)
+        self.vary = 'Accept-Encoding'
+        encoding = self.negotiate_encoding() if len(body) >= http_compress.MIN_SIZE else None
+        if encoding:
+            etag = f'{etag[:-1]}-{encoding}"'
+        if http_cache.not_modified(self.headers, etag):
+            self.send_not_modified(etag, None, http_cache.REVALIDATE)
+            return
+        if encoding:
+            page = body
+            body = COMPRESSION_CACHE.get(path, etag, encoding, lambda: page)
+            self.send_encoded_headers('text/html; charset=utf-8', encoding, len(body), etag, None,
+                                      http_cache.REVALIDATE)
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.cache_control = http_cache.REVALIDATE
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
     def normalize_error_message(self, message):
         """Normalize error message to ASCII-only for HTTP error responses"""
         # Replace common Unicode characters with ASCII equivalents
@@ -104,7 +386,14 @@ class TwilightZoneHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             return
         
         # Default file serving
-        super().do_GET()
+        self.serve_static()
+
+    def do_HEAD(self):
+        """Handle HEAD requests: headers of the video API and of static files, without the body"""
+        if self.path.startswith('/api/video/'):
+            self.handle_video_request()
+            return
+        self.serve_static()
 
     def handle_video_request(self):
         """Handle video file requests from the API endpoint"""
@@ -158,52 +447,10 @@ class TwilightZoneHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 return
             
             print(f"[VIDEO] File found, size: {os.path.getsize(video_path)} bytes")
-            
-            # Get file size
-            file_size = os.path.getsize(video_path)
-            
-            # Handle range requests for video streaming
-            range_header = self.headers.get('Range')
-            if range_header:
-                # Parse range header
-                range_match = range_header.replace('bytes=', '').split('-')
-                start = int(range_match[0]) if range_match[0] else 0
-                end = int(range_match[1]) if range_match[1] else file_size - 1
-                
-                # Send partial content
-                self.send_response(206)
-                self.send_header('Content-Type', 'video/mp4')
-                self.send_header('Content-Length', str(end - start + 1))
-                self.send_header('Content-Range', f'bytes {start}-{end}/{file_size}')
-                self.send_header('Accept-Ranges', 'bytes')
-                self.end_headers()
-                
-                # Read and send file chunk
-                with open(video_path, 'rb') as f:
-                    f.seek(start)
-                    chunk_size = 8192
-                    remaining = end - start + 1
-                    while remaining > 0:
-                        chunk = f.read(min(chunk_size, remaining))
-                        if not chunk:
-                            break
-                        self.wfile.write(chunk)
-                        remaining -= len(chunk)
-            else:
-                # Send full file
-                self.send_response(200)
-                self.send_header('Content-Type', 'video/mp4')
-                self.send_header('Content-Length', str(file_size))
-                self.send_header('Accept-Ranges', 'bytes')
-                self.end_headers()
-                
-                # Read and send file
-                with open(video_path, 'rb') as f:
-                    while True:
-                        chunk = f.read(8192)
-                        if not chunk:
-                            break
-                        self.wfile.write(chunk)
+            print(f"[VIDEO] {self.command} Range: {self.headers.get('Range') or '(whole file)'}")
+
+            # Whole file, byte ranges (seeking, trailing moov atom probes) or 416
+            self.send_file(video_path, self.guess_type(video_path), http_cache.VIDEO)
         except FileNotFoundError as e:
             error_msg = f"Video file not found: {filename}\nError: {str(e)}"
             print(f"[ERROR] {error_msg}")
@@ -212,8 +459,8 @@ class TwilightZoneHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             error_msg = f"Permission denied accessing video: {filename}\nError: {str(e)}"
             print(f"[ERROR] {error_msg}")
             self.send_error(403, self.normalize_error_message(error_msg))
-        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError) as e:
-            # Client closed connection - this is normal, don't log as error
+        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, TimeoutError) as e:
+            # Client closed connection (or stopped reading) - this is normal, don't log as error
             error_type = type(e).__name__
             print(f"[INFO] Client closed connection while serving: {filename} ({error_type})")
             # Don't send error response as connection is already closed
@@ -281,6 +528,10 @@ class TwilightZoneHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                     
                     if content_length:
                         self.send_header('Content-Length', content_length)
+                    else:
+                        # Without a length, only closing the connection marks the end of the body
+                        self.send_header('Connection', 'close')
+                        self.close_connection = True
                     if content_range:
                         self.send_header('Content-Range', content_range)
                     
@@ -294,104 +545,9 @@ class TwilightZoneHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                             break
                         try:
                             self.wfile.write(chunk)
-                        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
-                            print(f"[ARCHIVE PROXY] Client closed connection")
-                            return
-                            
-            except urllib.error.HTTPError as e:
-                print(f"[ARCHIVE PROXY] HTTP Error: {e.code} - {e.reason}")
-                self.send_error(e.code, f"Archive proxy error: {e.reason}")
-            except urllib.error.URLError as e:
-                print(f"[ARCHIVE PROXY] URL Error: {e.reason}")
-                self.send_error(502, f"Failed to connect to archive: {e.reason}")
-            except Exception as e:
-                print(f"[ARCHIVE PROXY] Error: {str(e)}")
-                self.send_error(500, f"Archive proxy error: {str(e)}")
-                
-        except Exception as e:
-            error_msg = f"Error in archive proxy: {str(e)}"
-            print(f"[ERROR] {error_msg}")
-            import traceback
-            traceback.print_exc()
-            try:
-                self.send_error(500, self.normalize_error_message(error_msg))
-            except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
-                print(f"[ARCHIVE PROXY] Could not send error response - connection closed")
-
-    def do_OPTIONS(self):
-        """Handle OPTIONS requests for CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, HEAD, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Range')
-        self.send_header('Access-Control-Max-Age', '3600')
-        self.end_headers()
-
-    def handle_archive_proxy(self):
-        """Proxy pour les vidéos Internet Archive avec support CORS"""
-        try:
-            # Extraire l'URL encodée depuis le chemin
-            encoded_url = self.path.replace('/api/archive/', '')
-            target_url = urllib.parse.unquote(encoded_url)
-            
-            print(f"\n[ARCHIVE PROXY] ===== Archive Request =====")
-            print(f"[ARCHIVE PROXY] Target URL: {target_url}")
-            
-            # Vérifier que c'est bien une URL Internet Archive
-            if not target_url.startswith('https://') or 'archive.org' not in target_url:
-                self.send_error(400, "Invalid archive URL")
-                return
-            
-            # Récupérer le header Range si présent
-            range_header = self.headers.get('Range')
-            
-            # Préparer la requête vers Internet Archive
-            req = urllib.request.Request(target_url)
-            req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-            
-            # Si on a un Range header, le transmettre
-            if range_header:
-                req.add_header('Range', range_header)
-            
-            try:
-                # Ouvrir la connexion vers Internet Archive
-                with urllib.request.urlopen(req, timeout=30) as response:
-                    # Récupérer les headers de la réponse
-                    content_type = response.headers.get('Content-Type', 'video/mp4')
-                    content_length = response.headers.get('Content-Length')
-                    content_range = response.headers.get('Content-Range')
-                    status_code = response.getcode()
-                    
-                    print(f"[ARCHIVE PROXY] Status: {status_code}")
-                    print(f"[ARCHIVE PROXY] Content-Type: {content_type}")
-                    print(f"[ARCHIVE PROXY] Content-Length: {content_length}")
-                    
-                    # Envoyer les headers de réponse avec CORS
-                    self.send_response(status_code)
-                    self.send_header('Content-Type', content_type)
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.send_header('Access-Control-Allow-Methods', 'GET, HEAD, OPTIONS')
-                    self.send_header('Access-Control-Allow-Headers', 'Range')
-                    self.send_header('Access-Control-Expose-Headers', 'Content-Length, Content-Range, Accept-Ranges')
-                    self.send_header('Accept-Ranges', 'bytes')
-                    
-                    if content_length:
-                        self.send_header('Content-Length', content_length)
-                    if content_range:
-                        self.send_header('Content-Range', content_range)
-                    
-                    self.end_headers()
-                    
-                    # Streamer les données
-                    chunk_size = 8192
-                    while True:
-                        chunk = response.read(chunk_size)
-                        if not chunk:
-                            break
-                        try:
-                            self.wfile.write(chunk)
-                        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+                        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, TimeoutError):
                             print(f"[ARCHIVE PROXY] Client closed connection")
+                            self.close_connection = True
                             return
                             
             except urllib.error.HTTPError as e:
@@ -421,19 +577,127 @@ class TwilightZoneHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Methods', 'GET, HEAD, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Range')
         self.send_header('Access-Control-Max-Age', '3600')
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
     def end_headers(self):
-        # Add CORS headers if needed
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
+        # Cache policy of the route (send_file, send_page); API answers and errors are never stored
+        cache_control, self.cache_control = self.cache_control or http_cache.NO_STORE, None
+        self.send_header('Cache-Control', cache_control)
+        if self.vary:
+            self.send_header('Vary', self.vary)
+            self.vary = None
+        if cache_control == http_cache.NO_STORE:
+            self.send_header('Pragma', 'no-cache')
+            self.send_header('Expires', '0')
+        if self.server.draining:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
         super().end_headers()
 
     def log_message(self, format, *args):
         """Custom log format"""
         print(f"[{self.log_date_time_string()}] {args[0]}")
 
+class ThreadPoolHTTPServer(http.server.HTTPServer):
+    """
+    HTTP server handling each connection in a bounded pool of worker threads
+
+    A video stream holds its thread for as long as the viewer watches, so the
+    pool lets other viewers, the data files and app.js be served alongside.
+    When every worker is busy, new connections wait in the listen backlog
+    instead of spawning more threads. stop() drains gracefully: no new
+    connections, idle keep-alive connections closed at once, and responses in
+    progress given SHUTDOWN_GRACE seconds to finish.
+    """
+
+    allow_reuse_address = True
+    request_queue_size = 64
+
+    def __init__(self, server_address, handler_class, workers=SERVER_WORKERS):
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http')
+        self.slots = threading.Semaphore(workers)
+        self.lock = threading.Lock()
+        self.connections = {}  # open connection socket -> True while waiting for its next request
+        self.draining = False
+
+    def process_request(self, request, client_address):
+        """Hand the connection to a worker, waiting for one to be free"""
+        while not self.slots.acquire(timeout=0.5):
+            if self.draining:
+                self.shutdown_request(request)
+                return
+        with self.lock:
+            self.connections[request] = True
+        self.pool.submit(self._serve_connection, request, client_address)
+
+    def _serve_connection(self, request, client_address):
+        """Worker: serve every request of a keep-alive connection, then close it"""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self.lock:
+                self.connections.pop(request, None)
+            self.shutdown_request(request)
+            self.slots.release()
+
+    def connection_idle(self, request, idle):
+        """Record whether a connection is between requests (closed at once when draining) or busy"""
+        with self.lock:
+            if request in self.connections:
+                self.connections[request] = idle
+        if idle and self.draining:
+            self._close(request)
+
+    @staticmethod
+    def _close(request):
+        """Unblock a worker stuck reading or writing a connection"""
+        try:
+            request.shutdown(2)  # socket.SHUT_RDWR
+        except OSError:
+            pass
+
+    def active_connections(self):
+        """Number of open connections"""
+        with self.lock:
+            return len(self.connections)
+
+    def stop(self, grace=SHUTDOWN_GRACE):
+        """
+        Stop the server once the responses in progress are sent, or after `grace` seconds
+
+        Must not be called from the thread running serve_forever() while it runs.
+        """
+        self.draining = True
+        self.shutdown()
+        deadline = time.monotonic() + grace
+        while True:
+            with self.lock:
+                idle = [request for request, is_idle in self.connections.items() if is_idle]
+                busy = len(self.connections) - len(idle)
+            for request in idle:
+                self._close(request)
+            if not busy or time.monotonic() >= deadline:
+                break
+            time.sleep(0.1)
+        with self.lock:
+            remaining = list(self.connections)
+        for request in remaining:
+            self._close(request)
+        self.pool.shutdown(wait=True)
+        self.server_close()
+        return len(remaining)
+
+
+def create_server(port=PORT, workers=SERVER_WORKERS, host=""):
+    """Server for the viewer and its APIs, on `port` (0 picks a free port)"""
+    return ThreadPoolHTTPServer((host, port), TwilightZoneHTTPRequestHandler, workers)
+
+
 def test_video_path():
     """Test if the video base path is accessible"""
     print(f"\n📁 Testing video path access...")
@@ -469,23 +733,32 @@ def main():
     # Test video path accessibility
     test_video_path()
 
-    with socketserver.TCPServer(("", PORT), TwilightZoneHTTPRequestHandler) as httpd:
-        print("\n" + "="*52)
-        print("   The Twilight Zone - Episode Viewer Server")
-        print("="*52 + "\n")
-        print(f"🎬 Server running at http://localhost:{PORT}/")
-        print(f"📂 Serving files from: {os.getcwd()}")
-        print(f"📹 Video path: {VIDEO_BASE_PATH}")
-        print(f"\n⏹️  Press Ctrl+C to stop the server\n")
+    httpd = create_server()
+    print("\n" + "="*52)
+    print("   The Twilight Zone - Episode Viewer Server")
+    print("="*52 + "\n")
+    print(f"🎬 Server running at http://localhost:{PORT}/")
+    print(f"📂 Serving files from: {os.getcwd()}")
+    print(f"📹 Video path: {VIDEO_BASE_PATH}")
+    print(f"🧵 Up to {SERVER_WORKERS} connections served at once (keep-alive {KEEPALIVE_TIMEOUT}s)")
+    print(f"\n⏹️  Press Ctrl+C to stop the server\n")
 
-        # Auto-open browser
-        webbrowser.open(f'http://localhost:{PORT}')
+    # Auto-open browser
+    webbrowser.open(f'http://localhost:{PORT}')
 
-        try:
-            httpd.serve_forever()
-        except KeyboardInterrupt:
-            print("\n\n🛑 Server stopped.")
-            print("Thank you for visiting The Twilight Zone!\n")
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, interrupt)
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n\n🛑 Stopping: finishing {httpd.active_connections()} open connection(s)...")
+        cut = httpd.stop()
+        if cut:
+            print(f"   {cut} response(s) cut after {SHUTDOWN_GRACE}s")
+        print("🛑 Server stopped.")
+        print("Thank you for visiting The Twilight Zone!\n")
 
 if __name__ == "__main__":
     main()